@@ -0,0 +1,105 @@
+from inspect import getsourcefile
+import os.path as path, sys
+
+# enable import from other module directories
+current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
+sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
+
+import gc
+import random
+import time
+from controller.graph_lib import build_graph
+from model.graph import Graph
+
+# Compares the three-phase build with build_graph on synthetic data at growing scales
+SCALES = (1, 10, 100)
+ACTORS_PER_SCALE = 300
+MOVIES_PER_SCALE = 300
+MOVIES_PER_ACTOR = 8
+ACTORS_PER_MOVIE = 6
+MISSING_FRACTION = 0.2  # The fraction of listed names that are not in the data, as in crawled data
+SEED = 0
+
+
+def synthetic_data(scale, rand):
+    """
+    Generates actor data and movie data listing each other
+    :param scale: the multiple of the base size
+    :param rand: the random generator
+    :return: the dict of actor data and the dict of movie data
+    """
+    actor_number, movie_number = ACTORS_PER_SCALE * scale, MOVIES_PER_SCALE * scale
+    listed_actors = int(actor_number / (1 - MISSING_FRACTION))
+    listed_movies = int(movie_number / (1 - MISSING_FRACTION))
+    actor_data = {"actor%d" % i: {"age": rand.randrange(20, 90), "movies": ["movie%d" % rand.randrange(listed_movies)
+                                                                         for _ in range(MOVIES_PER_ACTOR)]}
+                  for i in range(actor_number)}
+    movie_data = {"movie%d" % i: {"gross": rand.randrange(10 ** 9), "actors": ["actor%d" % rand.randrange(listed_actors)
+                                                                              for _ in range(ACTORS_PER_MOVIE)]}
+                  for i in range(movie_number)}
+    return actor_data, movie_data
+
+
+def three_phase_build(actor_data, movie_data):
+    """
+    Builds a graph as before build_graph: add_edge for every listed movie of actors and again for every listed actor of
+    movies, then siblings linked pair by pair, then total gross of actors
+    :param actor_data: the dict of actor data
+    :param movie_data: the dict of movie data
+    :return: the graph
+    """
+    graph = Graph()
+    for actor, content in actor_data.items():
+        graph.add_actor_vertex(actor, content)
+    for movie, content in movie_data.items():
+        graph.add_movie_vertex(movie, content)
+    actor_vertices = graph.get_actor_vertices()
+    for actor_name in actor_vertices:
+        content = actor_vertices[actor_name].get_content()
+        for movie_name in content.get('movies', []):
+            graph.add_edge(actor=actor_name, movie=movie_name, weight=content.get('age'))
+    movie_vertices = graph.get_movie_vertices()
+    for movie_name in movie_vertices:
+        for actor_name in movie_vertices[movie_name].get_content().get('actors', []):
+            if actor_name in actor_vertices:
+                graph.add_edge(actor=actor_name, movie=movie_name,
+                               weight=actor_vertices[actor_name].get_content().get('age'))
+    for movie in movie_vertices.values():
+        actors = movie.get_neighbors()
+        for actor in actors:
+            for co_star in actors:
+                if co_star != actor:
+                    actor_vertices[actor].add_sibling(co_star)
+                    actor_vertices[co_star].add_sibling(actor)
+    for actor in actor_vertices:
+        graph.get_actor_gross(actor)
+    return graph
+
+
+def measure(function, actor_data, movie_data):
+    """
+    Measures one build, starting with no other graph alive so garbage collection work is comparable
+    :param function: the build function of actor data and movie data
+    :param actor_data: the dict of actor data
+    :param movie_data: the dict of movie data
+    :return: the seconds and the set of edges
+    """
+    gc.collect()
+    start = time.perf_counter()
+    graph = function(actor_data, movie_data)
+    seconds = time.perf_counter() - start
+    return seconds, graph.get_edges()
+
+
+if __name__ == "__main__":
+    rand = random.Random(SEED)
+    print("%6s %8s %8s %8s %14s %14s %8s" % ("scale", "actors", "movies", "edges", "three-phase", "build_graph",
+                                             "speedup"))
+    for scale in SCALES:
+        actor_data, movie_data = synthetic_data(scale, rand)
+        old_seconds, old_edges = measure(three_phase_build, actor_data, movie_data)
+        new_seconds, new_edges = measure(build_graph, actor_data, movie_data)
+        assert old_edges == new_edges
+        print("%5dx %8d %8d %8d %11.1f ms %11.1f ms %7.2fx"
+              % (scale, len(actor_data), len(movie_data), len(new_edges), old_seconds * 1e3,
+                 new_seconds * 1e3, old_seconds / new_seconds))
@@ -0,0 +1,103 @@
+from inspect import getsourcefile
+import os.path as path, sys
+
+# enable import from other module directories
+current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
+sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
+
+import gc
+import json
+import tracemalloc
+from model.graph import Graph, Vertex
+from model.csr_graph import CSRGraph
+from controller.graph_lib import add_edges
+
+# Compares bytes per vertex and per edge of graph structures built from data.json. Contents are loaded before
+# measuring, so only the memory added by vertices, neighbor dicts, sibling sets and edges is counted.
+ACTOR_MOVIE_FILE_PATH = path.join(current_dir, '..', 'data', 'data.json')
+
+
+class DictVertex(Vertex):
+    """
+    The vertex with a per-instance dict, as before slots
+    """
+
+
+class DictGraph(Graph):
+    """
+    The graph of dict vertices without name interning, as before
+    """
+
+    vertex_type = DictVertex
+
+    def intern_name(self, name):
+        return name
+
+
+def load_contents():
+    """
+    Loads data.json and converts contents like construct_graph_single
+    :return: the dict of actor contents and the dict of movie contents
+    """
+    with open(ACTOR_MOVIE_FILE_PATH, encoding='utf-8') as data_file:
+        actor_data, movie_data = json.load(data_file)
+    actors, movies = {}, {}
+    for content in actor_data.values():
+        content.pop("json_class")
+        # Names are copied, as they are when records come from separate files
+        actors[''.join(content["name"])] = content
+    for content in movie_data.values():
+        content.pop("json_class")
+        content['url'] = content.pop('wiki_page')
+        content['gross'] = content.pop('box_office')
+        movies[''.join(content["name"])] = content
+    return actors, movies
+
+
+def measure_graph(graph_type):
+    """
+    Measures the memory of vertices and edges of a graph type
+    :param graph_type: Graph or a subclass
+    :return: the number of vertices, bytes of vertices, the number of edges and bytes of edges
+    """
+    actors, movies = load_contents()
+    gc.collect()
+    tracemalloc.start()
+    graph = graph_type()
+    for name, content in actors.items():
+        graph.add_actor_vertex(name, content)
+    for name, content in movies.items():
+        graph.add_movie_vertex(name, content)
+    vertex_bytes = tracemalloc.get_traced_memory()[0]
+    add_edges(graph)
+    graph.add_actor_siblings()
+    edge_bytes = tracemalloc.get_traced_memory()[0] - vertex_bytes
+    tracemalloc.stop()
+    return len(graph.get_all_vertices()), vertex_bytes, len(graph.get_edges()), edge_bytes
+
+
+def measure_csr_graph():
+    """
+    Measures the memory of a CSRGraph built from data.json
+    :return: the number of vertices, bytes of vertices, the number of edges and bytes of edges
+    """
+    with open(ACTOR_MOVIE_FILE_PATH, encoding='utf-8') as data_file:
+        actor_movie_data = json.load(data_file)
+    gc.collect()
+    tracemalloc.start()
+    graph = CSRGraph.from_json(actor_movie_data)
+    total_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Copied contents are part of from_json, count them as vertex memory
+    edge_bytes = graph.get_memory_size()
+    return len(graph.get_all_vertices()), total_bytes - edge_bytes, graph.get_edge_number(), edge_bytes
+
+
+if __name__ == "__main__":
+    print("%-28s %10s %12s %10s %12s" % ("graph", "vertices", "bytes/vertex", "edges", "bytes/edge"))
+    for label, measure in (("dict vertex (before)", lambda: measure_graph(DictGraph)),
+                           ("slots + interning (after)", lambda: measure_graph(Graph)),
+                           ("CSRGraph", measure_csr_graph)):
+        vertex_number, vertex_bytes, edge_number, edge_bytes = measure()
+        print("%-28s %10d %12.1f %10d %12.1f" % (label, vertex_number, vertex_bytes / vertex_number,
+                                                 edge_number, edge_bytes / edge_number))
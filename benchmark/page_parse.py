@@ -0,0 +1,67 @@
+from inspect import getsourcefile
+import os.path as path, sys
+
+# enable import from other module directories
+current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
+sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
+
+import time
+from lxml import etree
+from model.data_crawler import parse_actor_page
+from model.parser_backend import make_document, HTML_PARSER, LXML
+
+# Measures where parse time of a large actor page goes: building the whole tree, extracting the regions the
+# parser reads, and parsing only those regions as a lower bound of targeted extraction
+FILM_NUMBER = 300
+PARAGRAPH_NUMBER = 600
+URL = "https://en.wikipedia.org/wiki/Big_Actor"
+REPEAT = 20
+
+
+def build_page():
+    """
+    Builds an actor page shaped like Wikipedia: a heading and infobox, long body text with citations, the
+    filmography table and the references
+    :return: the bytes of page and the bytes of the regions the parser reads
+    """
+    head = ('<html><head><meta charset="UTF-8"><link rel="canonical" href="%s"></head><body>'
+            '<h1 id="firstHeading" class="firstHeading">Big Actor</h1><table class="infobox biography vcard"><tr>'
+            '<td>Born 1950 <span class="noprint ForceAgeToShow">(age 67)</span></td></tr></table>' % URL)
+    body = "".join('<p>Paragraph %d with <a href="/wiki/Link_%d">a link</a> and a citation<sup class="reference">'
+                   '<a href="#cite_note-%d">[%d]</a></sup>. %s</p>\n' % (i, i, i, i, "Lorem ipsum dolor. " * 12)
+                   for i in range(PARAGRAPH_NUMBER))
+    films = ('<h2><span class="mw-headline" id="Filmography">Filmography</span></h2><table class="wikitable">'
+             '<tr><th>Year</th><th>Title</th></tr>' +
+             "".join('<tr><td>%d</td><td><i><a href="/wiki/Film_%d">Film %d</a></i></td><td>Role</td></tr>\n'
+                     % (1950 + i % 60, i, i) for i in range(FILM_NUMBER)) + '</table>')
+    references = '<ol class="references">' + "".join(
+        '<li id="cite_note-%d"><a class="external" href="http://example.org/%d">Ref %d</a></li>\n' % (i, i, i)
+        for i in range(PARAGRAPH_NUMBER)) + '</ol></body></html>'
+    return (head + body + films + references).encode('utf-8'), (head + films + '</body></html>').encode('utf-8')
+
+
+def best_time(function, repeat=REPEAT):
+    """
+    Gets the best time of repeated calls
+    :param function: the function without arguments
+    :param repeat: the number of calls
+    :return: the seconds
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+if __name__ == "__main__":
+    page, regions = build_page()
+    parser = etree.HTMLParser(encoding='utf-8')
+    print("page %d KB, regions read by the parser %d KB" % (len(page) // 1024, len(regions) // 1024))
+    print("lxml tree of whole page:       %8.2f ms" % (best_time(lambda: etree.fromstring(page, parser)) * 1e3))
+    print("lxml tree of regions only:     %8.2f ms" % (best_time(lambda: etree.fromstring(regions, parser)) * 1e3))
+    print("parse_actor_page, lxml:        %8.2f ms" % (best_time(lambda: parse_actor_page(page, URL, LXML)) * 1e3))
+    print("parse_actor_page, regions:     %8.2f ms" % (best_time(lambda: parse_actor_page(regions, URL, LXML)) * 1e3))
+    print("parse_actor_page, html.parser: %8.2f ms"
+          % (best_time(lambda: parse_actor_page(page, URL, HTML_PARSER), 3) * 1e3))
@@ -0,0 +1,100 @@
+from inspect import getsourcefile
+import os.path as path, sys
+
+# enable import from other module directories
+current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
+sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
+
+import json
+import random
+import time
+from controller.graph_lib import construct_graph_single
+from controller.path_engine import find_path, find_paths
+
+# Measures latency of path queries between random actor pairs of data.json
+ACTOR_MOVIE_FILE_PATH = path.join(current_dir, '..', 'data', 'data.json')
+PAIR_NUMBER = 2000
+SOURCE_NUMBER = 20  # The number of sources of the batch workload, each with PAIR_NUMBER / SOURCE_NUMBER targets
+SEED = 0
+
+
+def bfs_path(graph, source, target):
+    """
+    Finds a shortest chain by plain BFS from source, the baseline of bidirectional BFS
+    :param graph: the graph class
+    :param source: the first actor name
+    :param target: the second actor name
+    :return: the chain or None
+    """
+    actor_vertices, movie_vertices = graph.get_actor_vertices(), graph.get_movie_vertices()
+    parents, frontier = {source: None}, [source]
+    while frontier and target not in parents:
+        next_frontier = []
+        for actor in frontier:
+            for movie in actor_vertices[actor].get_neighbors():
+                for co_star in movie_vertices[movie].get_neighbors():
+                    if co_star not in parents:
+                        parents[co_star] = (actor, movie)
+                        next_frontier.append(co_star)
+        frontier = next_frontier
+    if target not in parents:
+        return None
+    chain, link = [target], parents[target]
+    while link is not None:
+        chain[:0] = [link[0], link[1]]
+        link = parents[link[0]]
+    return chain
+
+
+def measure(function, graph, pairs):
+    """
+    Measures latency of a path function on pairs
+    :param function: the function of graph, source and target
+    :param graph: the graph class
+    :param pairs: the list of actor pairs
+    :return: the sorted list of seconds
+    """
+    latencies = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        function(graph, source, target)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def report(label, latencies):
+    """
+    Prints mean and percentiles of latencies in microseconds
+    :param label: the name of measurement
+    :param latencies: the sorted list of seconds
+    """
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1e6
+
+    print("%-24s mean %8.1f us  p50 %8.1f us  p95 %8.1f us  max %8.1f us"
+          % (label, sum(latencies) / len(latencies) * 1e6, percentile(0.5), percentile(0.95), latencies[-1] * 1e6))
+
+
+if __name__ == "__main__":
+    with open(ACTOR_MOVIE_FILE_PATH, encoding='utf-8') as data_file:
+        graph = construct_graph_single(json.load(data_file))
+    actors = list(graph.get_actor_vertices())
+    rand = random.Random(SEED)
+    pairs = [(rand.choice(actors), rand.choice(actors)) for _ in range(PAIR_NUMBER)]
+    print("%d actors, %d movies, %d pairs" % (len(actors), len(graph.get_movie_vertices()), len(pairs)))
+
+    report("plain BFS", measure(bfs_path, graph, pairs))
+    report("bidirectional BFS", measure(find_path, graph, pairs))
+    report("bidirectional, depth 2", measure(lambda g, s, t: find_path(g, s, t, max_depth=2), graph, pairs))
+
+    sources = rand.sample(actors, SOURCE_NUMBER)
+    batch_pairs = [(source, rand.choice(actors)) for source in sources for _ in range(PAIR_NUMBER // SOURCE_NUMBER)]
+    start = time.perf_counter()
+    for source, target in batch_pairs:
+        find_path(graph, source, target)
+    single_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    find_paths(graph, batch_pairs)
+    batch_seconds = time.perf_counter() - start
+    print("batch of %d pairs from %d sources: %.1f ms one by one, %.1f ms with find_paths"
+          % (len(batch_pairs), SOURCE_NUMBER, single_seconds * 1e3, batch_seconds * 1e3))
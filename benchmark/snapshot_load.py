@@ -0,0 +1,64 @@
+from inspect import getsourcefile
+import os.path as path, sys
+
+# enable import from other module directories
+current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
+sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
+
+import json
+import tempfile
+import time
+from controller.graph_lib import construct_graph_single
+from model.csr_graph import CSRGraph
+from model.graph_snapshot import save_snapshot, load_snapshot
+
+# Compares startup from data.json with loading a snapshot of the built graph
+ACTOR_MOVIE_FILE_PATH = path.join(current_dir, '..', 'data', 'data.json')
+REPEAT = 5
+
+
+def best_time(function):
+    """
+    Measures the best time of repeated calls
+    :param function: the function without arguments
+    :return: the best seconds and the last result
+    """
+    best, result = None, None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def build_graph():
+    """
+    Builds the Graph from data.json as graph_lib does
+    :return: the Graph
+    """
+    with open(ACTOR_MOVIE_FILE_PATH, encoding='utf-8') as data_file:
+        return construct_graph_single(json.load(data_file))
+
+
+def build_frozen_graph():
+    """
+    Builds the CSRGraph from data.json
+    :return: the CSRGraph
+    """
+    with open(ACTOR_MOVIE_FILE_PATH, encoding='utf-8') as data_file:
+        return CSRGraph.from_json(json.load(data_file))
+
+
+if __name__ == "__main__":
+    build_seconds, graph = best_time(build_graph)
+    frozen_seconds, _ = best_time(build_frozen_graph)
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        save_snapshot(graph, snapshot_dir)
+        load_seconds, snapshot = best_time(lambda: load_snapshot(snapshot_dir))
+        first_query_seconds, _ = best_time(lambda: snapshot.get_actor_vertices()["Bruce Willis"].get_siblings())
+    print("%d actors, %d movies" % (len(graph.get_actor_vertices()), len(graph.get_movie_vertices())))
+    print("json + construct_graph_single: %8.2f ms" % (build_seconds * 1e3))
+    print("json + CSRGraph.from_json:     %8.2f ms" % (frozen_seconds * 1e3))
+    print("load_snapshot:                 %8.2f ms" % (load_seconds * 1e3))
+    print("siblings of one actor:         %8.3f ms" % (first_query_seconds * 1e3))
@@ -3,36 +3,44 @@ import numpy as np
 import matplotlib.pyplot as plt
 from collections import defaultdict
 from scipy.optimize import curve_fit
+from model.utils import select_largest_k
+from controller.communities import label_propagation, get_communities
 
 IMAGE_DIR = "../img/"
 
 
-def hub_actors(graph, number=10, save_fig=True):
+def hub_actors(graph, number=10, save_fig=True, matrix=None, rank_by=None, filename=None):
     """
     Create data analysis with image for hub actors in graph
     :param graph: the input graph
     :param number: the maximum number of actors for analysis image
     :param save_fig: if we expect to save the image or not
-    :return: a list of actor names with connection numbers
+    :param matrix: the IncidenceMatrix of graph to count siblings without add_actor_siblings, or None
+    :param rank_by: the content key of centrality scores written by controller.centrality to rank actors by, or None
+    to rank by connection number
+    :param filename: the file name of image, or None to name it by title
+    :return: a list of actor names with connection numbers or scores
     """
-    actor_vertices = graph.get_actor_vertices()
-    for actor_name in actor_vertices:
-        actor_vertices[actor_name].set_compare_value(len(actor_vertices[actor_name].get_siblings()))
-
-    sorted_actors = sorted(actor_vertices.items(), key=operator.itemgetter(1))
-    # Selects the "number" of tail
-    sorted_actors = sorted_actors[:-(number + 1):-1]
-
     actor_names, conn_numbers = [], []
-    for actor in sorted_actors:
-        actor_name = actor[0]
-        conn_number = actor_vertices[actor_name].get_compare_value()
-        actor_names.append(actor_name)
-        conn_numbers.append(conn_number)
+    if matrix is not None and rank_by is None:
+        for actor_name, conn_number in matrix.top_actors(matrix.get_sibling_counts(), number):
+            actor_names.append(actor_name)
+            conn_numbers.append(conn_number)
+    else:
+        actor_vertices = graph.get_actor_vertices()
+        if rank_by is None:
+            values = ((name, len(vertex.get_siblings())) for name, vertex in actor_vertices.items())
+        else:
+            values = ((name, vertex.get_content().get(rank_by, 0.0)) for name, vertex in actor_vertices.items())
+        for actor_name, conn_number in select_largest_k(values, number):
+            actor_names.append(actor_name)
+            conn_numbers.append(conn_number)
 
     # Create chart and save image
-    create_bar_chart(actor_names, conn_numbers, xlabel="Actor Names", ylabel='Actor Connection Number',
-                     title="Hub Actor Analysis", save_fig=save_fig)
+    create_bar_chart(actor_names, conn_numbers, xlabel="Actor Names",
+                     ylabel='Actor Connection Number' if rank_by is None else rank_by,
+                     title="Hub Actor Analysis" if rank_by is None else "Hub Actor Analysis by " + rank_by,
+                     save_fig=save_fig, filename=filename)
 
     return list(zip(actor_names, conn_numbers))
 
@@ -61,25 +69,52 @@ def grossing_vs_age(graph, save_fig=True):
                              , title="Correlation between Age and Grossing Value", save_fig=save_fig)
 
 
-def movie_year_percentage(graph, save_fig=True):
+def movie_year_percentage(graph, save_fig=True, matrix=None):
     """
     Create the data analysis about movie yearly production and build pie chart for presentation
     :param graph: the input graph
     :param save_fig: if we expect to save the image or not
+    :param matrix: the IncidenceMatrix of graph to count movies per year, or None
     """
     relation = defaultdict(int)
-    movie_vertices = graph.get_movie_vertices()
-    for movie_name in movie_vertices:
-        content = movie_vertices[movie_name].get_content()
-        if content['year'] > 1800:
-            relation[content['year'] // 10 * 10] += 1
+    if matrix is not None:
+        for year, aggregate in matrix.get_year_aggregates().items():
+            if year > 1800:
+                relation[year // 10 * 10] += aggregate['movies']
+    else:
+        movie_vertices = graph.get_movie_vertices()
+        for movie_name in movie_vertices:
+            content = movie_vertices[movie_name].get_content()
+            if content['year'] > 1800:
+                relation[content['year'] // 10 * 10] += 1
 
     years, movie_numbers = get_sorted_lists_from_dict(relation)
     years = [str(year) + "s" for year in years]
     create_pie_chart(years, movie_numbers, "Movie Production and Year", save_fig=save_fig)
 
 
-def create_bar_chart(X, Y, xlabel, ylabel, title, save_fig):
+def community_sizes(graph, number=10, save_fig=True, labels=None):
+    """
+    Create data analysis with image for the largest communities of actors
+    :param graph: the input graph with actor siblings
+    :param number: the maximum number of communities for analysis image
+    :param save_fig: if we expect to save the image or not
+    :param labels: the dict of actor names and community labels of label_propagation, or None to detect them
+    :return: a list of community labels with sizes
+    """
+    if labels is None:
+        labels = label_propagation(graph, seed=0)
+    communities = [(label, len(actors)) for label, actors in get_communities(labels)[:number]]
+
+    # Communities are named after their label actor
+    create_bar_chart([label for label, _ in communities], [size for _, size in communities],
+                     xlabel="Community of Actor", ylabel="Actor Number", title="Actor Community Analysis",
+                     save_fig=save_fig)
+
+    return communities
+
+
+def create_bar_chart(X, Y, xlabel, ylabel, title, save_fig, filename=None):
     """
     Create and save a bar chart by X values and Y values
     :param X: the list of X coordinate values
@@ -88,8 +123,10 @@ def create_bar_chart(X, Y, xlabel, ylabel, title, save_fig):
     :param ylabel: the name of y label
     :param title: the title of image
     :param save_fig: if we expect to save the image or not
+    :param filename: the file name of image, or None to name it by title
     """
     assert len(X) == len(Y)
+    plt.clf()
     y_pos = np.arange(len(X))
 
     cm = plt.cm.get_cmap('RdYlBu_r')
@@ -105,7 +142,7 @@ def create_bar_chart(X, Y, xlabel, ylabel, title, save_fig):
     plt.title(title)
     plt.tight_layout()
     if save_fig:
-        plt.savefig("../img/" + title)
+        plt.savefig("../img/" + (filename or title))
 
 
 def create_scatter_fit_curve(X, Y, xlabel, ylabel, title, save_fig):
@@ -167,7 +204,8 @@ def autolabel(rects):
     # attach some text labels
     for rect in rects:
         height = rect.get_height()
-        plt.text(rect.get_x() + rect.get_width() / 2., height, '%d' % int(height),
+        label = '%d' % int(height) if float(height).is_integer() else '%.3g' % height
+        plt.text(rect.get_x() + rect.get_width() / 2., height, label,
                  ha='center', va='bottom')
 
 
@@ -1,3 +1,10 @@
+from inspect import getsourcefile
+import os.path as path, sys
+
+# enable import from other module directories
+current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
+sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
+
 import os
 from flask import Flask, json
 from flask import jsonify
@@ -6,45 +13,60 @@ from flask import make_response
 from flask import Response
 from flask import abort
 from urllib.parse import unquote
+import argparse
+from model.ndjson_io import load_records
+from controller.graph_lib import construct_graph, add_actor, add_movie, update_actor, update_movie, remove_actor, \
+    remove_movie
+from controller.path_engine import find_path, find_paths
+from controller.query_planner import DataIndex, parse_query, normalize_query
+from model.lru_cache import LRUCache
 
 app = Flask(__name__)
 
-ENCODE_STRING = "****"
+PLAN_CACHE_SIZE = 1024  # The number of raw query strings with cached parsed queries
+RESULT_CACHE_SIZE = 256  # The number of normalized queries with cached sorted names of results
+# Query arguments of list endpoints which are not filter clauses
+LIMIT = 'limit'
+OFFSET = 'offset'
+FIELDS = 'fields'
+FORMAT = 'format'
+JSON_FORMAT = 'json'
+NDJSON_FORMAT = 'ndjson'
 SITE_ROOT = os.path.realpath(os.path.dirname(__file__))
 json_url = os.path.join(SITE_ROOT, "../data", "data.json")
 actor_movie_data = json.load(open(json_url, encoding='utf-8'), encoding="utf-8")
 actor_data = actor_movie_data[0]
 movie_data = actor_movie_data[1]
+# The indexes of backend data for queries, kept current by write requests
+actor_index = DataIndex(actor_data)
+movie_index = DataIndex(movie_data)
+# Parsed queries by raw query string, and query results by index, data version and normalized query
+_plan_cache = LRUCache(PLAN_CACHE_SIZE)
+_result_cache = LRUCache(RESULT_CACHE_SIZE)
+# The graph of backend data for path queries, built on first use and updated in place by write requests
+_graph = None
 
 
 @app.route('/api/actors', methods=['GET'])
 def get_actors():
     """
-    Get dict of actors in json format satisfying query statement
-    :return: the json of dictionary of actors
+    Get dict of actors in json format satisfying query statement, optionally paginated by "limit" and "offset",
+    projected to comma separated "fields" and streamed as NDJSON with "format=ndjson"
+    :return: the json of dictionary of actors, with the number of all matching actors in header X-Total-Count
     """
-    query = request.query_string.decode("utf-8")
-    query = unquote(query)
-    query = query.replace('"', "")
-
-    query_result = _query_data(actor_data, query)
-    return jsonify(query_result)
+    names, options = _query_data(actor_index, request.query_string.decode("utf-8"))
+    return _make_list_response(actor_index.data, names, options)
 
 
 @app.route('/api/movies', methods=['GET'])
 def get_movies():
     """
-    Get dict of movies in json format satisfying query statement
-    :return: the json of dictionary of movies
+    Get dict of movies in json format satisfying query statement, optionally paginated by "limit" and "offset",
+    projected to comma separated "fields" and streamed as NDJSON with "format=ndjson"
+    :return: the json of dictionary of movies, with the number of all matching movies in header X-Total-Count
     """
-    query = request.query_string.decode("utf-8")
-    # replace %xx escapes by their single-character equivalent
-    query = unquote(query)
-    # remove double quotation marks in query string
-    query = query.replace('"', "")
-
-    query_result = _query_data(movie_data, query)
-    return jsonify(query_result)
+    names, options = _query_data(movie_index, request.query_string.decode("utf-8"))
+    return _make_list_response(movie_index.data, names, options)
 
 
 @app.route('/api/actors/<string:actor_name>', methods=['GET'])
@@ -81,7 +103,7 @@ def put_actor(actor_name):
     :param actor_name: the actor name
     :return: the json of success information with code 200 or abort 400
     """
-    return _put_data(actor_name, actor_data, request.json)
+    return _put_data(actor_name, actor_index, request.json, update_actor)
 
 
 @app.route('/api/movies/<string:movie_name>', methods=['PUT'])
@@ -91,7 +113,7 @@ def put_movie(movie_name):
     :param movie_name: the movie name
     :return: the json of success information with code 200 or abort 400
     """
-    return _put_data(movie_name, movie_data, request.json)
+    return _put_data(movie_name, movie_index, request.json, update_movie)
 
 
 @app.route('/api/actors', methods=['POST'])
@@ -100,7 +122,7 @@ def post_actor():
     Post the new actor information
     :return: the json of success information with code 201 or abort 400
     """
-    return _post_data(actor_data, request.json)
+    return _post_data(actor_index, request.json, add_actor)
 
 
 @app.route('/api/movies', methods=['POST'])
@@ -109,7 +131,7 @@ def post_movie():
     Post the new movie information
     :return: the json of success information with code 201 or abort 400
     """
-    return _post_data(movie_data, request.json)
+    return _post_data(movie_index, request.json, add_movie)
 
 
 @app.route('/api/actors/<string:actor_name>', methods=['DELETE'])
@@ -119,7 +141,7 @@ def delete_actor(actor_name):
     :param actor_name: the actor name
     :return: the json of success information with code 200 or abort 400
     """
-    return _delete_data(actor_data, actor_name)
+    return _delete_data(actor_index, actor_name, remove_actor)
 
 
 @app.route('/api/movies/<string:movie_name>', methods=['DELETE'])
@@ -129,7 +151,56 @@ def delete_movie(movie_name):
     :param movie_name: the movie name
     :return: the json of success information with code 200 or abort 400
     """
-    return _delete_data(movie_data, movie_name)
+    return _delete_data(movie_index, movie_name, remove_movie)
+
+
+@app.route('/api/path', methods=['GET'])
+def get_path():
+    """
+    Get the shortest chain of actors and movies connecting two actors, given by query arguments "from" and "to"
+    and optionally "max_depth"
+    :return: the json of path and degrees of separation, which are null if not connected, or abort 400 or 404
+    """
+    source, target = request.args.get('from'), request.args.get('to')
+    if not source or not target:
+        abort(400)
+    max_depth = _get_max_depth(request.args.get('max_depth'))
+    try:
+        path = find_path(_get_graph(), source, target, max_depth)
+    except KeyError:
+        abort(404)
+    return jsonify(_make_path_result(source, target, path))
+
+
+@app.route('/api/paths', methods=['POST'])
+def post_paths():
+    """
+    Get the shortest chains of many actor pairs given by request json {"pairs": [[from, to], ...]} and optionally
+    "max_depth"
+    :return: the json of list of paths or abort 400 or 404
+    """
+    request_json = request.get_json(silent=True)
+    if not isinstance(request_json, dict) or not isinstance(request_json.get('pairs'), list):
+        abort(400)
+    pairs = request_json['pairs']
+    if not all(isinstance(pair, list) and len(pair) == 2 and all(isinstance(name, str) for name in pair)
+               for pair in pairs):
+        abort(400)
+    max_depth = _get_max_depth(request_json.get('max_depth'))
+    try:
+        paths = find_paths(_get_graph(), [tuple(pair) for pair in pairs], max_depth)
+    except KeyError:
+        abort(404)
+    return jsonify([_make_path_result(source, target, path) for (source, target), path in zip(pairs, paths)])
+
+
+@app.route('/api/cache', methods=['GET'])
+def get_cache_stats():
+    """
+    Get the statistics of the query plan cache and the query result cache
+    :return: the json of hits, misses, evictions, size and max_size of both caches
+    """
+    return jsonify({'plans': _plan_cache.get_stats(), 'results': _result_cache.get_stats()})
 
 
 @app.errorhandler(400)
@@ -152,30 +223,86 @@ def not_found(error):
     return make_response(jsonify({'error': 'Not Found'}), 404)
 
 
-def _put_data(name, data, request_json):
+def _get_graph():
+    """
+    Gets the graph of backend data, built on first use
+    :return: the graph
+    """
+    global _graph
+    if _graph is None:
+        _graph = construct_graph(actor_data, movie_data)
+    return _graph
+
+
+def _invalidate_graph():
+    """
+    Drops the graph after backend data is replaced
+    """
+    global _graph
+    _graph = None
+
+
+def _get_max_depth(value):
+    """
+    Parses the max depth of path queries
+    :param value: the max depth from request or None
+    :return: the integer max depth or None, or abort 400
+    """
+    if value is None:
+        return None
+    try:
+        max_depth = int(value)
+    except (TypeError, ValueError):
+        abort(400)
+    if max_depth < 0:
+        abort(400)
+    return max_depth
+
+
+def _make_path_result(source, target, path):
+    """
+    Makes the json result of a path query
+    :param source: the first actor name
+    :param target: the second actor name
+    :param path: the chain of names or None
+    :return: the dict of result
+    """
+    return {'from': source, 'to': target, 'path': path, 'degrees': len(path) // 2 if path is not None else None}
+
+
+def _put_data(name, index, request_json, update_graph):
     """
     Updates information from request json to backend data's key name
     :param name: the name of key in dict of data
-    :param data: the dict of data
+    :param index: the DataIndex of the dict of data
     :param request_json: the json request
+    :param update_graph: the function of graph, name and changes updating the graph if built
     :return: the json of success information with code 200 or abort 400
     """
+    data = index.data
     name = name.replace("_", " ")
     if not request_json or name not in data:
         abort(400)
 
+    # The graph shares records with data, so indexes drop the record before either changes it
+    index.remove(name)
+    if _graph is not None:
+        update_graph(_graph, name, request_json)
     for attr in request_json:
         data[name][attr] = request_json[attr]
+    index.add(name)
     return json.dumps({'success': True}), 200, {'ContentType': 'application/json'}
 
 
-def _post_data(data, request_json):
+def _post_data(index, request_json, add_graph):
     """
     Post new data from request json to backend data
-    :param data: the dict of data
+    :param index: the DataIndex of the dict of data
     :param request_json: the json request
+    :param add_graph: the function of graph, name and content adding to the graph if built
     :return: the json of success information with code 201 or abort 400
     """
+    data = index.data
     if not request_json or 'name' not in request_json:
         abort(400)
 
@@ -184,95 +311,154 @@ def _post_data(data, request_json):
         # Should use "PUT" method
         abort(400)
     data[name] = request.json
+    if _graph is not None:
+        add_graph(_graph, name, data[name])
+    index.add(name)
 
     return json.dumps({'success': True}), 201, {'ContentType': 'application/json'}
 
 
-def _delete_data(data, name):
+def _delete_data(index, name, remove_graph):
     """
     Delete the data according to given name key
-    :param data: the dict of data
+    :param index: the DataIndex of the dict of data
     :param name: the name key
+    :param remove_graph: the function of graph and name removing from the graph if built
     :return: the json of success information with code 200 or abort 400
     """
+    data = index.data
     name = name.replace("_", " ")
     if name not in data:
         abort(400)
 
+    index.remove(name)
     data.pop(name)
+    if _graph is not None:
+        remove_graph(_graph, name)
     return json.dumps({'success': True}), 200, {'ContentType': 'application/json'}
 
 
-def _query_data(data, query):
+def _query_data(index, query):
     """
-    Query data according to input query string and additionally deal with boolean AND and OR logics.
-    :param data: the dict of backend data
-    :param query: the query string
-    :return: dict of query result
+    Query data according to input query string of clauses joined by boolean AND or OR. Clauses compare attributes
+    by "=", which also matches substrings of names, or by ">=", "<=", ">" and "<" on numbers. Matching names are
+    sorted and cached until the next write to data.
+    :param index: the DataIndex of the dict of backend data
+    :param query: the raw query string of request
+    :return: the sorted list of matching names and the dict of list options
     """
-    # Encode "&" in query attr_values to remove confusion with operator AND. For example, name="Harry & Son"&year=1984
-    query = _encode_and(query)
-    if "|" in query and "&" in query:
-        abort(400)
-    AND = False
-    if "|" in query:
-        query = query.split("|")
-    else:
-        query = query.split("&")
-        AND = True
-    query = _decode_and(query)
+    clauses, conjunction, normalized, options = _get_plan(query)
+    key = (index, index.version, normalized)
+    names = _result_cache.get(key)
+    if names is None:
+        try:
+            names = index.evaluate(clauses, conjunction)
+        except KeyError:
+            # Attributes not in every record
+            abort(400)
+        # Sorted so pages of a query do not overlap
+        names = sorted(names, key=str)
+        _result_cache.put(key, names)
+    return names, options
 
-    candidate_names_all_query = []
 
-    for q in query:
-        q = q.split("=")
-        q = [entry for entry in q if entry]
-        if len(q) != 2:
-            # Should have left hand side and right hand side
-            abort(400)
-        candidate_names = set()
-        attr, attr_value = q[0], q[1]
+def _get_plan(query):
+    """
+    Gets the parsed query of a raw query string from the plan cache, parsing it on miss
+    :param query: the raw query string of request
+    :return: the list of Clause, True for AND or False for OR, the normalized query and the dict of list options,
+    or abort 400
+    """
+    plan = _plan_cache.get(query)
+    if plan is None:
+        filter_query, options = _split_options(query)
+        # replace %xx escapes by their single-character equivalent and remove double quotation marks
+        text = unquote(filter_query).replace('"', "")
         try:
-            attr_value = int(attr_value)
-        except:
-            pass
-        for name in data:
-            if attr not in data[name]:
+            clauses, conjunction = parse_query(text)
+        except ValueError:
+            abort(400)
+        plan = clauses, conjunction, normalize_query(clauses, conjunction), options
+        _plan_cache.put(query, plan)
+    return plan
+
+
+def _split_options(query):
+    """
+    Splits list options "limit", "offset", "fields" and "format" from the filter clauses of a raw query string
+    :param query: the raw query string of request
+    :return: the raw query string of filter and the dict of list options, or abort 400
+    """
+    options = {LIMIT: None, OFFSET: 0, FIELDS: None, FORMAT: JSON_FORMAT}
+    clauses = []
+    for part in query.split("&"):
+        option, _, value = part.partition("=")
+        if option not in options:
+            clauses.append(part)
+            continue
+        value = unquote(value).replace('"', "")
+        if option in (LIMIT, OFFSET):
+            try:
+                value = int(value)
+            except ValueError:
                 abort(400)
-            if data[name][attr] == attr_value:
-                candidate_names.add(name)
-            elif attr == 'name' and attr_value in data[name][attr]:
-                candidate_names.add(name)
-        candidate_names_all_query.append(candidate_names)
-
-    if AND:
-        # Gets the intersections between candidates
-        candidate_names_all_query = set.intersection(*candidate_names_all_query)
-    else:
-        # Gets the union between candidates
-        candidate_names_all_query = set.union(*candidate_names_all_query)
-
-    return [data[name] for name in candidate_names_all_query]
+            if value < 0:
+                abort(400)
+        elif option == FIELDS:
+            value = [field for field in value.split(",") if field]
+            if not value:
+                abort(400)
+        elif value not in (JSON_FORMAT, NDJSON_FORMAT):
+            abort(400)
+        options[option] = value
+    return "&".join(clauses), options
 
 
-def _encode_and(string):
+def _make_list_response(data, names, options):
     """
-    Encode string with " & " and replace with ENCODE_STRING
-    :param query: the input string
-    :return: the encoded string
-    """
-    string = string.split(" & ")
-    return ENCODE_STRING.join(string)
+    Makes the response of a list query. Records of the page are looked up and projected one at a time, and NDJSON
+    responses write each one as it is produced. All matching names are still evaluated and sorted before the first
+    record, so time to first byte and the cached name list grow with the number of matches, not with the limit.
+    :param data: the dict of backend data
+    :param names: the sorted list of all matching names
+    :param options: the dict of list options
+    :return: the json response of the page of records, or the streaming NDJSON response
+    """
+    offset, limit, fields = options[OFFSET], options[LIMIT], options[FIELDS]
+    page_names = names[offset:] if limit is None else names[offset:offset + limit]
+    # Records deleted while streaming are skipped
+    page = (data[name] for name in page_names if name in data)
+    if fields is not None:
+        page = ({field: record[field] for field in fields if field in record} for record in page)
+    if options[FORMAT] == NDJSON_FORMAT:
+        response = Response((json.dumps(record, ensure_ascii=False) + "\n" for record in page),
+                            mimetype='application/x-ndjson')
+    else:
+        response = jsonify(list(page))
+    response.headers['X-Total-Count'] = str(len(names))
+    return response
 
 
-def _decode_and(query_list):
+def load_ndjson_data(actor_file_path, movie_file_path):
     """
-    Decode list of query strings by replacing ENCODE_STRING with " & "
-    :param query_list: the input list of query strings
-    :return: the decoded list of strings
+    Replace backend data with records streamed from NDJSON files written by the crawler
+    :param actor_file_path: the NDJSON file of actors, which may be gzip compressed
+    :param movie_file_path: the NDJSON file of movies, which may be gzip compressed
     """
-    return [query.replace(ENCODE_STRING, " & ") for query in query_list]
+    actor_data.clear()
+    actor_data.update(load_records(actor_file_path))
+    movie_data.clear()
+    movie_data.update(load_records(movie_file_path))
+    actor_index.clear()
+    movie_index.clear()
+    _invalidate_graph()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve actor and movie data")
+    parser.add_argument('--actors', help="the NDJSON file of actors to serve instead of data.json")
+    parser.add_argument('--movies', help="the NDJSON file of movies to serve instead of data.json")
+    args = parser.parse_args()
+    if args.actors and args.movies:
+        load_ndjson_data(args.actors, args.movies)
     app.run(debug=True)
@@ -0,0 +1,123 @@
+import random
+from collections import deque
+import numpy as np
+
+PAGERANK = 'pagerank'
+WEIGHTED_DEGREE = 'weighted_degree'
+BETWEENNESS = 'betweenness'
+
+
+def pagerank(matrix, damping=0.85, tolerance=1e-8, max_iterations=100, start=None):
+    """
+    Computes PageRank of actors on the co-star graph by sparse power iteration. Two actors are linked with the
+    number of movies they share as weight, and actors without co-stars spread their rank evenly.
+    :param matrix: the IncidenceMatrix
+    :param damping: the probability of following a link instead of jumping to a random actor
+    :param tolerance: the L1 change of scores below which iteration stops
+    :param max_iterations: the maximum number of iterations
+    :param start: the dict of actor names and previous scores to warm start from, or None for uniform scores
+    :return: the array of scores by actor id summing to 1 and the number of iterations run
+    """
+    actor_number = len(matrix.actor_names)
+    if actor_number == 0:
+        return np.zeros(0), 0
+    co_star = matrix.get_co_star_matrix()
+    out_weights = np.asarray(co_star.sum(axis=1)).ravel()
+    dangling = out_weights == 0
+    inverse_out = np.divide(1.0, out_weights, out=np.zeros(actor_number), where=~dangling)
+    # The transposed matrix maps scaled scores of actors to the rank flowing into their co-stars
+    flow = co_star.T.tocsr()
+
+    scores = _start_scores(matrix, start)
+    for iteration in range(1, max_iterations + 1):
+        spread = (damping * scores[dangling].sum() + 1.0 - damping) / actor_number
+        new_scores = damping * (flow @ (scores * inverse_out)) + spread
+        change = np.abs(new_scores - scores).sum()
+        scores = new_scores
+        if change < tolerance:
+            break
+    return scores, iteration
+
+
+def weighted_degree(matrix):
+    """
+    Computes the sum of edge weights of every actor
+    :param matrix: the IncidenceMatrix
+    :return: the array of weighted degrees by actor id
+    """
+    return np.asarray(matrix.weights.sum(axis=1)).ravel()
+
+
+def betweenness(matrix, samples=64, seed=None):
+    """
+    Approximates betweenness centrality of actors on the co-star graph by running Brandes' accumulation from a
+    random sample of source actors and scaling by the sampled fraction
+    :param matrix: the IncidenceMatrix
+    :param samples: the number of source actors, all actors are used if there are fewer
+    :param seed: the random seed of sampling
+    :return: the array of betweenness by actor id
+    """
+    actor_number = len(matrix.actor_names)
+    scores = np.zeros(actor_number)
+    if actor_number == 0:
+        return scores
+    co_star = matrix.get_co_star_matrix()
+    indptr, indices = co_star.indptr.tolist(), co_star.indices.tolist()
+    sources = random.Random(seed).sample(range(actor_number), min(samples, actor_number))
+    for source in sources:
+        # Counts shortest paths by BFS, then accumulates dependencies in reverse BFS order
+        order, predecessors = [], [[] for _ in range(actor_number)]
+        paths, distances = [0] * actor_number, [-1] * actor_number
+        paths[source], distances[source] = 1, 0
+        queue = deque([source])
+        while queue:
+            actor = queue.popleft()
+            order.append(actor)
+            for co_star_id in indices[indptr[actor]:indptr[actor + 1]]:
+                if distances[co_star_id] < 0:
+                    distances[co_star_id] = distances[actor] + 1
+                    queue.append(co_star_id)
+                if distances[co_star_id] == distances[actor] + 1:
+                    paths[co_star_id] += paths[actor]
+                    predecessors[co_star_id].append(actor)
+        dependencies = [0.0] * actor_number
+        for actor in reversed(order):
+            for predecessor in predecessors[actor]:
+                dependencies[predecessor] += paths[predecessor] / paths[actor] * (1 + dependencies[actor])
+            if actor != source:
+                scores[actor] += dependencies[actor]
+    # Every undirected path is counted from both ends
+    return scores * actor_number / len(sources) / 2
+
+
+def write_scores(graph, matrix, scores, key):
+    """
+    Writes scores to the contents of actor vertices
+    :param graph: the graph class
+    :param matrix: the IncidenceMatrix of graph
+    :param scores: the array of scores by actor id
+    :param key: the content key of scores, such as PAGERANK
+    :return: the dict of actor names and scores, which can warm start the next computation
+    """
+    actor_vertices = graph.get_actor_vertices()
+    ret = {}
+    for name, score in zip(matrix.actor_names, scores.tolist()):
+        actor_vertices[name].get_content()[key] = score
+        ret[name] = score
+    return ret
+
+
+def _start_scores(matrix, start):
+    """
+    Gets the initial scores of power iteration
+    :param matrix: the IncidenceMatrix
+    :param start: the dict of actor names and previous scores or None
+    :return: the array of scores by actor id summing to 1
+    """
+    actor_number = len(matrix.actor_names)
+    if not start:
+        return np.full(actor_number, 1.0 / actor_number)
+    # New actors start from the uniform score
+    scores = np.array([start.get(name, 1.0 / actor_number) for name in matrix.actor_names], dtype=np.float64)
+    total = scores.sum()
+    return scores / total if total > 0 else np.full(actor_number, 1.0 / actor_number)
@@ -0,0 +1,77 @@
+import random
+from collections import Counter, deque
+
+LABEL_ROUNDS = 20  # The default maximum number of label updates per actor in label propagation
+
+
+def connected_components(graph):
+    """
+    Gets the connected components of the actor-movie graph from its union-find, largest first. Components share no
+    edge, so they can be processed in parallel.
+    :param graph: the graph class
+    :return: the list of components, each a tuple of actor names and movie names
+    """
+    components = graph.get_components()
+    groups = {}
+    for index, vertices in enumerate((graph.get_actor_vertices(), graph.get_movie_vertices())):
+        for name, vertex in vertices.items():
+            groups.setdefault(components.find(vertex), ([], []))[index].append(name)
+    return sorted(groups.values(), key=lambda group: (-len(group[0]), -len(group[1])))
+
+
+def label_propagation(graph, labels=None, actors=None, max_updates=None, seed=None):
+    """
+    Detects communities of actors by asynchronous label propagation over actor siblings, which must be built. Every
+    actor starts with its own name as label and repeatedly takes the label most common among its siblings, the
+    smallest on ties, until no label changes. Only siblings of changed actors are visited again, so the work is
+    near-linear in the number of sibling pairs. After graph changes, pass the previous labels and the actors whose
+    siblings changed to update communities locally.
+    :param graph: the graph class
+    :param labels: the dict of actor names and labels of a previous run, or None
+    :param actors: the actor names to visit first, or None for all actors
+    :param max_updates: the maximum number of actors visited, or None for LABEL_ROUNDS per actor
+    :param seed: the random seed of the visiting order
+    :return: the dict of actor names and community labels
+    """
+    actor_vertices = graph.get_actor_vertices()
+    labels = {} if labels is None else {actor: label for actor, label in labels.items() if actor in actor_vertices}
+    for actor in actor_vertices:
+        labels.setdefault(actor, actor)
+    queue = list(actor_vertices) if actors is None else [actor for actor in actors if actor in actor_vertices]
+    random.Random(seed).shuffle(queue)
+    queue, queued = deque(queue), set(queue)
+    if max_updates is None:
+        max_updates = LABEL_ROUNDS * len(actor_vertices)
+
+    updates = 0
+    while queue and updates < max_updates:
+        actor = queue.popleft()
+        queued.discard(actor)
+        updates += 1
+        siblings = actor_vertices[actor].get_siblings()
+        if not siblings:
+            labels[actor] = actor
+            continue
+        counts = Counter(labels[sibling] for sibling in siblings)
+        most = max(counts.values())
+        # Keeping the current label on ties lets propagation settle
+        if counts.get(labels[actor], 0) == most:
+            continue
+        labels[actor] = min(label for label, count in counts.items() if count == most)
+        for sibling in siblings:
+            if sibling not in queued:
+                queue.append(sibling)
+                queued.add(sibling)
+    return labels
+
+
+def get_communities(labels):
+    """
+    Groups actors by community label, largest first
+    :param labels: the dict of actor names and community labels
+    :return: the list of community labels and lists of actor names
+    """
+    communities = {}
+    for actor, label in labels.items():
+        communities.setdefault(label, []).append(actor)
+    return sorted(communities.items(), key=lambda community: -len(community[1]))
@@ -6,12 +6,20 @@ current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
 sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
 
 import json
+import os
 from model.graph import *
+from model.csr_graph import CSRGraph
+from model.graph_snapshot import save_snapshot, load_snapshot, get_snapshot_path, META_FILE
+from model.ndjson_io import iter_records
+from controller.graph_matrix import IncidenceMatrix
+from controller.centrality import pagerank, write_scores, PAGERANK
 from controller.query_utils import *
 from controller.analysis_utils import *
 
 DATA_ANALYSIS = True
+FROZEN_GRAPH = False  # Use the compact read-only CSRGraph instead of Graph
 ACTOR_MOVIE_FILE_PATH = '../data/data.json' # The json data path
+SNAPSHOT_DIR = '../data/snapshot'  # The binary snapshot of the frozen graph, rebuilt when the json data is newer
 QUERY_LIST = '\nPlease input the number corresponding to the query you want\n\
 			1. Find how much a movie has grossed\n \
 			2. List which movies an actor has worked in\n \
@@ -21,26 +29,231 @@ QUERY_LIST = '\nPlease input the number corresponding to the query you want\n\
 			6. List all the movies for a given year\n \
 			7. List all the actors for a given year\n \
 			8. List all movies for a given language\n \
-			9. List all movies for a given country\n'
+			9. List all movies for a given country\n \
+			10. Find how two actors are connected\n'
 
 def add_edges(graph):
+    """
+    Add edges between actors and the movies they list and between movies and the actors they list, weighted by actor
+    age. Each edge is inserted once.
+    :param graph: the graph class with vertices
+    :return: the graph
+    """
+    graph.add_edges_from(_iter_edges(graph))
+    return graph
+
+
+def build_graph(actor_data, movie_data, siblings=True):
+    """
+    Build a graph with vertices, edges, actor siblings and total gross of actors from actor data and movie data, the
+    bulk form of construct_graph followed by add_actor_siblings. It makes separate linear passes: vertices, then
+    edges streamed from the movies of actors and the actors of movies with each edge inserted once, then siblings
+    linked from actor lists of movies, then gross of actors.
+    :param actor_data: dict of actor names and actor information
+    :param movie_data: dict of movie names and movie information
+    :param siblings: if actor siblings are built
+    :return: constructed graph
+    """
+    graph = Graph()
+    for actor, content in actor_data.items():
+        graph.add_actor_vertex(actor, content)
+    for movie, content in movie_data.items():
+        graph.add_movie_vertex(movie, content)
+    add_edges(graph)
+    if siblings:
+        graph.add_actor_siblings()
+    for actor in graph.get_actor_vertices():
+        graph.get_actor_gross(actor)
+    return graph
+
+
+def add_actor(graph, name, content):
+    """
+    Adds an actor to a built graph with the edges add_edges would give it, without rebuilding the graph
+    :param graph: the graph class
+    :param name: the actor name
+    :param content: the actor information
+    :return: the added vertex
+    """
+    vertex = graph.add_actor_vertex(name, content)
+    _link_actor(graph, name)
+    return vertex
+
+
+def add_movie(graph, name, content):
+    """
+    Adds a movie to a built graph with the edges add_edges would give it, without rebuilding the graph
+    :param graph: the graph class
+    :param name: the movie name
+    :param content: the movie information
+    :return: the added vertex
+    """
+    vertex = graph.add_movie_vertex(name, content)
+    _link_movie(graph, name)
+    return vertex
+
+
+def update_actor(graph, name, changes):
+    """
+    Updates the information of an actor in a built graph. Edges follow changes of its movies and age.
+    :param graph: the graph class
+    :param name: the actor name
+    :param changes: the dict of changed information
+    """
+    graph.update_actor_content(name, changes)
+    _link_actor(graph, name)
+
+
+def update_movie(graph, name, changes):
+    """
+    Updates the information of a movie in a built graph. Edges follow changes of its actors.
+    :param graph: the graph class
+    :param name: the movie name
+    :param changes: the dict of changed information
+    """
+    graph.update_movie_content(name, changes)
+    _link_movie(graph, name)
+
+
+def remove_actor(graph, name):
+    """
+    Removes an actor from a built graph. Movies still listing the actor get their edge back if it is added again.
+    :param graph: the graph class
+    :param name: the actor name
+    :return: the removed vertex or None if not found
+    """
+    vertices = graph.get_actor_vertices()
+    if name not in vertices:
+        return None
+    listing = _get_listing_movies(graph, name, vertices[name].get_neighbors())
+    vertex = graph.remove_actor_vertex(name)
+    for movie_name in listing:
+        graph.add_reference(name, movie_name)
+    return vertex
+
+
+def remove_movie(graph, name):
+    """
+    Removes a movie from a built graph. Actors still listing the movie get their edge back if it is added again.
+    :param graph: the graph class
+    :param name: the movie name
+    :return: the removed vertex or None if not found
+    """
+    vertices = graph.get_movie_vertices()
+    if name not in vertices:
+        return None
+    listing = _get_listing_actors(graph, name, vertices[name].get_neighbors())
+    vertex = graph.remove_movie_vertex(name)
+    for actor_name in listing:
+        graph.add_reference(name, actor_name)
+    return vertex
+
+
+def _iter_edges(graph):
+    """
+    Iterate edges between vertices of a graph by the rules of add_edges, an edge listed from both sides twice.
+    References to missing vertices are recorded in the graph.
+    :param graph: the graph class with vertices
+    :return: the generator of actor name, movie name and weight
+    """
     actor_vertices = graph.get_actor_vertices()
-    for actor_name in actor_vertices:
-        content = actor_vertices[actor_name].get_content()
-        for movie_name in content['movies']:
-            weight = content['age']
-            graph.add_edge(actor=actor_name, movie=movie_name, weight=weight)
+    movie_vertices = graph.get_movie_vertices()
+    for actor_name, vertex in actor_vertices.items():
+        content = vertex.get_content()
+        weight = content.get('age')
+        for movie_name in content.get('movies', []):
+            if movie_name in movie_vertices:
+                yield actor_name, movie_name, weight
+            else:
+                graph.add_reference(movie_name, actor_name)
 
     # Ensure each actor vertex has movie neighbors
-    movie_vertices = graph.get_movie_vertices()
-    for movie_name in movie_vertices:
-        content = movie_vertices[movie_name].get_content()
-        for actor_name in content['actors']:
+    for movie_name, vertex in movie_vertices.items():
+        for actor_name in vertex.get_content().get('actors', []):
             if actor_name in actor_vertices:
-                weight = (actor_vertices[actor_name].get_content())['age']
-                graph.add_edge(actor=actor_name, movie=movie_name, weight=weight)
+                yield actor_name, movie_name, actor_vertices[actor_name].get_content().get('age')
+            else:
+                graph.add_reference(actor_name, movie_name)
+
+
+def _link_actor(graph, name):
+    """
+    Makes the edges of an actor match add_edges: its movies, and movies listing it among their actors
+    :param graph: the graph class
+    :param name: the actor name
+    """
+    vertex = graph.get_actor_vertices()[name]
+    content = vertex.get_content()
+    movie_vertices = graph.get_movie_vertices()
+    movies = set()
+    for movie_name in content.get('movies', []):
+        if movie_name in movie_vertices:
+            movies.add(movie_name)
+        else:
+            graph.add_reference(movie_name, name)
+    listing = _get_listing_movies(graph, name, list(vertex.get_neighbors()) + list(graph.get_references(name)))
+    for movie_name in listing:
+        graph.remove_reference(name, movie_name)
+    movies.update(listing)
+
+    for movie_name in list(vertex.get_neighbors()):
+        if movie_name not in movies:
+            graph.remove_edge(name, movie_name)
+    for movie_name in movies:
+        graph.add_edge(actor=name, movie=movie_name, weight=content.get('age'))
+
+
+def _link_movie(graph, name):
+    """
+    Makes the edges of a movie match add_edges: its actors, and actors listing it among their movies
+    :param graph: the graph class
+    :param name: the movie name
+    """
+    vertex = graph.get_movie_vertices()[name]
+    actor_vertices = graph.get_actor_vertices()
+    actors = set()
+    for actor_name in vertex.get_content().get('actors', []):
+        if actor_name in actor_vertices:
+            actors.add(actor_name)
+        else:
+            graph.add_reference(actor_name, name)
+    listing = _get_listing_actors(graph, name, list(vertex.get_neighbors()) + list(graph.get_references(name)))
+    for actor_name in listing:
+        graph.remove_reference(name, actor_name)
+    actors.update(listing)
+
+    for actor_name in list(vertex.get_neighbors()):
+        if actor_name not in actors:
+            graph.remove_edge(actor_name, name)
+    for actor_name in actors:
+        graph.add_edge(actor=actor_name, movie=name, weight=actor_vertices[actor_name].get_content().get('age'))
+
+
+def _get_listing_movies(graph, actor, movie_names):
+    """
+    Gets the movies among candidates whose actors include an actor
+    :param graph: the graph class
+    :param actor: the actor name
+    :param movie_names: the candidate movie names
+    :return: the set of movie names
+    """
+    movie_vertices = graph.get_movie_vertices()
+    return {movie_name for movie_name in movie_names
+            if movie_name in movie_vertices and actor in movie_vertices[movie_name].get_content().get('actors', [])}
+
+
+def _get_listing_actors(graph, movie, actor_names):
+    """
+    Gets the actors among candidates whose movies include a movie
+    :param graph: the graph class
+    :param movie: the movie name
+    :param actor_names: the candidate actor names
+    :return: the set of actor names
+    """
+    actor_vertices = graph.get_actor_vertices()
+    return {actor_name for actor_name in actor_names
+            if actor_name in actor_vertices and movie in actor_vertices[actor_name].get_content().get('movies', [])}
 
-    return graph
 
 def construct_graph(actor_data, movie_data):
     """
@@ -59,29 +272,64 @@ def construct_graph(actor_data, movie_data):
     return add_edges(graph)
 
 
+def construct_graph_from_ndjson(actor_file_path, movie_file_path):
+    """
+    Construct a graph class from actor and movie records streamed from NDJSON files written by the crawler
+    :param actor_file_path: the NDJSON file of actors, which may be gzip compressed
+    :param movie_file_path: the NDJSON file of movies, which may be gzip compressed
+    :return: constructed graph
+    """
+    graph = Graph()
+    for actor, content in iter_records(actor_file_path):
+        graph.add_actor_vertex(actor, content)
+
+    for movie, content in iter_records(movie_file_path):
+        graph.add_movie_vertex(movie, content)
+
+    return add_edges(graph)
+
+
 def construct_graph_single(actor_movie_data):
     """
     Construct a graph class from actor data and movie data from a given format
     :param actor_movie_data: dict of actor information and movie information
     :return: constructed graph
     """
-    graph = Graph()
     actor_data, movie_data = actor_movie_data[0], actor_movie_data[1]
+    actors, movies = {}, {}
 
     for entry in actor_data:
         content = actor_data[entry]
         content.pop("json_class")
-        graph.add_actor_vertex(content["name"], content)
+        actors[content["name"]] = content
 
     for entry in movie_data:
         content = movie_data[entry]
         content.pop("json_class")
         content['url'] = content.pop('wiki_page')
         content['gross'] = content.pop('box_office')
-        graph.add_movie_vertex(content["name"], content)
+        movies[content["name"]] = content
+
+    return build_graph(actors, movies)
 
-    graph = add_edges(graph)
-    graph.add_actor_siblings()
+
+def load_frozen_graph(data_file_path, snapshot_dir):
+    """
+    Load the frozen graph from its snapshot, or build it from json data and save the snapshot if the snapshot is
+    missing or older than the data. Saving switches to a new generation of the snapshot, so graphs already loaded
+    by other processes are unchanged.
+    :param data_file_path: the json data path
+    :param snapshot_dir: the snapshot directory
+    :return: the CSRGraph
+    """
+    generation = get_snapshot_path(snapshot_dir)
+    if generation is not None:
+        meta_path = os.path.join(generation, META_FILE)
+        if os.path.exists(meta_path) and os.path.getmtime(meta_path) >= os.path.getmtime(data_file_path):
+            return load_snapshot(snapshot_dir)
+    with open(data_file_path, encoding='utf-8') as data_file:
+        graph = CSRGraph.from_json(json.load(data_file))
+    save_snapshot(graph, snapshot_dir)
     return graph
 
 
@@ -96,7 +344,7 @@ def start_query(graph):
             if query == "quit":
                 break
             query_num = int(query)
-            if 1 <= query_num <= 9:
+            if 1 <= query_num <= 10:
                 if query_num == 1:
                     query_movie_gross(graph)
                 elif query_num == 2:
@@ -115,6 +363,8 @@ def start_query(graph):
                     query_language_movies(graph)
                 elif query_num == 9:
                     query_country_movies(graph)
+                elif query_num == 10:
+                    query_actor_path(graph)
 
         except KeyboardInterrupt:
             exit(0)
@@ -127,16 +377,21 @@ def start_data_analysis(graph):
     Create and save different data analysis
     :param graph: the input graph
     """
-    hub_actors(graph)
+    matrix = IncidenceMatrix(graph)
+    hub_actors(graph, matrix=matrix)
+    write_scores(graph, matrix, pagerank(matrix)[0], PAGERANK)
+    hub_actors(graph, rank_by=PAGERANK, filename="Hub Actor PageRank")
     grossing_vs_age(graph)
-    movie_year_percentage(graph)
+    movie_year_percentage(graph, matrix=matrix)
+    community_sizes(graph)
 
 
 if __name__ == "__main__":
-    with open(ACTOR_MOVIE_FILE_PATH, encoding='utf-8') as data_file:
-        actor_movie_data = json.load(data_file)
-
-    graph = construct_graph_single(actor_movie_data)
+    if FROZEN_GRAPH:
+        graph = load_frozen_graph(ACTOR_MOVIE_FILE_PATH, SNAPSHOT_DIR)
+    else:
+        with open(ACTOR_MOVIE_FILE_PATH, encoding='utf-8') as data_file:
+            graph = construct_graph_single(json.load(data_file))
     if DATA_ANALYSIS:
         start_data_analysis(graph)
     else:
@@ -0,0 +1,117 @@
+import numpy as np
+import scipy.sparse as sparse
+from model.csr_graph import CSRGraph, ACTOR
+
+
+class IncidenceMatrix:
+    """
+    The sparse actor x movie incidence matrix of a graph. Entry (i, j) is 1 if actor i plays in movie j, so graph
+    analytics become vectorized matrix operations: degrees are row and column counts, co-star counts are A * A^T and
+    the total gross of actors is A * gross. The weights matrix has the same pattern with the weights of edges.
+    """
+
+    def __init__(self, graph):
+        """
+        Initialize the matrix of a graph
+        :param graph: the Graph or CSRGraph
+        """
+        actor_vertices, movie_vertices = graph.get_actor_vertices(), graph.get_movie_vertices()
+        self.actor_names = list(actor_vertices)
+        self.movie_names = list(movie_vertices)
+        self.actor_ids = {name: i for i, name in enumerate(self.actor_names)}
+        self.movie_ids = {name: i for i, name in enumerate(self.movie_names)}
+        shape = (len(self.actor_names), len(self.movie_names))
+        if isinstance(graph, CSRGraph):
+            indptr, indices, weights = graph.indptr[ACTOR], graph.indices[ACTOR], graph.weights[ACTOR]
+        else:
+            neighbors = [actor_vertices[actor].get_neighbors() for actor in self.actor_names]
+            indices = [self.movie_ids[movie] for movie_weights in neighbors for movie in movie_weights]
+            # Edges added without weight count as 0
+            weights = [weight or 0.0 for movie_weights in neighbors for weight in movie_weights.values()]
+            indptr = np.cumsum([0] + [len(movie_weights) for movie_weights in neighbors])
+        self.matrix = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=shape)
+        self.weights = sparse.csr_matrix((np.asarray(weights, dtype=np.float64), indices, indptr), shape=shape)
+        # Movies only referenced by actors have no content
+        contents = [movie_vertices[movie].get_content() or {} for movie in self.movie_names]
+        self.movie_gross = np.array([content.get('gross') or 0 for content in contents], dtype=np.float64)
+        self.movie_years = np.array([content.get('year') or 0 for content in contents], dtype=np.int64)
+        self._co_star = None
+
+    def get_actor_degrees(self):
+        """
+        Gets the number of movies of every actor
+        :return: the array of degrees by actor id
+        """
+        return self.matrix.getnnz(axis=1)
+
+    def get_movie_degrees(self):
+        """
+        Gets the number of actors of every movie
+        :return: the array of degrees by movie id
+        """
+        return self.matrix.getnnz(axis=0)
+
+    def get_co_star_matrix(self):
+        """
+        Gets the actor x actor matrix of the number of movies two actors share, without the diagonal
+        :return: the sparse matrix
+        """
+        if self._co_star is None:
+            co_star = (self.matrix @ self.matrix.T).tocsr()
+            co_star.setdiag(0)
+            co_star.eliminate_zeros()
+            self._co_star = co_star
+        return self._co_star
+
+    def get_sibling_counts(self):
+        """
+        Gets the number of siblings of every actor, which is the number of actors sharing any movie
+        :return: the array of sibling counts by actor id
+        """
+        return self.get_co_star_matrix().getnnz(axis=1)
+
+    def get_actor_gross(self):
+        """
+        Gets the total gross of movies of every actor
+        :return: the array of total gross by actor id
+        """
+        return self.matrix @ self.movie_gross
+
+    def get_year_aggregates(self):
+        """
+        Gets the number of movies, total gross and number of distinct actors of every year with known year
+        :return: the dict of year and the dict of movies, gross and actors
+        """
+        known = np.flatnonzero(self.movie_years > 0)
+        years, year_ids = np.unique(self.movie_years[known], return_inverse=True)
+        # The movie x year indicator matrix, so actor x year counts are one product
+        by_year = sparse.csr_matrix((np.ones(len(known)), (known, year_ids)),
+                                    shape=(len(self.movie_names), len(years)))
+        actors = (self.matrix @ by_year).getnnz(axis=0)
+        movies = np.bincount(year_ids, minlength=len(years))
+        gross = np.bincount(year_ids, weights=self.movie_gross[known], minlength=len(years))
+        return {int(year): {'movies': int(movies[i]), 'gross': float(gross[i]), 'actors': int(actors[i])}
+                for i, year in enumerate(years)}
+
+    def top_actors(self, values, k):
+        """
+        Gets actors of the k largest values, ties in reverse actor order as in sorting vertices. The k largest are
+        partitioned out in linear time and only they are sorted.
+        :param values: the array of values by actor id
+        :param k: the number of actors
+        :return: the list of actor names and values
+        """
+        values = np.asarray(values)
+        if k <= 0:
+            return []
+        if k >= len(values):
+            selected = np.arange(len(values))
+        else:
+            threshold = values[np.argpartition(values, len(values) - k)[len(values) - k]]
+            above = np.flatnonzero(values > threshold)
+            # Among values equal to the k-th largest, later actors come first
+            ties = np.flatnonzero(values == threshold)[::-1][:k - len(above)]
+            selected = np.concatenate([above, ties])
+        # Sorted by value, then by actor id, both descending
+        order = selected[np.lexsort((selected, values[selected]))[::-1]]
+        return [(self.actor_names[i], values[i].item()) for i in order]
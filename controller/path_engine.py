@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+# Sources with at least this many targets in a batch are answered by one BFS instead of one search per pair
+BATCH_BFS_THRESHOLD = 4
+
+
+def find_path(graph, source, target, max_depth=None):
+    """
+    Finds a shortest chain connecting two actors by bidirectional BFS on the bipartite actor-movie graph. Both sides
+    expand one degree at a time, always the side with the smaller frontier, until they meet.
+    :param graph: the graph class
+    :param source: the name of the first actor
+    :param target: the name of the second actor
+    :param max_depth: the maximum degrees of separation, which is the number of movies in chain, or None
+    :return: the list of actor and movie names alternating from source to target, or None if not connected
+    """
+    actor_vertices = graph.get_actor_vertices()
+    for name in (source, target):
+        if name not in actor_vertices:
+            raise KeyError(name)
+    if source == target:
+        return [source]
+
+    movie_vertices = graph.get_movie_vertices()
+    # Every side maps a reached actor to its degree and the (actor, movie) it was reached from
+    sides = ({source: (0, None)}, {target: (0, None)})
+    frontiers = ([source], [target])
+    depths = [0, 0]
+    while frontiers[0] and frontiers[1]:
+        if max_depth is not None and depths[0] + depths[1] >= max_depth:
+            return None
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        visited, other = sides[side], sides[1 - side]
+        next_frontier = []
+        best = None
+        for actor in frontiers[side]:
+            for movie in actor_vertices[actor].get_neighbors():
+                for co_star in movie_vertices[movie].get_neighbors():
+                    if co_star in visited:
+                        continue
+                    visited[co_star] = (depths[side] + 1, (actor, movie))
+                    next_frontier.append(co_star)
+                    # All meetings of this level are compared, the other side may reach them at different degrees
+                    if co_star in other and (best is None or other[co_star][0] < other[best][0]):
+                        best = co_star
+        depths[side] += 1
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        if best is not None:
+            return _join_chain(sides[0], sides[1], best)
+    return None
+
+
+def find_paths(graph, pairs, max_depth=None):
+    """
+    Finds shortest chains of many actor pairs. Pairs sharing a source with many targets are answered by a single
+    BFS from the source, other pairs by bidirectional BFS.
+    :param graph: the graph class
+    :param pairs: the list of source and target actor names
+    :param max_depth: the maximum degrees of separation or None
+    :return: the list of chains in the order of pairs, None for pairs not connected
+    """
+    targets = defaultdict(set)
+    for source, target in pairs:
+        targets[source].add(target)
+    chains = {}
+    for source, source_targets in targets.items():
+        if len(source_targets) >= BATCH_BFS_THRESHOLD:
+            chains.update(((source, target), chain)
+                          for target, chain in _find_paths_from(graph, source, source_targets, max_depth).items())
+        else:
+            for target in source_targets:
+                chains[(source, target)] = find_path(graph, source, target, max_depth)
+    return [chains[(source, target)] for source, target in pairs]
+
+
+def _find_paths_from(graph, source, targets, max_depth):
+    """
+    Finds shortest chains from one actor to many actors by BFS, stopping when all targets are reached
+    :param graph: the graph class
+    :param source: the name of source actor
+    :param targets: the set of target actor names
+    :param max_depth: the maximum degrees of separation or None
+    :return: the dict of target names and chains or None if not connected
+    """
+    actor_vertices, movie_vertices = graph.get_actor_vertices(), graph.get_movie_vertices()
+    for name in [source] + list(targets):
+        if name not in actor_vertices:
+            raise KeyError(name)
+    visited = {source: (0, None)}
+    frontier, depth = [source], 0
+    remaining = set(targets) - {source}
+    while frontier and remaining and (max_depth is None or depth < max_depth):
+        next_frontier = []
+        for actor in frontier:
+            for movie in actor_vertices[actor].get_neighbors():
+                for co_star in movie_vertices[movie].get_neighbors():
+                    if co_star not in visited:
+                        visited[co_star] = (depth + 1, (actor, movie))
+                        next_frontier.append(co_star)
+                        remaining.discard(co_star)
+        frontier, depth = next_frontier, depth + 1
+    return {target: _join_chain(visited, {target: (0, None)}, target) if target in visited else None
+            for target in targets}
+
+
+def _join_chain(source_side, target_side, meeting):
+    """
+    Joins the chains of both sides at the meeting actor
+    :param source_side: the dict of actors reached from source
+    :param target_side: the dict of actors reached from target
+    :param meeting: the actor reached by both sides
+    :return: the list of actor and movie names from source to target
+    """
+    chain = [meeting]
+    link = source_side[meeting][1]
+    while link is not None:
+        chain[:0] = [link[0], link[1]]
+        link = source_side[link[0]][1]
+    link = target_side[meeting][1]
+    while link is not None:
+        chain += [link[1], link[0]]
+        link = target_side[link[0]][1]
+    return chain
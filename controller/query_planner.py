@@ -0,0 +1,354 @@
+from bisect import bisect_left, bisect_right, insort
+
+ENCODE_STRING = "****"
+NAME = 'name'
+RANGE_OPERATORS = ('>=', '<=', '>', '<')
+TRIGRAM = 3  # The length of name substrings indexed for substring matches
+
+
+class Clause:
+    """
+    One comparison of the filter language, such as year=2011, name=Kid or year>=2000
+    """
+
+    __slots__ = ('attr', 'operator', 'value', 'text')
+
+    def __init__(self, attr, operator, value, text):
+        """
+        Initialize a clause
+        :param attr: the attribute name
+        :param operator: "=" or one of RANGE_OPERATORS
+        :param value: the value, an integer if it parses as one, and a number for range operators
+        :param text: the value as written, matched as substring of names
+        """
+        self.attr = attr
+        self.operator = operator
+        self.value = value
+        self.text = text
+
+
+def parse_query(query):
+    """
+    Parses a filter of clauses joined all by "&" (AND) or all by "|" (OR). " & " inside a value is kept as text.
+    :param query: the unquoted query string without double quotation marks
+    :return: the list of Clause and True for AND or False for OR, or raise ValueError
+    """
+    # Encode "&" in query attr_values to remove confusion with operator AND. For example, name="Harry & Son"&year=1984
+    query = ENCODE_STRING.join(query.split(" & "))
+    if "|" in query and "&" in query:
+        raise ValueError("AND and OR are mixed")
+    conjunction = "|" not in query
+    clauses = [_parse_clause(text.replace(ENCODE_STRING, " & ")) for text in query.split("&" if conjunction else "|")]
+    return clauses, conjunction
+
+
+def normalize_query(clauses, conjunction):
+    """
+    Gets the key of a parsed query which is equal for queries with the same clauses in any order
+    :param clauses: the list of Clause
+    :param conjunction: True for AND, False for OR
+    :return: the hashable key
+    """
+    return conjunction, tuple(sorted({(clause.attr, clause.operator, clause.text) for clause in clauses}))
+
+
+class DataIndex:
+    """
+    The indexes of one dict of backend data for the filter language: per attribute, a hash index of values and a
+    sorted index of numbers, and a trigram index of names for substring matches. Each is built on first use and
+    kept current by add and remove around every write, which also increase the version of data.
+    """
+
+    def __init__(self, data):
+        """
+        Initialize indexes of data, none of them built yet
+        :param data: the dict of names and records
+        """
+        self.data = data
+        self.version = 0
+        self.clear()
+
+    def clear(self):
+        """
+        Drops all indexes, after data is replaced
+        """
+        self.version += 1
+        self.presence = dict()
+        self.hashes = dict()
+        self.sorted = dict()
+        self.trigrams = None
+
+    def add(self, name):
+        """
+        Indexes a record after it is added to data or changed
+        :param name: the record name
+        """
+        self._update(name, self.data[name], True)
+
+    def remove(self, name):
+        """
+        Removes a record from indexes before it is removed from data or changed
+        :param name: the record name
+        """
+        self._update(name, self.data[name], False)
+
+    def evaluate(self, clauses, conjunction):
+        """
+        Gets names of records matching clauses. AND clauses run from the most selective by index estimates, the
+        first one on its index and the others as checks of the remaining records, stopping when none remain.
+        :param clauses: the list of Clause
+        :param conjunction: True for AND, False for OR
+        :return: the set of matching names, or raise KeyError with the attribute some record misses
+        """
+        for clause in clauses:
+            if self._get_presence(clause.attr) != len(self.data):
+                raise KeyError(clause.attr)
+        if not conjunction:
+            return set().union(*(self._select(clause) for clause in clauses))
+
+        clauses = sorted(clauses, key=self._estimate)
+        names = self._select(clauses[0])
+        for clause in clauses[1:]:
+            if not names:
+                break
+            names = {name for name in names if _matches(self.data[name], clause)}
+        return names
+
+    def _select(self, clause):
+        """
+        Gets names of records matching a clause from indexes
+        :param clause: the Clause
+        :return: the set of names
+        """
+        if clause.operator != '=':
+            entries, start, end = self._get_range(clause)
+            return {name for _, name in entries[start:end]}
+        names = set(self._get_hash(clause.attr).get(clause.value, ()))
+        if clause.attr == NAME:
+            names.update(name for name in self._get_name_candidates(clause.text) if _matches(self.data[name], clause))
+        return names
+
+    def _estimate(self, clause):
+        """
+        Estimates the number of records matching a clause
+        :param clause: the Clause
+        :return: the estimated number
+        """
+        if clause.operator != '=':
+            _, start, end = self._get_range(clause)
+            return end - start
+        if clause.attr == NAME:
+            grams = _get_trigrams(clause.text)
+            if not grams:
+                return len(self.data)
+            trigrams = self._get_trigram_index()
+            return min(len(trigrams.get(gram, ())) for gram in grams)
+        return len(self._get_hash(clause.attr).get(clause.value, ()))
+
+    def _get_presence(self, attr):
+        """
+        Gets the number of records having an attribute
+        :param attr: the attribute
+        :return: the number of records
+        """
+        if attr not in self.presence:
+            self.presence[attr] = sum(1 for record in self.data.values() if attr in record)
+        return self.presence[attr]
+
+    def _get_hash(self, attr):
+        """
+        Gets the hash index of an attribute
+        :param attr: the attribute
+        :return: the dict of values and sets of names, without list and dict values
+        """
+        if attr not in self.hashes:
+            index = self.hashes[attr] = {}
+            for name, record in self.data.items():
+                if _is_hashable(record.get(attr)):
+                    index.setdefault(record[attr], set()).add(name)
+        return self.hashes[attr]
+
+    def _get_sorted(self, attr):
+        """
+        Gets the sorted index of numbers of an attribute
+        :param attr: the attribute
+        :return: the sorted list of values and names
+        """
+        if attr not in self.sorted:
+            self.sorted[attr] = sorted((record[attr], name) for name, record in self.data.items()
+                                       if _is_number(record.get(attr)))
+        return self.sorted[attr]
+
+    def _get_range(self, clause):
+        """
+        Gets the slice of the sorted index matching a range clause
+        :param clause: the Clause with a range operator
+        :return: the sorted list and start and end positions
+        """
+        entries = self._get_sorted(clause.attr)
+        values = _ValueView(entries)
+        if clause.operator in ('>=', '>'):
+            start = (bisect_left if clause.operator == '>=' else bisect_right)(values, clause.value)
+            return entries, start, len(entries)
+        end = (bisect_right if clause.operator == '<=' else bisect_left)(values, clause.value)
+        return entries, 0, end
+
+    def _get_trigram_index(self):
+        """
+        Gets the trigram index of names
+        :return: the dict of trigrams and sets of names whose name attribute contains them
+        """
+        if self.trigrams is None:
+            self.trigrams = {}
+            for name, record in self.data.items():
+                for gram in _get_trigrams(record.get(NAME)):
+                    self.trigrams.setdefault(gram, set()).add(name)
+        return self.trigrams
+
+    def _get_name_candidates(self, text):
+        """
+        Gets names of records whose name attribute may contain text, all records for text shorter than a trigram
+        :param text: the substring
+        :return: the iterable of names
+        """
+        grams = _get_trigrams(text)
+        if not grams:
+            return self.data.keys()
+        trigrams = self._get_trigram_index()
+        postings = sorted((trigrams.get(gram, set()) for gram in grams), key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def _update(self, name, record, add):
+        """
+        Adds or removes a record in built indexes
+        :param name: the record name
+        :param record: the record
+        :param add: True to add, False to remove
+        """
+        self.version += 1
+        for attr in self.presence:
+            if attr in record:
+                self.presence[attr] += 1 if add else -1
+        for attr, index in self.hashes.items():
+            if _is_hashable(record.get(attr)):
+                _update_set(index, record[attr], name, add)
+        for attr, entries in self.sorted.items():
+            if _is_number(record.get(attr)):
+                if add:
+                    insort(entries, (record[attr], name))
+                else:
+                    _remove_sorted(entries, (record[attr], name))
+        if self.trigrams is not None:
+            for gram in _get_trigrams(record.get(NAME)):
+                _update_set(self.trigrams, gram, name, add)
+
+
+class _ValueView:
+    """
+    The list of values of a sorted list of values and names, for bisecting by value only
+    """
+
+    __slots__ = ('entries',)
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __getitem__(self, index):
+        return self.entries[index][0]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def _parse_clause(text):
+    """
+    Parses one clause. A clause with "=" keeps the old tolerance of extra "=" around attribute and value.
+    :param text: the clause text
+    :return: the Clause, or raise ValueError
+    """
+    position = next((i for i, char in enumerate(text) if char in "=<>"), -1)
+    if position > 0 and text[position] in "<>":
+        operator = text[position:position + 2] if text[position + 1:position + 2] == "=" else text[position]
+        value = text[position + len(operator):]
+        try:
+            number = int(value)
+        except ValueError:
+            number = float(value)
+        return Clause(text[:position], operator, number, value)
+
+    parts = [part for part in text.split("=") if part]
+    if len(parts) != 2:
+        # Should have left hand side and right hand side
+        raise ValueError("Illegal clause %s" % text)
+    attr, value = parts
+    try:
+        return Clause(attr, '=', int(value), value)
+    except ValueError:
+        return Clause(attr, '=', value, value)
+
+
+def _matches(record, clause):
+    """
+    Checks a clause against a record having its attribute
+    :param record: the record
+    :param clause: the Clause
+    :return: if the record matches
+    """
+    value = record[clause.attr]
+    if clause.operator == '=':
+        return value == clause.value or clause.attr == NAME and isinstance(value, str) and clause.text in value
+    if not _is_number(value):
+        return False
+    if clause.operator == '>=':
+        return value >= clause.value
+    if clause.operator == '<=':
+        return value <= clause.value
+    return value > clause.value if clause.operator == '>' else value < clause.value
+
+
+def _get_trigrams(text):
+    """
+    Gets the distinct trigrams of a string
+    :param text: the string or another value
+    :return: the set of trigrams, empty for strings shorter than a trigram and other values
+    """
+    if not isinstance(text, str):
+        return set()
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+def _is_hashable(value):
+    return value is not None and not isinstance(value, (list, dict))
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _remove_sorted(entries, entry):
+    """
+    Removes an entry from a sorted list if it is there
+    :param entries: the sorted list of values and names
+    :param entry: the value and name
+    """
+    position = bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
+
+
+def _update_set(index, key, name, add):
+    """
+    Adds or removes a name in the set of a key, dropping empty sets
+    :param index: the dict of keys and sets of names
+    :param key: the key
+    :param name: the name
+    :param add: True to add, False to remove
+    """
+    if add:
+        index.setdefault(key, set()).add(name)
+        return
+    names = index.get(key)
+    if names is not None:
+        names.discard(name)
+        if not names:
+            del index[key]
@@ -1,6 +1,7 @@
 import traceback
-import operator
-from model.utils import get_readable_string_from_int
+from model.utils import get_readable_string_from_int, select_largest_k
+from model.graph_index import YEAR, LANGUAGE, COUNTRY
+from controller.path_engine import find_path
 
 
 def query_movie_gross(graph):
@@ -57,12 +58,11 @@ def query_actor_top_grossing(graph):
     query_number = input("Please input the number of top grossings of actors you expect\n").strip()
     try:
         print("The top %d actor grossings are:" % (int(query_number)))
-        actor_vertices = graph.get_actor_vertices()
         result_list = []
-        for entry in get_actors_top_k_grossing(graph, int(query_number)):
-            result = get_readable_string_from_int(actor_vertices[entry[0]].get_compare_value())
+        for actor, total_grossing in get_actors_top_k_grossing(graph, int(query_number)):
+            result = get_readable_string_from_int(total_grossing)
             result_list.append(result)
-            print("The grossing for " + entry[0] + " is " + result)
+            print("The grossing for " + actor + " is " + result)
         print()
         return result_list
     except:
@@ -79,12 +79,10 @@ def query_actor_oldest(graph):
     query_number = input("Please input the number of oldest actors you expect\n").strip()
     try:
         print("The oldest %d actors are:" % (int(query_number)))
-        actor_vertices = graph.get_actor_vertices()
         result_list = []
-        for entry in get_actors_oldest_k(graph, int(query_number)):
-            result = actor_vertices[entry[0]].get_compare_value()
-            result_list.append(result)
-            print("Age for " + entry[0] + " is " + str(result))
+        for actor, age in get_actors_oldest_k(graph, int(query_number)):
+            result_list.append(age)
+            print("Age for " + actor + " is " + str(age))
         print()
         return result_list
     except:
@@ -100,11 +98,7 @@ def query_movies_given_year(graph):
     query_number = input("Please input the year you expect\n").strip()
     try:
         print("The movies for year %d are:" % (int(query_number)))
-        ret_list = []
-        movie_vertices = graph.get_movie_vertices()
-        for movie_name in movie_vertices:
-            if (movie_vertices[movie_name].get_content())['year'] == int(query_number):
-                ret_list.append(movie_name)
+        ret_list = graph.get_index().get_movies(YEAR, int(query_number))
         print(", ".join(ret_list))
         print()
         return ret_list
@@ -121,13 +115,7 @@ def query_actors_given_year(graph):
     query_number = input("Please input the year you expect\n").strip()
     try:
         print("The actors for year %d are:" % (int(query_number)))
-        ret_list = []
-        actor_vertices = graph.get_actor_vertices()
-        movie_vertices = graph.get_movie_vertices()
-        for actor_name in actor_vertices:
-            movies = actor_vertices[actor_name].get_neighbors()
-            if any((movie_vertices[movie_name].get_content())['year'] == int(query_number) for movie_name in movies):
-                ret_list.append(actor_name)
+        ret_list = graph.get_index().get_actors_by_year(int(query_number))
         print(", ".join(ret_list))
         print()
         return ret_list
@@ -142,15 +130,8 @@ def query_language_movies(graph):
     :return: the list of movies
     """
     query_language = input("Please input the language you expect\n").strip()
-    ret_list = []
-    movie_vertices = graph.get_movie_vertices()
-    for movie_name in movie_vertices:
-        try:
-            # Some movies may not have key "lang"
-            if query_language in (movie_vertices[movie_name].get_content()['lang']):
-                ret_list.append(movie_name)
-        except KeyError:
-            pass
+    # Movies without key "lang" are not indexed
+    ret_list = graph.get_index().get_movies(LANGUAGE, query_language)
     if len(ret_list) == 0:
         print("Sorry we do not have language %s in dataset" % query_language)
     else:
@@ -166,15 +147,8 @@ def query_country_movies(graph):
     :return: the list of movies
     """
     query_country = input("Please input the country you expect\n").strip()
-    ret_list = []
-    movie_vertices = graph.get_movie_vertices()
-    for movie_name in movie_vertices:
-        try:
-            # Some movies may not have key "country"
-            if query_country in (movie_vertices[movie_name].get_content()['country']):
-                ret_list.append(movie_name)
-        except KeyError:
-            pass
+    # Movies without key "country" are not indexed
+    ret_list = graph.get_index().get_movies(COUNTRY, query_country)
     if len(ret_list) == 0:
         print("Sorry we do not have country %s in dataset" % query_country)
     else:
@@ -183,35 +157,47 @@ def query_country_movies(graph):
         return ret_list
 
 
-def get_actors_top_k_grossing(graph, k):
+def query_actor_path(graph, max_depth=None):
     """
-    Get actor names of top k grossing
+    Query how two actors are connected through movies
+    :param graph: the graph class
+    :param max_depth: the maximum degrees of separation or None
+    :return: the list of actor and movie names from the first actor to the second one
+    """
+    source = input("Please input the first actor/actress name\n").strip()
+    target = input("Please input the second actor/actress name\n").strip()
+    try:
+        result = find_path(graph, source, target, max_depth)
+    except KeyError:
+        print("Sorry the actor is not in database. Please try another one :)\n")
+        return
+    if result is None:
+        print("Sorry %s and %s are not connected :)\n" % (source, target))
+        return
+    print("%s and %s are %d degrees apart: " % (source, target, len(result) // 2) + " -> ".join(result) + "\n")
+    return result
+
+
+def get_actors_top_k_grossing(graph, k, matrix=None):
+    """
+    Get actor names of top k grossing. Actors are selected by a heap without writing to vertices, so concurrent
+    queries do not interfere, and total grossing of actors is cached by the graph.
     :param graph: the graph class
     :param k: the integer for length of return list
-    :return: the list of actor names with top k grossing
+    :param matrix: the IncidenceMatrix of graph to sum grossing as one matrix product, or None
+    :return: the list of actor names with total grossing of top k grossing, largest first
     """
-    actor_vertices = graph.get_actor_vertices()
-    movie_vertices = graph.get_movie_vertices()
-    for actor in actor_vertices:
-        total_grossing = sum([(movie_vertices[movie].get_content())['gross'] \
-                              for movie in actor_vertices[actor].get_neighbors()])
-        actor_vertices[actor].set_compare_value(total_grossing)
-    sorted_x = sorted(actor_vertices.items(), key=operator.itemgetter(1))
-    if k > len(sorted_x):
-        return sorted_x[::-1]
-    return sorted_x[:-(k + 1):-1]
+    if matrix is not None:
+        return matrix.top_actors(matrix.get_actor_gross(), k)
+    return select_largest_k(((actor, graph.get_actor_gross(actor)) for actor in graph.get_actor_vertices()), k)
 
 
 def get_actors_oldest_k(graph, k):
     """
-    Get actor names of oldest k
+    Get actor names of oldest k, selected by a heap without writing to vertices
     :param graph: the graph class
     :param k: the integer for length of return list
-    :return: the list of actor names of k oldest
+    :return: the list of actor names with ages of k oldest, oldest first
     """
     actor_vertices = graph.get_actor_vertices()
-    for actor in actor_vertices:
-        age = (actor_vertices[actor].get_content())['age']
-        actor_vertices[actor].set_compare_value(age)
-    sorted_x = sorted(actor_vertices.items(), key=operator.itemgetter(1))
-    return sorted_x[:-(k + 1):-1]
+    return select_largest_k(((actor, actor_vertices[actor].get_content()['age']) for actor in actor_vertices), k)
@@ -0,0 +1,129 @@
+import json
+import os
+from model.utils import atomic_write
+
+JOURNAL_FILE = 'journal.ndjson'
+MANIFEST_FILE = 'manifest.json'
+
+
+class CrawlCheckpoint:
+    """
+    The append-only checkpoint of a crawl. Every crawled actor or movie is appended to a journal as one JSON line
+    together with the entries it pushed to the frontier, so the cost of a checkpoint does not grow with the dataset.
+    Every "interval" records the journal is synced and its committed length is written atomically to a manifest;
+    anything after the committed length is discarded on resume.
+    """
+
+    def __init__(self, checkpoint_dir, interval=20):
+        """
+        Initialize a checkpoint
+        :param checkpoint_dir: the directory of journal and manifest
+        :param interval: the number of records between two commits
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.interval = interval
+        self.journal_path = os.path.join(checkpoint_dir, JOURNAL_FILE)
+        self.manifest_path = os.path.join(checkpoint_dir, MANIFEST_FILE)
+        self._journal = None
+        self._uncommitted = 0
+
+    def load(self):
+        """
+        Replays the committed journal
+        :return: dict of actor_data, movie_data, expanded and failure_names or None if there is no checkpoint.
+        "expanded" lists kind, information, found entries and depth of every crawled record in journal order, so
+        the frontier can be rebuilt with the same priorities.
+        """
+        manifest = self._read_manifest()
+        if manifest is None or not os.path.exists(self.journal_path):
+            return None
+        state = {'actor_data': {}, 'movie_data': {}, 'expanded': [], 'failure_names': set()}
+        with open(self.journal_path, 'rb') as journal:
+            data = journal.read(manifest['committed'])
+        for line in data.splitlines():
+            record = json.loads(line.decode('utf-8'))
+            if record['kind'] == 'failure':
+                state['failure_names'].add(record['name'])
+                continue
+            state['actor_data' if record['kind'] == 'actor' else 'movie_data'][record['name']] = record['info']
+            state['expanded'].append((record['kind'], record['info'], record['found'], record.get('depth', 0)))
+        return state
+
+    def open(self, resume=False):
+        """
+        Opens the journal for appending
+        :param resume: if we expect to continue the committed journal, otherwise the checkpoint is cleared
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        manifest = self._read_manifest() if resume else None
+        committed = manifest['committed'] if manifest is not None else 0
+        self._journal = open(self.journal_path, 'ab')
+        # Drops records written after the last commit
+        self._journal.truncate(committed)
+        self._journal.seek(committed)
+        self._commit()
+
+    def record(self, kind, name, info, found, depth=0):
+        """
+        Appends a crawled actor or movie to the journal
+        :param kind: 'actor' or 'movie'
+        :param name: the name of actor or title of movie
+        :param info: the crawled information
+        :param found: the list of entries pushed to the frontier
+        :param depth: the number of links from start page to this record
+        """
+        self._append({'kind': kind, 'name': name, 'info': info, 'found': found, 'depth': depth})
+
+    def record_failure(self, name):
+        """
+        Appends a failed name to the journal
+        :param name: the name of actor or title of movie
+        """
+        self._append({'kind': 'failure', 'name': name})
+
+    def flush(self):
+        """
+        Commits all appended records
+        """
+        if self._journal is not None:
+            self._commit()
+
+    def close(self):
+        """
+        Commits all appended records and closes the journal
+        """
+        if self._journal is not None:
+            self._commit()
+            self._journal.close()
+            self._journal = None
+
+    def _append(self, record):
+        """
+        Appends a record line and commits periodically
+        :param record: the dict of record
+        """
+        self._journal.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._uncommitted += 1
+        if self._uncommitted >= self.interval:
+            self._commit()
+
+    def _commit(self):
+        """
+        Syncs the journal and atomically records its length in manifest
+        """
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        manifest = {'committed': self._journal.tell()}
+        atomic_write(self.manifest_path, json.dumps(manifest).encode('utf-8'))
+        self._uncommitted = 0
+
+    def _read_manifest(self):
+        """
+        Reads the manifest
+        :return: the dict of manifest or None if not found
+        """
+        try:
+            with open(self.manifest_path, 'rb') as manifest_file:
+                return json.loads(manifest_file.read().decode('utf-8'))
+        except (OSError, ValueError):
+            return None
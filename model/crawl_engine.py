@@ -0,0 +1,360 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from model.frontier import Frontier, lifo_priority
+from model.seen_set import normalize_url
+
+ACTOR = 'actor'
+MOVIE = 'movie'
+# Start methods of parse worker processes by preference, never fork from a process running fetch threads
+PARSE_START_METHODS = ('forkserver', 'spawn')
+
+
+class CrawlEngine:
+    """
+    The asyncio crawl engine. It keeps a bounded number of page fetches in flight and alternates between expanding
+    actors and movies until the target numbers are reached. Pages are fetched in a thread pool and optionally parsed
+    in a separate process pool, so fetching and CPU-bound parsing overlap.
+    """
+
+    def __init__(self, fetch, parse_actor, parse_movie, target_movie_number, target_actor_number,
+                 concurrency=8, force_crawl_actor=False, force_crawl_movie=False, checkpoint=None,
+                 actor_writer=None, movie_writer=None, keep_records=True, parse_workers=0, scheduler=None,
+                 priority=lifo_priority, seen_set=set):
+        """
+        Initialize a crawl engine
+        :param fetch: the function which fetches the bytes of a url
+        :param parse_actor: the function which parses an actor page to actor name, actor information and movie entries
+        :param parse_movie: the function which parses a movie page to movie name, movie information and actor entries
+        :param target_movie_number: the number of movies to crawl
+        :param target_actor_number: the number of actors to crawl
+        :param concurrency: the maximum number of fetches in flight
+        :param force_crawl_actor: if we expect to crawl actors first to enlarge movie frontier
+        :param force_crawl_movie: if we expect to crawl movies first to enlarge actor frontier
+        :param checkpoint: the CrawlCheckpoint which records crawled entries, or None
+        :param actor_writer: the NDJSONWriter which streams crawled actors, or None
+        :param movie_writer: the NDJSONWriter which streams crawled movies, or None
+        :param keep_records: if we expect to keep crawled records in memory, only names are kept otherwise
+        :param parse_workers: the number of parser processes, or 0 to parse in the event loop thread. Parsers must be
+        module level functions or partials of them so they can be sent to worker processes, which are started by
+        PARSE_START_METHODS and so do not share module state changed after import.
+        :param scheduler: the HostScheduler which limits request rate and requeues transient failures, or None
+        :param priority: the priority function of frontiers, see model.frontier
+        :param seen_set: the factory of set-like containers of seen names and normalized urls, such as a BloomFilter
+        for very large crawls
+        """
+        if concurrency < 1:
+            raise ValueError('Concurrency should be a positive integer')
+        if parse_workers < 0:
+            raise ValueError('The number of parse workers should not be negative')
+        self.fetch = fetch
+        self.parsers = {ACTOR: parse_actor, MOVIE: parse_movie}
+        self.targets = {ACTOR: target_actor_number, MOVIE: target_movie_number}
+        self.concurrency = concurrency
+        self.force = {ACTOR: force_crawl_actor, MOVIE: force_crawl_movie}
+        self.checkpoint = checkpoint
+        self.writers = {ACTOR: actor_writer, MOVIE: movie_writer}
+        self.keep_records = keep_records
+        self.parse_workers = parse_workers
+        self.scheduler = scheduler
+
+        self.actor_data = {}
+        self.movie_data = {}
+        self.crawled = {ACTOR: set(), MOVIE: set()}
+        self.failure_names = set()
+        self.frontiers = {ACTOR: Frontier('name', priority, seen_set()),
+                          MOVIE: Frontier('title', priority, seen_set())}
+        self.seen_urls = seen_set()
+        self.duplicates = 0
+
+        self._in_flight = {ACTOR: set(), MOVIE: set()}
+        self._movie_turn = True
+        # Requeued entries waiting for retry: (ready time, sequence, kind, name, entry, depth)
+        self._retries = []
+        self._attempts = {}
+        self._sequence = itertools.count()
+
+    def run(self, start_url, resume=False):
+        """
+        Runs the crawl from a start actor url until targets are reached or no url is left
+        :param start_url: the url of the first actor
+        :param resume: if we expect to continue from the last checkpoint instead of start url
+        :return: the dict of actor data and the dict of movie data
+        """
+        return asyncio.run(self.crawl(start_url, resume))
+
+    async def crawl(self, start_url, resume=False):
+        """
+        Coroutine of the crawl from a start actor url
+        :param start_url: the url of the first actor
+        :param resume: if we expect to continue from the last checkpoint instead of start url
+        :return: the dict of actor data and the dict of movie data, which are empty if records are not kept
+        """
+        loop = asyncio.get_running_loop()
+        state = self.checkpoint.load() if resume and self.checkpoint is not None else None
+        if self.checkpoint is not None:
+            self.checkpoint.open(resume=state is not None)
+        try:
+            with self._make_parse_executor() as parser, ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                self._executor = executor
+                self._parse_executor = parser
+                if state is not None:
+                    self._restore(state)
+                else:
+                    await self._crawl_start(loop, start_url)
+                await self._crawl_frontier(loop)
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+        return self.actor_data, self.movie_data
+
+    def _make_parse_executor(self):
+        """
+        Creates the process pool of parsers. Workers are not forked, since the crawler runs fetch threads.
+        :return: the ProcessPoolExecutor or a null context if parsing is done in the event loop thread
+        """
+        if self.parse_workers == 0:
+            return contextlib.nullcontext()
+        method = next(method for method in PARSE_START_METHODS if method in multiprocessing.get_all_start_methods())
+        return ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context(method))
+
+    def _restore(self, state):
+        """
+        Restores crawled data and frontier from a checkpoint state
+        :param state: the dict loaded from checkpoint
+        """
+        logging.info("resume crawling from checkpoint with %d actors and %d movies"
+                     % (len(state['actor_data']), len(state['movie_data'])))
+        # Writers are truncated on open, so records crawled before the checkpoint are written again
+        for kind, data in ((ACTOR, state['actor_data']), (MOVIE, state['movie_data'])):
+            for name, info in data.items():
+                self._store(kind, name, info)
+        for kind, info, found, depth in state['expanded']:
+            self._expand(kind, info, found, depth)
+        self.failure_names = state['failure_names']
+        for name in self.failure_names:
+            self.frontiers[ACTOR].discard(name)
+            self.frontiers[MOVIE].discard(name)
+
+    async def _crawl_start(self, loop, start_url):
+        """
+        Crawls the start actor url
+        :param loop: the running event loop
+        :param start_url: the url of the first actor
+        """
+        logging.info("start crawling website %s" % start_url)
+        self.seen_urls.add(normalize_url(start_url))
+        try:
+            actor_name, actor_info, movie_info = await self._fetch_and_parse(loop, ACTOR, start_url)
+            self._store(ACTOR, actor_name, actor_info)
+            self._expand(ACTOR, actor_info, movie_info, 0)
+            if self.checkpoint is not None:
+                self.checkpoint.record(ACTOR, actor_name, actor_info, movie_info, 0)
+        except Exception:
+            logging.exception("Failed to get actor data from start url")
+
+    async def _crawl_frontier(self, loop):
+        """
+        Crawls entries of actor and movie frontiers with bounded concurrency
+        :param loop: the running event loop
+        """
+        pending = set()
+        while True:
+            while len(pending) < self.concurrency:
+                job = self._next_job(has_pending=len(pending) > 0 or len(self._retries) > 0)
+                if job is None:
+                    break
+                pending.add(asyncio.ensure_future(self._run_job(loop, *job)))
+            if self._targets_met() and not pending:
+                break
+            retry_wait = self._retries[0][0] - time.monotonic() if self._retries else None
+            if not pending:
+                if retry_wait is None:
+                    logging.error("No left urls to crawl..\n Program will exit..")
+                    break
+                await asyncio.sleep(max(0.0, retry_wait))
+                continue
+            timeout = max(0.0, retry_wait) if retry_wait is not None else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                self._collect(*task.result())
+
+    async def _fetch_and_parse(self, loop, kind, url):
+        """
+        Fetches a url in the fetch executor and parses the raw bytes by the parser of kind in the parse executor
+        :param loop: the running event loop
+        :param kind: ACTOR or MOVIE
+        :param url: the page url
+        :return: the parsed result
+        """
+        page = await loop.run_in_executor(self._executor, self.fetch, url)
+        if self._parse_executor is None:
+            return self.parsers[kind](page, url)
+        return await loop.run_in_executor(self._parse_executor, self.parsers[kind], page, url)
+
+    async def _run_job(self, loop, kind, name, entry, depth):
+        """
+        Crawls a frontier entry and never raises
+        :param loop: the running event loop
+        :param kind: ACTOR or MOVIE
+        :param name: the name of entry
+        :param entry: the frontier entry with url
+        :param depth: the number of links from start page to entry
+        :return: kind, name, entry, depth, the parsed result or None if failed and the error or None if succeeded
+        """
+        logging.info("Crawling %s %s from %s" % (kind, name.encode("UTF-8"), entry['url']))
+        try:
+            if self.scheduler is not None:
+                await self.scheduler.acquire(entry['url'])
+            return kind, name, entry, depth, await self._fetch_and_parse(loop, kind, entry['url']), None
+        except Exception as error:
+            logging.warning("Failed to get all required information from this url.. will try next one")
+            return kind, name, entry, depth, None, error
+
+    def _collect(self, kind, name, entry, depth, result, error):
+        """
+        Stores the result of a finished job and extends the frontier of the other kind. A transient failure is
+        requeued if the scheduler allows another retry.
+        :param kind: ACTOR or MOVIE
+        :param name: the name of entry
+        :param entry: the frontier entry
+        :param depth: the number of links from start page to entry
+        :param result: the parsed result or None if failed
+        :param error: the exception of failed job
+        """
+        if result is None and self.scheduler is not None:
+            attempt = self._attempts.get((kind, name), 0)
+            delay = self.scheduler.retry_delay(entry['url'], error, attempt)
+            if delay is not None:
+                # The name stays in flight so it is neither crawled twice nor over-counted
+                logging.info("Retry %s %s in %.1f seconds" % (kind, name.encode("UTF-8"), delay))
+                self._attempts[(kind, name)] = attempt + 1
+                heapq.heappush(self._retries, (time.monotonic() + delay, next(self._sequence), kind, name, entry, depth))
+                return
+        self._attempts.pop((kind, name), None)
+        self._in_flight[kind].discard(name)
+        if result is None:
+            self.failure_names.add(name)
+            if self.checkpoint is not None:
+                self.checkpoint.record_failure(name)
+            return
+        _, info, found = result
+        canonical = normalize_url(info['url'])
+        if canonical != normalize_url(entry['url']) and canonical in self.seen_urls:
+            # A redirect or alternate title of a page crawled or queued under another name, never crawled again
+            logging.info("Skip %s %s duplicating %s" % (kind, name.encode("UTF-8"), canonical))
+            self.duplicates += 1
+            self.failure_names.add(name)
+            if self.checkpoint is not None:
+                self.checkpoint.record_failure(name)
+            return
+        if kind == MOVIE:
+            url = info['url']
+            info.update(entry)
+            info.pop('title')
+            info['url'] = url
+        self._store(kind, name, info)
+        self._expand(kind, info, found, depth)
+        if len(self.frontiers[ACTOR if kind == MOVIE else MOVIE]) > 0:
+            self.force[kind] = False
+        if self.checkpoint is not None:
+            self.checkpoint.record(kind, name, info, found, depth)
+
+    def _expand(self, kind, info, found, depth):
+        """
+        Pushes entries found on a crawled page to the frontier of the other kind unless their urls are seen. Actors
+        found on a movie page are weighted by the box office of movie.
+        :param kind: the kind of crawled page, ACTOR or MOVIE
+        :param info: the crawled information
+        :param found: the list of found entries
+        :param depth: the number of links from start page to crawled page
+        """
+        frontier = self.frontiers[ACTOR if kind == MOVIE else MOVIE]
+        weight = info.get('gross', 0.0) if kind == MOVIE else 0.0
+        for entry in found:
+            url = normalize_url(entry['url'])
+            if url in self.seen_urls and entry[frontier.key] not in frontier:
+                continue
+            self.seen_urls.add(url)
+            frontier.push(entry, depth + 1, weight)
+
+    def _store(self, kind, name, info):
+        """
+        Stores a crawled record in memory and streams it to the writer of kind
+        :param kind: ACTOR or MOVIE
+        :param name: the name of record
+        :param info: the crawled information
+        """
+        self.crawled[kind].add(name)
+        self.frontiers[kind].discard(name)
+        self.seen_urls.add(normalize_url(info['url']))
+        if self.keep_records:
+            (self.movie_data if kind == MOVIE else self.actor_data)[name] = info
+        if self.writers[kind] is not None:
+            self.writers[kind].write(name, info)
+
+    def _next_job(self, has_pending):
+        """
+        Selects the next entry to crawl, alternating between movies and actors
+        :param has_pending: if any job is still in flight
+        :return: kind, name, entry and depth of the job or None if nothing should be scheduled now
+        """
+        if self._targets_met():
+            return None
+        if self._retries and self._retries[0][0] <= time.monotonic():
+            _, _, kind, name, entry, depth = heapq.heappop(self._retries)
+            return kind, name, entry, depth
+        kinds = (MOVIE, ACTOR) if self._movie_turn else (ACTOR, MOVIE)
+        self._movie_turn = not self._movie_turn
+        for kind in kinds:
+            if self._wanted(kind):
+                job = self._pop(kind)
+                if job is not None:
+                    return job
+                if not has_pending:
+                    # Frontier is empty, need to crawl data from the other kind to enlarge it
+                    logging.warning("%s frontier is empty, need to crawl the other frontier.." % kind.capitalize())
+                    self.force[ACTOR if kind == MOVIE else MOVIE] = True
+        for kind in kinds:
+            if self.force[kind]:
+                job = self._pop(kind)
+                if job is not None:
+                    return job
+        return None
+
+    def _pop(self, kind):
+        """
+        Pops the entry of highest priority which is not crawled, failed or in flight from the frontier of kind
+        :param kind: ACTOR or MOVIE
+        :return: kind, name, entry and depth of the job or None if the frontier is exhausted
+        """
+        frontier = self.frontiers[kind]
+        while True:
+            popped = frontier.pop()
+            if popped is None:
+                return None
+            entry, depth = popped
+            name = entry[frontier.key]
+            if name not in self.crawled[kind] and name not in self.failure_names and name not in self._in_flight[kind]:
+                self._in_flight[kind].add(name)
+                return kind, name, entry, depth
+
+    def _wanted(self, kind):
+        """
+        Checks if more entries of kind are needed
+        :param kind: ACTOR or MOVIE
+        :return: True if crawled and in flight entries do not reach target or crawling is forced
+        """
+        return len(self.crawled[kind]) + len(self._in_flight[kind]) < self.targets[kind] or self.force[kind]
+
+    def _targets_met(self):
+        """
+        Checks if both target numbers are reached
+        :return: True if crawling is finished
+        """
+        return len(self.crawled[MOVIE]) >= self.targets[MOVIE] and len(self.crawled[ACTOR]) >= self.targets[ACTOR]
@@ -0,0 +1,369 @@
+from collections.abc import Mapping
+import numpy as np
+from model.graph_index import GraphIndex
+from model.union_find import UnionFind
+
+ACTOR = 0
+MOVIE = 1
+
+
+class CSRVertex:
+    """
+    The light view of a vertex of CSRGraph with the same methods as Vertex. Neighbors and siblings are read from the
+    adjacency arrays on access instead of being stored per vertex.
+    """
+
+    __slots__ = ('graph', 'kind', 'index')
+
+    def __init__(self, graph, kind, index):
+        """
+        Initialize a vertex view
+        :param graph: the CSRGraph
+        :param kind: ACTOR or MOVIE
+        :param index: the integer id of vertex
+        """
+        self.graph = graph
+        self.kind = kind
+        self.index = index
+
+    def get_name(self):
+        """
+        Gets the name of vertex
+        :return: the name of vertex
+        """
+        return self.graph.names[self.kind][self.index]
+
+    def get_content(self):
+        """
+        Gets the content of vertex
+        :return: the content of vertex
+        """
+        return self.graph.contents[self.kind][self.index]
+
+    def get_neighbors(self):
+        """
+        Gets all neighbors of the vertex
+        :return: the dict of neighbor names and weights
+        """
+        other = self.graph.names[1 - self.kind]
+        ids, weights = self.graph.get_neighbor_ids(self.kind, self.index)
+        return {other[i]: w for i, w in zip(ids.tolist(), weights.tolist())}
+
+    def get_siblings(self):
+        """
+        Gets actors sharing a movie with the vertex
+        :return: the set of sibling names, which is empty for movies
+        """
+        if self.kind != ACTOR:
+            return set()
+        names = self.graph.names[ACTOR]
+        return {names[i] for i in self.graph.get_sibling_ids(self.index).tolist()}
+
+    def set_compare_value(self, value):
+        """
+        Sets comparable value of the vertex
+        :param value: the value to set
+        """
+        self.graph.compare_values[self.kind][self.index] = value
+
+    def get_compare_value(self):
+        """
+        Gets the comparable value of the vertex
+        :return: the value
+        """
+        return self.graph.compare_values[self.kind][self.index]
+
+    def __lt__(self, other):
+        return self.get_compare_value() < other.get_compare_value()
+
+    def __eq__(self, other):
+        return isinstance(other, CSRVertex) and self.graph is other.graph and self.kind == other.kind \
+               and self.index == other.index
+
+    def __hash__(self):
+        return hash((self.kind, self.index))
+
+
+class VertexMapping(Mapping):
+    """
+    The read-only dict of vertex names and vertex views of one kind
+    """
+
+    def __init__(self, graph, kind):
+        """
+        Initialize a mapping
+        :param graph: the CSRGraph
+        :param kind: ACTOR or MOVIE
+        """
+        self.graph = graph
+        self.kind = kind
+
+    def __getitem__(self, name):
+        return CSRVertex(self.graph, self.kind, self.graph.ids[self.kind][name])
+
+    def __iter__(self):
+        return iter(self.graph.names[self.kind])
+
+    def __len__(self):
+        return len(self.graph.names[self.kind])
+
+    def __contains__(self, name):
+        return name in self.graph.ids[self.kind]
+
+
+class CSRGraph:
+    """
+    The frozen actor-movie graph in compressed sparse row form. Vertices are integer ids, the neighbors of vertex i
+    are indices[indptr[i]:indptr[i + 1]] with weights at the same positions, and both directions are kept so actors
+    of a movie and movies of an actor are slices. It exposes the query methods of Graph, so query and analysis
+    functions work on either.
+    """
+
+    def __init__(self, actor_names, actor_contents, movie_names, movie_contents, actor_adjacency, movie_adjacency,
+                 siblings=None, actor_gross=None):
+        """
+        Initialize a graph from built arrays, use from_graph, from_json or model.graph_snapshot instead
+        :param actor_names: the list of actor names by id
+        :param actor_contents: the sequence of actor contents by id
+        :param movie_names: the list of movie names by id
+        :param movie_contents: the sequence of movie contents by id
+        :param actor_adjacency: indptr, indices and weights of movies of actors
+        :param movie_adjacency: indptr, indices and weights of actors of movies
+        :param siblings: indptr and indices of sibling ids of actors, or None to find siblings on access
+        :param actor_gross: the array of total gross by actor id, or None to sum it on first use
+        """
+        self.names = (actor_names, movie_names)
+        self.contents = (actor_contents, movie_contents)
+        self.ids = ({name: i for i, name in enumerate(actor_names)}, {name: i for i, name in enumerate(movie_names)})
+        self.indptr = (actor_adjacency[0], movie_adjacency[0])
+        self.indices = (actor_adjacency[1], movie_adjacency[1])
+        self.weights = (actor_adjacency[2], movie_adjacency[2])
+        self.compare_values = ([None] * len(actor_names), [None] * len(movie_names))
+        self.siblings = siblings
+        self.actor_gross = actor_gross
+        self.index = None
+        self.components = None
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Builds a CSR graph from a Graph, keeping the order of vertices and neighbors
+        :param graph: the Graph
+        :return: the CSRGraph
+        """
+        actor_vertices, movie_vertices = graph.get_actor_vertices(), graph.get_movie_vertices()
+        actor_names, movie_names = list(actor_vertices), list(movie_vertices)
+        actor_ids = {name: i for i, name in enumerate(actor_names)}
+        movie_ids = {name: i for i, name in enumerate(movie_names)}
+        return cls(actor_names, [actor_vertices[name].get_content() for name in actor_names],
+                   movie_names, [movie_vertices[name].get_content() for name in movie_names],
+                   _adjacency_from_vertices(actor_vertices, actor_names, movie_ids),
+                   _adjacency_from_vertices(movie_vertices, movie_names, actor_ids))
+
+    @classmethod
+    def from_json(cls, actor_movie_data):
+        """
+        Builds a CSR graph from data in the format of data.json without building a Graph. Contents are copied and
+        converted like construct_graph_single, and edges follow the same rules as add_edges.
+        :param actor_movie_data: the list of actor data and movie data
+        :return: the CSRGraph
+        """
+        # A later vertex of the same name replaces the content of the earlier one, as in Graph
+        actors, movies = {}, {}
+        for entry in actor_movie_data[0].values():
+            content = {key: value for key, value in entry.items() if key != 'json_class'}
+            actors[content['name']] = content
+        for entry in actor_movie_data[1].values():
+            content = {key: value for key, value in entry.items() if key != 'json_class'}
+            content['url'] = content.pop('wiki_page')
+            content['gross'] = content.pop('box_office')
+            movies[content['name']] = content
+        actor_names, actor_contents = list(actors), list(actors.values())
+        movie_names, movie_contents = list(movies), list(movies.values())
+        actor_ids = {name: i for i, name in enumerate(actor_names)}
+        movie_ids = {name: i for i, name in enumerate(movie_names)}
+
+        # The edge of a pair keeps the position of its first insertion and the weight of its last one
+        edges = {}
+        for actor_id, content in enumerate(actor_contents):
+            for movie_name in content['movies']:
+                if movie_name in movie_ids:
+                    edges[(actor_id, movie_ids[movie_name])] = content['age']
+        for movie_id, content in enumerate(movie_contents):
+            for actor_name in content['actors']:
+                if actor_name in actor_ids:
+                    edges[(actor_ids[actor_name], movie_id)] = actor_contents[actor_ids[actor_name]]['age']
+        pairs = np.array(list(edges), dtype=np.int32).reshape(-1, 2)
+        weights = np.fromiter(edges.values(), dtype=np.float64, count=len(edges))
+        return cls(actor_names, actor_contents, movie_names, movie_contents,
+                   _build_adjacency(len(actor_names), pairs[:, 0], pairs[:, 1], weights),
+                   _build_adjacency(len(movie_names), pairs[:, 1], pairs[:, 0], weights))
+
+    def get_components(self):
+        """
+        Gets the union-find of vertices connected by edges, built once from the actor adjacency arrays
+        :return: the UnionFind of vertex views
+        """
+        if self.components is None:
+            actor_names, movie_names = self.names
+            components = UnionFind(CSRVertex(self, ACTOR, i) for i in range(len(actor_names)))
+            for i in range(len(movie_names)):
+                components.add(CSRVertex(self, MOVIE, i))
+            actors = np.repeat(np.arange(len(actor_names)), np.diff(self.indptr[ACTOR]))
+            for actor, movie in zip(actors.tolist(), self.indices[ACTOR].tolist()):
+                components.union(CSRVertex(self, ACTOR, actor), CSRVertex(self, MOVIE, movie))
+            self.components = components
+        return self.components
+
+    def get_index(self):
+        """
+        Gets the secondary indexes of vertex contents, each built on first lookup
+        :return: the GraphIndex
+        """
+        if self.index is None:
+            self.index = GraphIndex(self)
+        return self.index
+
+    def get_actor_vertices(self):
+        """
+        Gets all actor vertices
+        :return: the mapping of actor names and vertex views
+        """
+        return VertexMapping(self, ACTOR)
+
+    def get_movie_vertices(self):
+        """
+        Gets all movie vertices
+        :return: the mapping of movie names and vertex views
+        """
+        return VertexMapping(self, MOVIE)
+
+    def get_all_vertices(self):
+        """
+        Gets all vertices in graph
+        :return: the dict of all vertex names and vertex views
+        """
+        ret = {}
+        ret.update(self.get_actor_vertices())
+        ret.update(self.get_movie_vertices())
+        return ret
+
+    def get_edges(self):
+        """
+        Gets all edges in graph, built on call
+        :return: the set of all edges of actor name, movie name and weight
+        """
+        actor_names, movie_names = self.names
+        actors = np.repeat(np.arange(len(actor_names)), np.diff(self.indptr[ACTOR]))
+        return {(actor_names[a], movie_names[m], w) for a, m, w in
+                zip(actors.tolist(), self.indices[ACTOR].tolist(), self.weights[ACTOR].tolist())}
+
+    def get_edge_number(self):
+        """
+        Gets the number of edges
+        :return: the number of edges
+        """
+        return len(self.indices[ACTOR])
+
+    def get_neighbor_ids(self, kind, index):
+        """
+        Gets neighbor ids and weights of a vertex
+        :param kind: ACTOR or MOVIE
+        :param index: the vertex id
+        :return: the array of neighbor ids of the other kind and the array of weights
+        """
+        start, end = self.indptr[kind][index], self.indptr[kind][index + 1]
+        return self.indices[kind][start:end], self.weights[kind][start:end]
+
+    def get_sibling_ids(self, actor_id):
+        """
+        Gets ids of actors sharing a movie with an actor
+        :param actor_id: the actor id
+        :return: the sorted array of sibling ids
+        """
+        if self.siblings is not None:
+            indptr, indices = self.siblings
+            return indices[indptr[actor_id]:indptr[actor_id + 1]]
+        movie_ids, _ = self.get_neighbor_ids(ACTOR, actor_id)
+        indptr, indices = self.indptr[MOVIE], self.indices[MOVIE]
+        if len(movie_ids) == 0:
+            return np.empty(0, dtype=indices.dtype)
+        co_stars = np.concatenate([indices[indptr[m]:indptr[m + 1]] for m in movie_ids.tolist()])
+        co_stars = np.unique(co_stars)
+        return co_stars[co_stars != actor_id]
+
+    def build_siblings(self):
+        """
+        Stores the sibling ids of all actors as CSR arrays, so siblings become slices
+        :return: indptr and indices of sibling ids
+        """
+        if self.siblings is None:
+            sibling_ids = [self.get_sibling_ids(i) for i in range(len(self.names[ACTOR]))]
+            indptr = np.zeros(len(sibling_ids) + 1, dtype=np.int64)
+            np.cumsum([len(ids) for ids in sibling_ids], out=indptr[1:])
+            indices = np.concatenate(sibling_ids).astype(np.int32) if sibling_ids else np.empty(0, dtype=np.int32)
+            self.siblings = (indptr, indices)
+        return self.siblings
+
+    def get_actor_gross(self, actor):
+        """
+        Gets the total gross of movies of an actor
+        :param actor: the actor name
+        :return: the total gross
+        """
+        return self.get_all_actor_gross()[self.ids[ACTOR][actor]].item()
+
+    def get_all_actor_gross(self):
+        """
+        Gets the total gross of all actors, summed once on first use
+        :return: the array of total gross by actor id
+        """
+        if self.actor_gross is None:
+            movie_gross = np.array([(content or {}).get('gross') or 0 for content in self.contents[MOVIE]],
+                                   dtype=np.float64)
+            actors = np.repeat(np.arange(len(self.names[ACTOR])), np.diff(self.indptr[ACTOR]))
+            self.actor_gross = np.bincount(actors, weights=movie_gross[self.indices[ACTOR]],
+                                           minlength=len(self.names[ACTOR]))
+        return self.actor_gross
+
+    def get_memory_size(self):
+        """
+        Gets the bytes of adjacency arrays
+        :return: the number of bytes
+        """
+        return sum(array.nbytes for arrays in (self.indptr, self.indices, self.weights) for array in arrays)
+
+
+def _adjacency_from_vertices(vertices, names, neighbor_ids):
+    """
+    Builds CSR arrays from the neighbor dicts of Graph vertices
+    :param vertices: the dict of vertex names and vertices
+    :param names: the list of vertex names by id
+    :param neighbor_ids: the dict of neighbor names and ids
+    :return: indptr, indices and weights
+    """
+    indptr = np.zeros(len(names) + 1, dtype=np.int64)
+    indices, weights = [], []
+    for i, name in enumerate(names):
+        neighbors = vertices[name].get_neighbors()
+        for neighbor, weight in neighbors.items():
+            indices.append(neighbor_ids[neighbor])
+            weights.append(weight)
+        indptr[i + 1] = len(indices)
+    return indptr, np.array(indices, dtype=np.int32), np.array(weights, dtype=np.float64)
+
+
+def _build_adjacency(row_number, rows, columns, weights):
+    """
+    Builds CSR arrays from edge arrays, keeping the order of edges within a row
+    :param row_number: the number of rows
+    :param rows: the array of row ids
+    :param columns: the array of column ids
+    :param weights: the array of weights
+    :return: indptr, indices and weights
+    """
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(row_number + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=row_number), out=indptr[1:])
+    return indptr, columns[order].astype(np.int32), weights[order]
+
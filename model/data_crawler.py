@@ -1,10 +1,35 @@
-from urllib.request import urlopen
-import bs4
+from inspect import getsourcefile
+import os.path as path, sys
+
+# enable import from other module directories
+current_dir = path.dirname(path.abspath(getsourcefile(lambda: 0)))
+sys.path.insert(0, current_dir[:current_dir.rfind(path.sep)])
+
+from urllib.parse import urljoin
 import re
 import json
 import logging
-import traceback
-from utils import select_bottom_k, parse_string_to_list, parse_box_office, select_top_k
+import argparse
+import functools
+from model.utils import select_bottom_k, parse_string_to_list, parse_box_office, select_top_k
+from model.crawl_engine import CrawlEngine
+from model.fetcher import Fetcher
+from model.page_cache import PageCache, CachedFetcher
+from model.checkpoint import CrawlCheckpoint
+from model.ndjson_io import NDJSONWriter
+from model.parser_backend import make_document, DEFAULT_BACKEND
+from model.scheduler import HostScheduler
+from model.frontier import PRIORITIES
+from model.seen_set import BloomFilter
+
+
+def fetch_page(url):
+    """
+    Fetches the raw page of url from page cache or over the shared connection pool
+    :param url: the page url
+    :return: the bytes of page
+    """
+    return PAGE_FETCHER.fetch(url)
 
 
 def get_movie_from_actor(url):
@@ -13,9 +38,22 @@ def get_movie_from_actor(url):
     :param url: the actor url
     :return: actor name, actor information, movie information
     """
-    respond = urlopen(url)
+    return parse_actor_page(fetch_page(url), url)
+
 
-    webpage = bs4.BeautifulSoup(respond.read(), "html.parser")
+def parse_actor_page(page, url, backend=None, select_number=None):
+    """
+    Parses the actor information and movie information from a fetched actor page. Parse worker processes do not
+    see module settings changed after import, so the crawler passes backend and select number explicitly.
+    :param page: the bytes of actor page
+    :param url: the actor url
+    :param backend: the parser backend, default to PARSER_BACKEND
+    :param select_number: the number of movies kept, default to SELECT_MOVIE_PER_ACTOR
+    :return: actor name, actor information, movie information
+    """
+    if select_number is None:
+        select_number = SELECT_MOVIE_PER_ACTOR
+    webpage = make_document(page, backend or PARSER_BACKEND)
     movie_info = []
     actor_info = {}
 
@@ -31,19 +69,19 @@ def get_movie_from_actor(url):
         else:
             # Example: https://en.wikipedia.org/wiki/Shirley_MacLaine
             filmography = webpage.find("span", attrs={"id": "Filmography"}).find_parent()
-        table_entry = filmography.find_next_sibling()
+        table_rows = filmography.find_next_sibling().find_all('tr')
 
-        if len(table_entry.find_all('tr')) == 0:
+        if len(table_rows) == 0:
             warning = 'Filmography table is not found'
             logging.warning(warning)
             raise ValueError(warning)
-        for row in table_entry.find_all('tr'):
+        for row in table_rows:
             try:
                 columns = row.find_all('td')
                 movie_entry_info = {}
                 movie_entry_info['title'] = columns[1].get_text()
                 movie_entry_info['year'] = int(columns[0].get_text())
-                movie_entry_info['url'] = "https://en.wikipedia.org" + (row.find('a')).get('href')
+                movie_entry_info['url'] = urljoin(url, (row.find('a')).get('href'))
                 movie_info.append(movie_entry_info)
                 movie_list.append(movie_entry_info['title'])
             except:
@@ -63,7 +101,7 @@ def get_movie_from_actor(url):
                 year = re.search("\((.+)\)", row.get_text()).group(1)
 
                 movie_entry_info['title'] = title
-                movie_entry_info['url'] = "https://en.wikipedia.org" + entry.get('href')
+                movie_entry_info['url'] = urljoin(url, entry.get('href'))
                 movie_entry_info['year'] = int(year)
                 movie_info.append(movie_entry_info)
                 movie_list.append(title)
@@ -73,10 +111,23 @@ def get_movie_from_actor(url):
     if not movie_list:
         warning = 'Failed to get movie data'
         raise ValueError(warning)
-    actor_info['url'] = url
-    actor_info['movies'] = select_bottom_k(movie_list, SELECT_MOVIE_PER_ACTOR)
+    actor_info['url'] = get_canonical_url(webpage, url)
+    actor_info['movies'] = select_bottom_k(movie_list, select_number)
     actor_info['age'] = int(actor_year)
-    return actor_name, actor_info, select_bottom_k(movie_info, SELECT_MOVIE_PER_ACTOR)
+    return actor_name, actor_info, select_bottom_k(movie_info, select_number)
+
+
+def get_canonical_url(webpage, url):
+    """
+    Gets the canonical url of a page, which differs from the fetched url for redirects and alternate titles
+    :param webpage: the document node of page
+    :param url: the fetched url
+    :return: the canonical url or the fetched url if the page does not declare one
+    """
+    canonical = webpage.find("link", attrs={"rel": "canonical"})
+    if canonical is None or not canonical.get('href'):
+        return url
+    return urljoin(url, canonical.get('href'))
 
 
 def get_actor_from_movie(url):
@@ -85,8 +136,21 @@ def get_actor_from_movie(url):
     :param url: the movie url
     :return: movie name, movie information, actor information
     """
-    respond = urlopen(url)
-    webpage = bs4.BeautifulSoup(respond.read(), "html.parser")
+    return parse_movie_page(fetch_page(url), url)
+
+
+def parse_movie_page(page, url, backend=None, select_number=None):
+    """
+    Parses the movie information and actor information from a fetched movie page
+    :param page: the bytes of movie page
+    :param url: the movie url
+    :param backend: the parser backend, default to PARSER_BACKEND
+    :param select_number: the number of actors kept, default to SELECT_ACTOR_PER_MOVIE
+    :return: movie name, movie information, actor information
+    """
+    if select_number is None:
+        select_number = SELECT_ACTOR_PER_MOVIE
+    webpage = make_document(page, backend or PARSER_BACKEND)
     movie_info = {}
     actor_info = []
 
@@ -94,20 +158,22 @@ def get_actor_from_movie(url):
     movie_name = webpage.find("h1", attrs={"id": "firstHeading", "class": "firstHeading"}).get_text()
     infobox = webpage.find('table', attrs={'class': 'infobox vevent'})
     for row in infobox.find_all('tr'):
-        if row.find('th') is not None:
-            if row.find('th').get_text() == 'Starring':
+        header = row.find('th')
+        if header is not None:
+            header = header.get_text()
+            if header == 'Starring':
                 for entry in row.find_all('a'):
                     actor_entry_info = {}
-                    actor_entry_info['url'] = "https://en.wikipedia.org" + entry.get('href')
+                    actor_entry_info['url'] = urljoin(url, entry.get('href'))
                     actor_entry_info['name'] = entry.get_text()
                     actor_info.append(actor_entry_info)
                     actor_list.append(actor_entry_info['name'])
 
-            elif row.find('th').get_text() == 'Country':
+            elif header == 'Country':
                 movie_info['country'] = parse_string_to_list(row.find('td').get_text())
-            elif row.find('th').get_text() == 'Box office':
+            elif header == 'Box office':
                 movie_info['gross'] = parse_box_office(row.find('td').get_text())
-            elif row.find('th').get_text() == 'Language':
+            elif header == 'Language':
                 movie_info['lang'] = parse_string_to_list(row.find('td').get_text())
 
     # only use movie with gross
@@ -116,13 +182,17 @@ def get_actor_from_movie(url):
         logging.warning(warning)
         raise ValueError(warning)
 
-    movie_info['actors'] = select_top_k(actor_list, SELECT_ACTOR_PER_MOVIE)
-    movie_info['url'] = url
-    return movie_name, movie_info, select_top_k(actor_info, SELECT_ACTOR_PER_MOVIE)
+    movie_info['actors'] = select_top_k(actor_list, select_number)
+    movie_info['url'] = get_canonical_url(webpage, url)
+    return movie_name, movie_info, select_top_k(actor_info, select_number)
 
 
 ACTOR_FILE_PATH = '../data/actors_small.json'
 MOVIE_FILE_PATH = '../data/movies_small.json'
+# Stream each crawled record to newline-delimited JSON (gzip for ".gz") instead of dumping dicts at the end
+STREAM_OUTPUT = True
+ACTOR_STREAM_PATH = '../data/actors_small.ndjson.gz'
+MOVIE_STREAM_PATH = '../data/movies_small.ndjson.gz'
 START_URL = 'https://en.wikipedia.org/wiki/Morgan_Freeman'
 FORCE_CRAWL_A = False
 FORCE_CRAWL_M = False
@@ -133,96 +203,81 @@ TARGET_ACTOR_NUMBER = 30
 SELECT_MOVIE_PER_ACTOR = 5
 SELECT_ACTOR_PER_MOVIE = 5
 
-if __name__ == "__main__":
-    actor_num = 0
-    movie_num = 0
-    actor_data = {}
-    movie_data = {}
-    failure_names = set()
+CRAWL_CONCURRENCY = 8
+PARSER_BACKEND = DEFAULT_BACKEND  # 'lxml' when installed, otherwise 'html.parser'
+REQUESTS_PER_SECOND = 5.0  # The request rate allowed for each host
+REQUEST_BURST = 10  # The number of requests a host may receive at once
+MAX_RETRIES = 4  # The number of retries of a url failed with a transient error
+# The number of processes parsing fetched pages, 0 to parse in the crawl thread. Off by default: an lxml parse takes
+# a few milliseconds per page, well below the request interval of a host
+PARSE_WORKERS = 0
+# The order of frontier: 'lifo' (depth-first), 'bfs', 'references' (most linked first) or 'gross' (box office)
+FRONTIER_PRIORITY = 'references'
+SEEN_CAPACITY = 1000000  # The expected number of urls and names seen by a crawl
+SEEN_ERROR_RATE = 0.001  # The chance that an unseen url is skipped as seen
+
+PAGE_CACHE_DIR = '../data/page_cache'
+PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+OFFLINE = False  # Only crawl pages in page cache and never touch the network
 
-    actor_stack = []
-    movie_stack = []
+CHECKPOINT_DIR = '../data/checkpoint'
+CHECKPOINT_INTERVAL = 20  # The number of crawled entries between two checkpoint commits
+
+# The fetch layer shared by actor and movie parsers
+FETCHER = Fetcher(pool_size=CRAWL_CONCURRENCY)
+PAGE_FETCHER = CachedFetcher(FETCHER, PageCache(PAGE_CACHE_DIR, PAGE_CACHE_MAX_BYTES), offline=OFFLINE)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl actor and movie data from Wikipedia")
+    parser.add_argument('--resume', action='store_true', help="continue from the last checkpoint")
+    args = parser.parse_args()
 
     logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s',
                         datefmt='%m/%d/%Y %I:%M:%S %p',
                         filename='data_crawler.log',
-                        filemode='w',
+                        filemode='a' if args.resume else 'w',
                         level=logging.INFO)
 
-    logging.info("start crawling website %s" % START_URL)
-    try:
-        actor_name, actor_info, movie_info = get_movie_from_actor(START_URL)
-        actor_data[actor_name] = actor_info
-        actor_num += 1
-        movie_stack += select_bottom_k(movie_info, SELECT_MOVIE_PER_ACTOR)
-    except AttributeError:
-        logging.error("Failed to get actor data from start url " + traceback.print_exc())
-
-    # Loop for data crawling
-    while movie_num < TARGET_MOVIE_NUMBER or actor_num < TARGET_ACTOR_NUMBER:
-        # process a movie
-        if len(movie_stack) == 0 and len(actor_stack) == 0:
-            logging.error("No left urls to crawl..\n Program will exit..")
-            break
-
-        if movie_num < TARGET_MOVIE_NUMBER or FORCE_CRAWL_M:
-            while 1:
-                if len(movie_stack) == 0:
-                    logging.warning("Movie stack is empty, need to crawl data from actors to enlarge movie stack..")
-                    FORCE_CRAWL_A = True
-                    break
-                movie = movie_stack.pop()
-                if movie['title'] not in movie_data:
-                    break
-
-            if not FORCE_CRAWL_A:
-                logging.info("Crawling movie %s from %s" % (movie['title'].encode("UTF-8"), movie['url']))
-                url = movie['url']
-                try:
-                    movie_name, movie_info, actor_info = get_actor_from_movie(url)
-                    movie_info.update(movie)
-                    movie_info.pop('title')
-                    movie_data[movie['title']] = movie_info
-                    movie_num += 1
-                    actor_stack += actor_info
-                    if len(actor_stack) > 0:
-                        FORCE_CRAWL_M = False
-                except:
-                    logging.warning("Failed to get all required information from this url.. will try next one")
-                    pass
-
-        # process an actor
-        if actor_num < TARGET_ACTOR_NUMBER or FORCE_CRAWL_A:
-            while 1:
-                if len(actor_stack) == 0:
-                    logging.warning("Actor stack is empty, need to crawl data from movies to enlarge actor stack..")
-                    FORCE_CRAWL_M = True
-                    break
-                actor = actor_stack.pop()
-                if actor['name'] not in actor_data:
-                    break
-
-            if not FORCE_CRAWL_M:
-                logging.info("Crawling actor %s from %s" % (actor['name'].encode("UTF-8"), actor['url']))
-                url = actor['url']
-                try:
-                    actor_name, actor_info, movie_info = get_movie_from_actor(url)
-                    actor_data[actor['name']] = actor_info
-                    actor_num += 1
-                    movie_stack += movie_info
-                    if len(movie_stack) > 0:
-                        FORCE_CRAWL_A = False
-                except:
-                    logging.warning("Failed to get all required information from this url.. will try next one")
-                    pass
-
-    logging.info("Writing to json files..")
-    actor_file = open(ACTOR_FILE_PATH, 'w')
-    movie_file = open(MOVIE_FILE_PATH, 'w')
-    jsonData = json.dumps(actor_data, indent=4)
-    actor_file.write(jsonData)
-    jsonData = json.dumps(movie_data, indent=4)
-    movie_file.write(jsonData)
-    logging.info("Successfully stored data to json files")
-    actor_file.close()
-    movie_file.close()
+    scheduler = HostScheduler(rate=REQUESTS_PER_SECOND, burst=REQUEST_BURST, max_retries=MAX_RETRIES)
+    actor_writer = NDJSONWriter(ACTOR_STREAM_PATH) if STREAM_OUTPUT else None
+    movie_writer = NDJSONWriter(MOVIE_STREAM_PATH) if STREAM_OUTPUT else None
+    # Settings are bound to the parsers here, so parse worker processes use them too
+    engine = CrawlEngine(fetch_page,
+                         functools.partial(parse_actor_page, backend=PARSER_BACKEND,
+                                           select_number=SELECT_MOVIE_PER_ACTOR),
+                         functools.partial(parse_movie_page, backend=PARSER_BACKEND,
+                                           select_number=SELECT_ACTOR_PER_MOVIE),
+                         target_movie_number=TARGET_MOVIE_NUMBER,
+                         target_actor_number=TARGET_ACTOR_NUMBER,
+                         concurrency=CRAWL_CONCURRENCY,
+                         force_crawl_actor=FORCE_CRAWL_A,
+                         force_crawl_movie=FORCE_CRAWL_M,
+                         checkpoint=CrawlCheckpoint(CHECKPOINT_DIR, CHECKPOINT_INTERVAL),
+                         actor_writer=actor_writer,
+                         movie_writer=movie_writer,
+                         keep_records=not STREAM_OUTPUT,
+                         parse_workers=PARSE_WORKERS,
+                         scheduler=scheduler,
+                         priority=PRIORITIES[FRONTIER_PRIORITY],
+                         seen_set=functools.partial(BloomFilter, SEEN_CAPACITY, SEEN_ERROR_RATE))
+    actor_data, movie_data = engine.run(START_URL, resume=args.resume)
+    PAGE_FETCHER.close()
+    logging.info("Fetch statistics: %s" % PAGE_FETCHER.get_stats())
+    logging.info("Scheduler statistics: %s" % scheduler.get_stats())
+
+    if STREAM_OUTPUT:
+        actor_writer.close()
+        movie_writer.close()
+        logging.info("Successfully streamed %d actors and %d movies to ndjson files"
+                     % (actor_writer.count, movie_writer.count))
+    else:
+        logging.info("Writing to json files..")
+        actor_file = open(ACTOR_FILE_PATH, 'w')
+        movie_file = open(MOVIE_FILE_PATH, 'w')
+        jsonData = json.dumps(actor_data, indent=4)
+        actor_file.write(jsonData)
+        jsonData = json.dumps(movie_data, indent=4)
+        movie_file.write(jsonData)
+        logging.info("Successfully stored data to json files")
+        actor_file.close()
+        movie_file.close()
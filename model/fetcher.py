@@ -0,0 +1,272 @@
+import gzip
+import http.client
+import threading
+import time
+import zlib
+from email.message import Message
+from urllib.error import HTTPError
+from urllib.parse import urlsplit, urljoin
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+USER_AGENT = 'DataCrawler/1.0 (https://github.com/ryannli/DataCrawler)'
+MAX_REDIRECTS = 5
+
+
+class Response:
+    """
+    The response of a fetch
+    """
+
+    def __init__(self, url, status, headers, body):
+        """
+        Initialize a response
+        :param url: the final url after redirects
+        :param status: the HTTP status code
+        :param headers: the dict of lower-cased response headers
+        :param body: the decoded bytes of body
+        """
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class Fetcher:
+    """
+    The fetch layer shared by crawler parsers. It keeps persistent connections in a pool per host, requests
+    compressed bodies and records bytes, connection reuse and latency of every request.
+    """
+
+    def __init__(self, pool_size=8, timeout=30, user_agent=USER_AGENT):
+        """
+        Initialize a fetcher
+        :param pool_size: the maximum number of idle connections kept per host
+        :param timeout: the socket timeout in seconds
+        :param user_agent: the User-Agent header
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.accept_encoding = "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def fetch(self, url):
+        """
+        Fetches the body of url
+        :param url: the page url
+        :return: the decoded bytes of page
+        """
+        response = self.request(url)
+        raise_for_status(response)
+        return response.body
+
+    def request(self, url, headers=None):
+        """
+        Sends a GET request over a pooled connection and follows redirects
+        :param url: the page url
+        :param headers: the dict of extra request headers
+        :return: the Response
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request_once(url, headers or {})
+            if response.status in (301, 302, 303, 307, 308) and 'location' in response.headers:
+                url = urljoin(url, response.headers['location'])
+                continue
+            return response
+        raise HTTPError(url, response.status, "Too many redirects", _to_message(response.headers), None)
+
+    def _request_once(self, url, headers):
+        """
+        Sends a single GET request. A stale keep-alive connection is retried once on a fresh connection.
+        :param url: the page url
+        :param headers: the dict of extra request headers
+        :return: the Response
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        request_headers = {'User-Agent': self.user_agent, 'Accept-Encoding': self.accept_encoding,
+                           'Connection': 'keep-alive'}
+        request_headers.update(headers)
+
+        start = time.perf_counter()
+        conn, reused = self._checkout(key)
+        while True:
+            try:
+                conn.request('GET', path, headers=request_headers)
+                raw = conn.getresponse()
+                data = raw.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed the idle connection, open a new one and retry once
+                conn, reused = self._new_connection(key), False
+            except Exception:
+                conn.close()
+                raise
+        latency = time.perf_counter() - start
+
+        if raw.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+        response_headers = {name.lower(): value for name, value in raw.getheaders()}
+        body = decode_body(data, response_headers.get('content-encoding', ''))
+        self._record(len(data), len(body), reused, latency)
+        return Response(url, raw.status, response_headers, body)
+
+    def _checkout(self, key):
+        """
+        Takes an idle connection of host from pool or opens a new one
+        :param key: the tuple of scheme and host
+        :return: the connection and if it is reused
+        """
+        with self._lock:
+            idle = self._pools.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(key), False
+
+    def _checkin(self, key, conn):
+        """
+        Returns a connection to the pool of host
+        :param key: the tuple of scheme and host
+        :param conn: the connection
+        """
+        with self._lock:
+            idle = self._pools.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _new_connection(self, key):
+        """
+        Opens a new connection to host
+        :param key: the tuple of scheme and host
+        :return: the connection
+        """
+        scheme, netloc = key
+        with self._lock:
+            self._stats['connections'] += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def _record(self, wire_bytes, body_bytes, reused, latency):
+        """
+        Records statistics of a finished request
+        :param wire_bytes: the number of bytes received on the wire
+        :param body_bytes: the number of bytes after decoding
+        :param reused: if the connection is reused
+        :param latency: the seconds of the request
+        """
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['wire_bytes'] += wire_bytes
+            self._stats['body_bytes'] += body_bytes
+            self._stats['reused'] += int(reused)
+            self._latencies.append(latency)
+
+    def reset_stats(self):
+        """
+        Resets all statistics
+        """
+        with self._lock:
+            self._stats = {'requests': 0, 'connections': 0, 'reused': 0, 'wire_bytes': 0, 'body_bytes': 0}
+            self._latencies = []
+
+    def get_stats(self):
+        """
+        Gets the statistics of fetches
+        :return: the dict of request count, bytes, connection reuse rate and latency in seconds
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+        requests = stats['requests']
+        stats['reuse_rate'] = stats['reused'] / requests if requests else 0.0
+        stats['compression_ratio'] = stats['wire_bytes'] / stats['body_bytes'] if stats['body_bytes'] else 1.0
+        stats['latency_mean'] = sum(latencies) / requests if requests else 0.0
+        stats['latency_p50'] = _percentile(latencies, 0.5)
+        stats['latency_p95'] = _percentile(latencies, 0.95)
+        stats['latency_max'] = latencies[-1] if latencies else 0.0
+        return stats
+
+    def close(self):
+        """
+        Closes all idle connections
+        """
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+
+def raise_for_status(response):
+    """
+    Raises HTTPError carrying response headers if the response is not successful
+    :param response: the Response
+    """
+    if not 200 <= response.status < 300:
+        raise HTTPError(response.url, response.status, "Failed to fetch page", _to_message(response.headers), None)
+
+
+def decode_body(data, content_encoding):
+    """
+    Decodes a compressed body according to Content-Encoding
+    :param data: the bytes on the wire
+    :param content_encoding: the value of Content-Encoding header
+    :return: the decoded bytes
+    """
+    encoding = content_encoding.strip().lower()
+    if encoding in ('', 'identity'):
+        return data
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.decompress(data)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(data)
+        except zlib.error:
+            # Some servers send raw deflate stream without zlib header
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+    if encoding == 'br' and brotli is not None:
+        return brotli.decompress(data)
+    raise ValueError('Unsupported content encoding %s' % content_encoding)
+
+
+def _percentile(sorted_values, fraction):
+    """
+    Gets the percentile from sorted values
+    :param sorted_values: the sorted list of values
+    :param fraction: the percentile between 0 and 1
+    :return: the value at percentile
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _to_message(headers):
+    """
+    Converts a dict of headers to email message used by HTTPError
+    :param headers: the dict of headers
+    :return: the message
+    """
+    message = Message()
+    for name, value in headers.items():
+        message[name] = value
+    return message
@@ -0,0 +1,148 @@
+import heapq
+import itertools
+
+
+def lifo_priority(sequence, depth, references, weight):
+    """
+    The depth-first order of the original stacks: the latest new entry first
+    """
+    return -sequence
+
+
+def bfs_priority(sequence, depth, references, weight):
+    """
+    The breadth-first order: the shallowest entry first, then the earliest
+    """
+    return depth, sequence
+
+
+def reference_priority(sequence, depth, references, weight):
+    """
+    The most referenced entry first, then the shallowest
+    """
+    return -references, depth, -sequence
+
+
+def gross_priority(sequence, depth, references, weight):
+    """
+    The entry with the highest box office of the pages referring to it first, then the most referenced
+    """
+    return -weight, -references, -sequence
+
+
+PRIORITIES = {
+    'lifo': lifo_priority,
+    'bfs': bfs_priority,
+    'references': reference_priority,
+    'gross': gross_priority,
+}
+
+
+class _Item:
+    """
+    A queued entry of frontier
+    """
+
+    __slots__ = ('entry', 'depth', 'references', 'weight', 'sequence', 'version')
+
+    def __init__(self, entry, depth, weight, sequence):
+        self.entry = entry
+        self.depth = depth
+        self.references = 1
+        self.weight = weight
+        self.sequence = sequence
+        self.version = 0
+
+
+class Frontier:
+    """
+    The crawl frontier of actor or movie entries. Entries are deduplicated on insert with a seen-set and popped by a
+    pluggable priority. Referencing a queued entry again raises its reference count, weight and priority.
+    """
+
+    def __init__(self, key, priority=lifo_priority, seen=None):
+        """
+        Initialize a frontier
+        :param key: the key of entry name, 'name' for actors and 'title' for movies
+        :param priority: the function of sequence, depth, references and weight returning a key, smaller first
+        :param seen: the set-like container of names ever pushed, default to a set
+        """
+        self.key = key
+        self.priority = priority
+        self.seen = seen if seen is not None else set()
+        self._heap = []
+        self._queued = {}
+        self._sequence = itertools.count()
+
+    def push(self, entry, depth=0, weight=0.0):
+        """
+        Pushes an entry unless its name has been seen
+        :param entry: the dict of entry
+        :param depth: the number of links from start page
+        :param weight: the weight added to entry, such as box office of the referring movie
+        :return: True if the entry is new
+        """
+        name = entry[self.key]
+        item = self._queued.get(name)
+        if item is not None:
+            item.references += 1
+            item.weight += weight
+            item.depth = min(item.depth, depth)
+            item.version += 1
+            self._heap_push(name, item)
+            return False
+        if name in self.seen:
+            return False
+        self.seen.add(name)
+        item = _Item(entry, depth, weight, next(self._sequence))
+        self._queued[name] = item
+        self._heap_push(name, item)
+        return True
+
+    def pop(self):
+        """
+        Pops the entry of highest priority
+        :return: the entry and its depth or None if frontier is empty
+        """
+        while self._heap:
+            _, _, name, version = heapq.heappop(self._heap)
+            item = self._queued.get(name)
+            if item is None or item.version != version:
+                # Outdated by a later reference or discarded
+                continue
+            del self._queued[name]
+            return item.entry, item.depth
+        return None
+
+    def discard(self, name):
+        """
+        Removes a queued entry and marks its name as seen
+        :param name: the entry name
+        """
+        self._queued.pop(name, None)
+        self.seen.add(name)
+
+    def get_references(self, name):
+        """
+        Gets the reference count of a queued entry
+        :param name: the entry name
+        :return: the count or 0 if the entry is not queued
+        """
+        item = self._queued.get(name)
+        return item.references if item is not None else 0
+
+    def __len__(self):
+        return len(self._queued)
+
+    def __contains__(self, name):
+        return name in self._queued
+
+    def _heap_push(self, name, item):
+        """
+        Pushes the current version of item to heap, older versions are skipped when popped
+        :param name: the entry name
+        :param item: the queued item
+        """
+        priority = self.priority(item.sequence, item.depth, item.references, item.weight)
+        heapq.heappush(self._heap, (priority, item.sequence, name, item.version))
+
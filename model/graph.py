@@ -1,10 +1,14 @@
 # Referenced from http://www.bogotobogo.com/python/python_graph_data_structures.php
+from model.union_find import UnionFind
+from model.graph_index import GraphIndex, ACTOR, MOVIE
 
 class Vertex:
     """
-    The vertex class
+    The vertex class. Slots keep vertices free of a per-instance dict.
     """
 
+    __slots__ = ('name', 'content', 'neighbors', 'siblings', 'value_for_sort')
+
     def __init__(self, name, content):
         """
         Initialize a new vertex with vertex name and content
@@ -44,7 +48,11 @@ class Vertex:
         self.siblings.add(vertex_name)
 
     def remove_sibling(self, vertex_name):
-        self.siblings.remove(vertex_name)
+        """
+        Removes a sibling of the vertex if present
+        :param vertex_name: the vertex name to remove
+        """
+        self.siblings.discard(vertex_name)
 
     def get_siblings(self):
         return self.siblings
@@ -88,9 +96,15 @@ class Vertex:
 
 class Graph:
     """
-    The graph class to hold vertices
+    The graph class to hold vertices. Vertex names are interned in a per-graph table, so vertex keys, neighbor
+    dicts, sibling sets and edges share one string object per name. Vertices and edges can be added and removed
+    at a cost proportional to the local degree, keeping neighbors, siblings, edges and the cached total gross of
+    actors consistent. Connected components are tracked by a union-find of vertices as edges are added, and
+    built secondary indexes of contents are kept current.
     """
 
+    vertex_type = Vertex
+
     def __init__(self):
         """
         Initialize a graph
@@ -98,6 +112,21 @@ class Graph:
         self.movie_vertices = dict()
         self.actor_vertices = dict()
         self.edges = set()
+        self.names = dict()
+        self._siblings_built = False
+        self._actor_gross = dict()
+        self.references = dict()
+        self._components = UnionFind()
+        self._components_stale = False
+        self._index = None
+
+    def intern_name(self, name):
+        """
+        Gets the string object of a name shared by the whole graph
+        :param name: the vertex name
+        :return: the interned name
+        """
+        return self.names.setdefault(name, name)
 
     def add_movie_vertex(self, name, content=None):
         """
@@ -106,8 +135,17 @@ class Graph:
         :param content: the content of movie vertex
         :return: the added vertex
         """
-        vertex = Vertex(name, content)
+        name = self.intern_name(name)
+        vertex = self.vertex_type(name, content)
+        if name in self.movie_vertices:
+            # The replaced vertex stays in the union-find
+            self._components_stale = True
+            if self._index is not None:
+                self._index.remove_vertex(MOVIE, self.movie_vertices[name])
         self.movie_vertices[name] = vertex
+        self._components.add(vertex)
+        if self._index is not None:
+            self._index.add_vertex(MOVIE, vertex)
         return vertex
 
     def add_actor_vertex(self, name, content=None):
@@ -117,13 +155,23 @@ class Graph:
         :param content: the content of actor vertex
         :return: the added vertex
         """
-        vertex = Vertex(name, content)
+        name = self.intern_name(name)
+        vertex = self.vertex_type(name, content)
+        if name in self.actor_vertices:
+            # The replaced vertex stays in the union-find
+            self._components_stale = True
+            if self._index is not None:
+                self._index.remove_vertex(ACTOR, self.actor_vertices[name])
         self.actor_vertices[name] = vertex
+        self._components.add(vertex)
+        if self._index is not None:
+            self._index.add_vertex(ACTOR, vertex)
         return vertex
 
     def add_edge(self, actor, movie, weight):
         """
-        Adds an edge between actor and movie vertices
+        Adds an edge between actor and movie vertices. Once siblings are built, the actor becomes a sibling of the
+        other actors of movie.
         :param actor: the actor vertex
         :param movie: the movie vertex
         :param weight: the weight of edge
@@ -131,9 +179,202 @@ class Graph:
         if movie not in self.movie_vertices or actor not in self.actor_vertices:
             return
 
+        actor, movie = self.intern_name(actor), self.intern_name(movie)
+        neighbors = self.actor_vertices[actor].get_neighbors()
+        if movie in neighbors:
+            # Adding an existing edge replaces its weight
+            self.edges.discard((actor, movie, neighbors[movie]))
+        elif self._index is not None:
+            self._index.add_edge(actor, movie)
+        self._actor_gross.pop(actor, None)
         self.actor_vertices[actor].add_neighbor(movie, weight)
         self.movie_vertices[movie].add_neighbor(actor, weight)
         self.edges.add((actor, movie, weight))
+        if not self._components_stale:
+            self._components.union(self.actor_vertices[actor], self.movie_vertices[movie])
+        if self._siblings_built:
+            self._link_siblings(actor, self.movie_vertices[movie].get_neighbors())
+
+    def add_edges_from(self, edges):
+        """
+        Adds many edges in one pass, the bulk form of add_edge for building graphs. An edge of a connected pair with
+        the same weight is skipped, so edges listed from both sides are inserted once. Other edges of connected
+        pairs and edges of graphs with built siblings go through add_edge. Components are rebuilt when next asked
+        for instead of being merged edge by edge.
+        :param edges: the iterable of actor name, movie name and weight, edges with a missing vertex are skipped
+        """
+        actor_vertices, movie_vertices = self.actor_vertices, self.movie_vertices
+        for actor, movie, weight in edges:
+            actor_vertex, movie_vertex = actor_vertices.get(actor), movie_vertices.get(movie)
+            if actor_vertex is None or movie_vertex is None:
+                continue
+            neighbors = actor_vertex.neighbors
+            if movie in neighbors:
+                if neighbors[movie] != weight:
+                    self.add_edge(actor, movie, weight)
+                continue
+            if self._siblings_built:
+                self.add_edge(actor, movie, weight)
+                continue
+            # Vertex names are already interned
+            actor, movie = actor_vertex.name, movie_vertex.name
+            neighbors[movie] = weight
+            movie_vertex.neighbors[actor] = weight
+            self.edges.add((actor, movie, weight))
+            self._actor_gross.pop(actor, None)
+            self._components_stale = True
+            if self._index is not None:
+                self._index.add_edge(actor, movie)
+
+    def remove_edge(self, actor, movie):
+        """
+        Removes the edge between actor and movie vertices. Once siblings are built, the actor stops being a sibling
+        of the other actors of movie unless they share another movie.
+        :param actor: the actor name
+        :param movie: the movie name
+        :return: if the edge existed
+        """
+        actor_vertex, movie_vertex = self.actor_vertices.get(actor), self.movie_vertices.get(movie)
+        if actor_vertex is None or movie_vertex is None or movie not in actor_vertex.get_neighbors():
+            return False
+
+        weight = actor_vertex.get_neighbors()[movie]
+        if self._index is not None:
+            self._index.remove_edge(actor, movie)
+        actor_vertex.remove_neighbor(movie)
+        movie_vertex.remove_neighbor(actor)
+        self.edges.discard((actor, movie, weight))
+        self._actor_gross.pop(actor, None)
+        # Union-find cannot split sets, so components are rebuilt when next asked for
+        self._components_stale = True
+        if self._siblings_built:
+            self._unlink_siblings(actor, movie_vertex.get_neighbors())
+        return True
+
+    def remove_actor_vertex(self, name):
+        """
+        Removes an actor vertex and all its edges
+        :param name: the name of actor vertex
+        :return: the removed vertex or None if not found
+        """
+        vertex = self.actor_vertices.get(name)
+        if vertex is None:
+            return None
+        for movie in list(vertex.get_neighbors()):
+            self.remove_edge(name, movie)
+        del self.actor_vertices[name]
+        self._components_stale = True
+        if self._index is not None:
+            self._index.remove_vertex(ACTOR, vertex)
+        self._actor_gross.pop(name, None)
+        self._release_name(name)
+        return vertex
+
+    def remove_movie_vertex(self, name):
+        """
+        Removes a movie vertex and all its edges
+        :param name: the name of movie vertex
+        :return: the removed vertex or None if not found
+        """
+        vertex = self.movie_vertices.get(name)
+        if vertex is None:
+            return None
+        for actor in list(vertex.get_neighbors()):
+            self.remove_edge(actor, name)
+        del self.movie_vertices[name]
+        self._components_stale = True
+        if self._index is not None:
+            self._index.remove_vertex(MOVIE, vertex)
+        self._release_name(name)
+        return vertex
+
+    def update_actor_content(self, name, changes):
+        """
+        Updates the content of an actor vertex
+        :param name: the name of actor vertex
+        :param changes: the dict of content keys and new values
+        """
+        self._update_content(ACTOR, self.actor_vertices[name], changes)
+
+    def update_movie_content(self, name, changes):
+        """
+        Updates the content of a movie vertex. The cached total gross of its actors is dropped.
+        :param name: the name of movie vertex
+        :param changes: the dict of content keys and new values
+        """
+        vertex = self.movie_vertices[name]
+        self._update_content(MOVIE, vertex, changes)
+        for actor in vertex.get_neighbors():
+            self._actor_gross.pop(actor, None)
+
+    def add_reference(self, name, referrer):
+        """
+        Records that the content of a vertex refers to a vertex not in the graph yet, so the edge can be added when
+        the missing vertex is
+        :param name: the name of missing vertex
+        :param referrer: the name of referring vertex
+        """
+        self.references.setdefault(name, set()).add(referrer)
+
+    def get_references(self, name):
+        """
+        Gets the names of vertices recorded as referring to a vertex. Referrers may have changed since, so callers
+        check their content again.
+        :param name: the vertex name
+        :return: the set of referrer names
+        """
+        return self.references.get(name, set())
+
+    def remove_reference(self, name, referrer):
+        """
+        Removes a recorded reference
+        :param name: the name of referred vertex
+        :param referrer: the name of referring vertex
+        """
+        referrers = self.references.get(name)
+        if referrers is not None:
+            referrers.discard(referrer)
+            if not referrers:
+                del self.references[name]
+
+    def get_actor_gross(self, actor):
+        """
+        Gets the total gross of movies of an actor, cached until its edges or the gross of its movies change
+        :param actor: the actor name
+        :return: the total gross
+        """
+        gross = self._actor_gross.get(actor)
+        if gross is None:
+            movie_vertices = self.movie_vertices
+            gross = sum((movie_vertices[movie].get_content() or {}).get('gross') or 0
+                        for movie in self.actor_vertices[actor].get_neighbors())
+            self._actor_gross[actor] = gross
+        return gross
+
+    def get_components(self):
+        """
+        Gets the union-find of vertices connected by edges, rebuilt if edges or vertices were removed since
+        :return: the UnionFind of vertices
+        """
+        if self._components_stale:
+            components = UnionFind(self.actor_vertices.values())
+            for vertex in self.movie_vertices.values():
+                components.add(vertex)
+            for vertex in self.actor_vertices.values():
+                for movie in vertex.get_neighbors():
+                    components.union(vertex, self.movie_vertices[movie])
+            self._components = components
+            self._components_stale = False
+        return self._components
+
+    def get_index(self):
+        """
+        Gets the secondary indexes of vertex contents, each built on first lookup and then kept current
+        :return: the GraphIndex
+        """
+        if self._index is None:
+            self._index = GraphIndex(self)
+        return self._index
 
     def get_actor_vertices(self):
         """
@@ -168,13 +409,70 @@ class Graph:
 
     def add_actor_siblings(self):
         """
-        Add actor siblings which has any common neighbor with current vertex
+        Add actor siblings which has any common neighbor with current vertex. Actor lists of movies are walked, so
+        the work grows with the number of co-star pairs instead of all actor pairs.
+        """
+        actor_vertices = self.actor_vertices
+        for movie in self.movie_vertices.values():
+            actors = movie.get_neighbors()
+            if len(actors) < 2:
+                continue
+            # Neighbors of movies are always actors of the graph, and set updates link a whole cast at once
+            for actor in actors:
+                siblings = actor_vertices[actor].get_siblings()
+                siblings.update(actors)
+                siblings.discard(actor)
+        self._siblings_built = True
+
+    def _link_siblings(self, actor, co_stars):
+        """
+        Makes an actor and its co-stars siblings of each other
+        :param actor: the actor name
+        :param co_stars: the names of actors sharing a movie with actor, which may include actor itself
+        """
+        vertex = self.actor_vertices[actor]
+        for co_star in co_stars:
+            if co_star != actor and co_star in self.actor_vertices:
+                vertex.add_sibling(co_star)
+                self.actor_vertices[co_star].add_sibling(actor)
+
+    def _unlink_siblings(self, actor, co_stars):
+        """
+        Stops an actor and its former co-stars being siblings of each other if they share no movie any more
+        :param actor: the actor name
+        :param co_stars: the names of actors of a movie the actor left
+        """
+        vertex = self.actor_vertices[actor]
+        movies = vertex.get_neighbors()
+        for co_star in co_stars:
+            if co_star == actor or co_star not in self.actor_vertices:
+                continue
+            co_star_vertex = self.actor_vertices[co_star]
+            other_movies = co_star_vertex.get_neighbors()
+            fewer, more = (movies, other_movies) if len(movies) <= len(other_movies) else (other_movies, movies)
+            if not any(movie in more for movie in fewer):
+                vertex.remove_sibling(co_star)
+                co_star_vertex.remove_sibling(actor)
+
+    def _update_content(self, kind, vertex, changes):
+        """
+        Merges changes into the content of a vertex and reindexes it
+        :param kind: ACTOR or MOVIE
+        :param vertex: the vertex
+        :param changes: the dict of content keys and new values
+        """
+        if self._index is not None:
+            self._index.remove_vertex(kind, vertex)
+        if vertex.content is None:
+            vertex.content = dict()
+        vertex.content.update(changes)
+        if self._index is not None:
+            self._index.add_vertex(kind, vertex)
+
+    def _release_name(self, name):
+        """
+        Drops a name from the intern table once no vertex uses it
+        :param name: the vertex name
         """
-        for actor_1 in self.actor_vertices:
-            for actor_2 in self.actor_vertices:
-                if actor_1 != actor_2 \
-                        and actor_2 not in self.actor_vertices[actor_1].get_siblings() \
-                        and len(set(self.actor_vertices[actor_1].get_neighbors())
-                                & set(self.actor_vertices[actor_2].get_neighbors())) > 0:
-                    self.actor_vertices[actor_1].add_sibling(actor_2)
-                    self.actor_vertices[actor_2].add_sibling(actor_1)
+        if name not in self.actor_vertices and name not in self.movie_vertices:
+            self.names.pop(name, None)
@@ -0,0 +1,168 @@
+YEAR = 'year'
+LANGUAGE = 'lang'
+COUNTRY = 'country'
+AGE = 'age'
+ACTOR = 'actor'
+MOVIE = 'movie'
+
+
+class GraphIndex:
+    """
+    Hash indexes from content values to vertex names, such as year, language and country of movies and age of
+    actors, plus the index of actors playing in movies of each year. Every index is built on its first lookup, and
+    Graph keeps built indexes current as vertices, edges and contents change. Names of a value keep the order they
+    were indexed in, which is the vertex order for a fresh index.
+    """
+
+    def __init__(self, graph):
+        """
+        Initialize the indexes of a graph, none of them built yet
+        :param graph: the Graph or CSRGraph
+        """
+        self.graph = graph
+        self.indexes = dict()
+        self.year_actors = None
+
+    def get_movies(self, key, value):
+        """
+        Gets movies whose content has a value under a key, or has it in the list under the key
+        :param key: the content key, such as YEAR, LANGUAGE or COUNTRY
+        :param value: the value
+        :return: the list of movie names
+        """
+        return list(self._get_index(MOVIE, key).get(value, ()))
+
+    def get_actors(self, key, value):
+        """
+        Gets actors whose content has a value under a key, or has it in the list under the key
+        :param key: the content key, such as AGE
+        :param value: the value
+        :return: the list of actor names
+        """
+        return list(self._get_index(ACTOR, key).get(value, ()))
+
+    def get_actors_by_year(self, year):
+        """
+        Gets actors playing in any movie of a year
+        :param year: the year
+        :return: the list of actor names
+        """
+        if self.year_actors is None:
+            self.year_actors = {}
+            movie_vertices = self.graph.get_movie_vertices()
+            for actor, vertex in self.graph.get_actor_vertices().items():
+                for movie in vertex.get_neighbors():
+                    self._count_year_actor(movie_vertices[movie].get_content(), actor, 1)
+        return list(self.year_actors.get(year, ()))
+
+    def add_vertex(self, kind, vertex):
+        """
+        Indexes a vertex added to the graph, along with the year of its movies for a movie with edges
+        :param kind: ACTOR or MOVIE
+        :param vertex: the vertex
+        """
+        self._index_vertex(kind, vertex, True)
+
+    def remove_vertex(self, kind, vertex):
+        """
+        Removes a vertex from indexes, along with the year of its movies for a movie with edges
+        :param kind: ACTOR or MOVIE
+        :param vertex: the vertex
+        """
+        self._index_vertex(kind, vertex, False)
+
+    def add_edge(self, actor, movie):
+        """
+        Counts a new edge in the index of year and actors
+        :param actor: the actor name
+        :param movie: the movie name
+        """
+        if self.year_actors is not None:
+            self._count_year_actor(self.graph.get_movie_vertices()[movie].get_content(), actor, 1)
+
+    def remove_edge(self, actor, movie):
+        """
+        Uncounts a removed edge in the index of year and actors
+        :param actor: the actor name
+        :param movie: the movie name
+        """
+        if self.year_actors is not None:
+            self._count_year_actor(self.graph.get_movie_vertices()[movie].get_content(), actor, -1)
+
+    def _get_index(self, kind, key):
+        """
+        Gets the index of a content key of a kind of vertices, built on first use
+        :param kind: ACTOR or MOVIE
+        :param key: the content key
+        :return: the dict of values and dicts of names used as ordered sets
+        """
+        index = self.indexes.get((kind, key))
+        if index is None:
+            index = self.indexes[(kind, key)] = {}
+            vertices = self.graph.get_actor_vertices() if kind == ACTOR else self.graph.get_movie_vertices()
+            for name, vertex in vertices.items():
+                for value in _get_values(vertex.get_content(), key):
+                    index.setdefault(value, {})[name] = None
+        return index
+
+    def _index_vertex(self, kind, vertex, add):
+        """
+        Adds or removes a vertex in the built indexes of its kind
+        :param kind: ACTOR or MOVIE
+        :param vertex: the vertex
+        :param add: True to add, False to remove
+        """
+        name, content = vertex.get_name(), vertex.get_content()
+        for (index_kind, key), index in self.indexes.items():
+            if index_kind != kind:
+                continue
+            for value in _get_values(content, key):
+                if add:
+                    index.setdefault(value, {})[name] = None
+                else:
+                    _discard(index, value, name)
+        if kind == MOVIE and self.year_actors is not None:
+            for actor in vertex.get_neighbors():
+                self._count_year_actor(content, actor, 1 if add else -1)
+
+    def _count_year_actor(self, movie_content, actor, change):
+        """
+        Changes the number of movies of an actor in the year of a movie, dropping the actor from the year at zero
+        :param movie_content: the content of movie
+        :param actor: the actor name
+        :param change: 1 or -1
+        """
+        for year in _get_values(movie_content, YEAR):
+            actors = self.year_actors.setdefault(year, {})
+            count = actors.get(actor, 0) + change
+            if count > 0:
+                actors[actor] = count
+            else:
+                _discard(self.year_actors, year, actor)
+
+
+def _get_values(content, key):
+    """
+    Gets the indexed values of a content key
+    :param content: the vertex content or None
+    :param key: the content key
+    :return: the values in the list under key, the single value under key, or none if missing
+    """
+    value = (content or {}).get(key)
+    if value is None:
+        return ()
+    return value if isinstance(value, list) else (value,)
+
+
+def _discard(index, value, name):
+    """
+    Removes a name from the names of a value, dropping the value when no name is left
+    :param index: the dict of values and dicts of names
+    :param value: the value
+    :param name: the name
+    """
+    names = index.get(value)
+    if names is not None:
+        names.pop(name, None)
+        if not names:
+            del index[value]
@@ -0,0 +1,228 @@
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Sequence
+import numpy as np
+from model.csr_graph import CSRGraph, ACTOR, MOVIE
+
+# A snapshot is a directory of .npy arrays loaded by memory mapping, so loading does no parsing or graph building
+# and processes loading the same snapshot share its pages. Every save writes a new generation directory and switches
+# the pointer file to it, so files mapped by readers are never rewritten.
+SNAPSHOT_VERSION = 1
+META_FILE = 'meta.json'
+CURRENT_FILE = 'CURRENT'  # The pointer file naming the current generation directory
+GENERATION_PREFIX = 'generation-'
+ARRAYS = ('actor_indptr', 'actor_indices', 'actor_weights', 'movie_indptr', 'movie_indices', 'movie_weights',
+          'sibling_indptr', 'sibling_indices', 'actor_gross', 'actor_name_ids', 'movie_name_ids',
+          'string_offsets', 'strings', 'content_offsets', 'contents')
+
+
+class ByteTable(Sequence):
+    """
+    The sequence of byte strings stored back to back in one array with an array of offsets
+    """
+
+    def __init__(self, data, offsets):
+        """
+        Initialize a table
+        :param data: the uint8 array of all byte strings
+        :param offsets: the int64 array of start offsets, with the end offset last
+        """
+        self.data = data
+        self.offsets = offsets
+
+    def __getitem__(self, index):
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class LazyContents(Sequence):
+    """
+    The sequence of vertex contents stored as JSON, each parsed on first access
+    """
+
+    def __init__(self, table, start, number):
+        """
+        Initialize contents of one kind of vertices
+        :param table: the ByteTable of JSON contents of all vertices
+        :param start: the position of the first content of this kind in table
+        :param number: the number of vertices of this kind
+        """
+        self.table = table
+        self.start = start
+        self.parsed = [None] * number
+        self.loaded = [False] * number
+
+    def __getitem__(self, index):
+        if not self.loaded[index]:
+            self.parsed[index] = json.loads(self.table[self.start + index].decode('utf-8'))
+            self.loaded[index] = True
+        return self.parsed[index]
+
+    def __len__(self):
+        return len(self.parsed)
+
+
+def save_snapshot(graph, directory):
+    """
+    Saves a built graph as a snapshot with adjacency, siblings and total gross of actors. Every distinct name is
+    stored once in a string table and contents are stored as JSON.
+    :param graph: the Graph or CSRGraph
+    :param directory: the snapshot directory, created if missing
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_graph(graph)
+    actor_names, movie_names = graph.names
+    strings, string_ids = [], {}
+    for name in actor_names + movie_names:
+        if name not in string_ids:
+            string_ids[name] = len(strings)
+            strings.append(name.encode('utf-8'))
+    contents = [json.dumps(content, ensure_ascii=False).encode('utf-8')
+                for content in list(graph.contents[ACTOR]) + list(graph.contents[MOVIE])]
+    sibling_indptr, sibling_indices = graph.build_siblings()
+    arrays = {
+        'actor_indptr': graph.indptr[ACTOR], 'actor_indices': graph.indices[ACTOR],
+        'actor_weights': graph.weights[ACTOR], 'movie_indptr': graph.indptr[MOVIE],
+        'movie_indices': graph.indices[MOVIE], 'movie_weights': graph.weights[MOVIE],
+        'sibling_indptr': sibling_indptr, 'sibling_indices': sibling_indices,
+        'actor_gross': graph.get_all_actor_gross(),
+        'actor_name_ids': np.array([string_ids[name] for name in actor_names], dtype=np.int32),
+        'movie_name_ids': np.array([string_ids[name] for name in movie_names], dtype=np.int32),
+    }
+    arrays['string_offsets'], arrays['strings'] = _pack(strings)
+    arrays['content_offsets'], arrays['contents'] = _pack(contents)
+
+    os.makedirs(directory, exist_ok=True)
+    previous = get_snapshot_path(directory)
+    generation = tempfile.mkdtemp(prefix=GENERATION_PREFIX, dir=directory)
+    try:
+        for name in ARRAYS:
+            with open(os.path.join(generation, name + '.npy'), 'wb') as array_file:
+                np.save(array_file, np.ascontiguousarray(arrays[name]))
+                _sync(array_file)
+        # The meta file is written last, so a generation interrupted while saving fails to load
+        with open(os.path.join(generation, META_FILE), 'w', encoding='utf-8') as meta_file:
+            json.dump({'version': SNAPSHOT_VERSION, 'actors': len(actor_names), 'movies': len(movie_names),
+                       'edges': graph.get_edge_number()}, meta_file)
+            _sync(meta_file)
+        _sync_directory(generation)
+        _switch_current(directory, os.path.basename(generation))
+    except BaseException:
+        shutil.rmtree(generation, ignore_errors=True)
+        raise
+    _remove_generations(directory, {generation, previous})
+
+
+def get_snapshot_path(directory):
+    """
+    Gets the current generation directory of a snapshot
+    :param directory: the snapshot directory
+    :return: the generation directory path or None if no snapshot was saved
+    """
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), encoding='utf-8') as current_file:
+            generation = current_file.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, generation)
+
+
+def load_snapshot(directory):
+    """
+    Loads a snapshot as a CSRGraph. Arrays are memory mapped read only, names are decoded from the string table
+    and contents are parsed on first access.
+    :param directory: the snapshot directory
+    :return: the CSRGraph
+    """
+    generation = get_snapshot_path(directory)
+    if generation is None:
+        raise FileNotFoundError(os.path.join(directory, CURRENT_FILE))
+    meta_path = os.path.join(generation, META_FILE)
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(meta_path)
+    with open(meta_path, encoding='utf-8') as meta_file:
+        meta = json.load(meta_file)
+    if meta.get('version') != SNAPSHOT_VERSION:
+        raise ValueError("Unsupported snapshot version %s" % meta.get('version'))
+    arrays = {name: np.load(os.path.join(generation, name + '.npy'), mmap_mode='r') for name in ARRAYS}
+
+    strings = ByteTable(arrays['strings'], arrays['string_offsets'])
+    table = [strings[i].decode('utf-8') for i in range(len(strings))]
+    actor_names = [table[i] for i in arrays['actor_name_ids'].tolist()]
+    movie_names = [table[i] for i in arrays['movie_name_ids'].tolist()]
+    contents = ByteTable(arrays['contents'], arrays['content_offsets'])
+    return CSRGraph(actor_names, LazyContents(contents, 0, meta['actors']),
+                    movie_names, LazyContents(contents, meta['actors'], meta['movies']),
+                    (arrays['actor_indptr'], arrays['actor_indices'], arrays['actor_weights']),
+                    (arrays['movie_indptr'], arrays['movie_indices'], arrays['movie_weights']),
+                    siblings=(arrays['sibling_indptr'], arrays['sibling_indices']),
+                    actor_gross=arrays['actor_gross'])
+
+
+def _pack(byte_strings):
+    """
+    Packs byte strings back to back
+    :param byte_strings: the list of byte strings
+    :return: the int64 array of offsets and the uint8 array of data
+    """
+    offsets = np.zeros(len(byte_strings) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in byte_strings], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(byte_strings), dtype=np.uint8)
+
+
+def _switch_current(directory, generation):
+    """
+    Points the snapshot to a generation by atomically replacing the pointer file
+    :param directory: the snapshot directory
+    :param generation: the name of generation directory
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.write(generation)
+            _sync(tmp_file)
+        os.replace(tmp_path, os.path.join(directory, CURRENT_FILE))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    _sync_directory(directory)
+
+
+def _remove_generations(directory, kept):
+    """
+    Removes complete generations other than kept ones. The previous generation is kept for readers which read the
+    pointer file before the switch, and mapped files of removed generations stay valid until unmapped.
+    :param directory: the snapshot directory
+    :param kept: the set of generation paths to keep
+    """
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(GENERATION_PREFIX) and path not in kept and os.path.exists(os.path.join(path, META_FILE)):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _sync(file):
+    """
+    Flushes a file to disk
+    :param file: the open file
+    """
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def _sync_directory(directory):
+    """
+    Flushes the entries of a directory to disk where directories can be opened
+    :param directory: the directory path
+    """
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
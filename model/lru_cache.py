@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 256
+
+
+class LRUCache:
+    """
+    The in-memory cache of a bounded number of entries, evicting the least recently used entry when full. Hits and
+    misses of get are counted so the size can be tuned from statistics.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """
+        Initialize an empty cache
+        :param max_size: the maximum number of entries
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key, default=None):
+        """
+        Gets the value of key and marks it as recently used
+        :param key: the hashable key
+        :param default: the value returned if key is not cached
+        :return: the cached value or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._stats['misses'] += 1
+                return default
+            self._stats['hits'] += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        """
+        Stores the value of key and evicts the least recently used entry if the cache is full
+        :param key: the hashable key
+        :param value: the value
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        """
+        Removes all entries, keeping statistics
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        Gets the statistics of cache
+        :return: the dict of hits, misses, evictions, size and max_size
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        stats['max_size'] = self.max_size
+        return stats
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
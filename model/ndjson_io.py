@@ -0,0 +1,82 @@
+import gzip
+import json
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class NDJSONWriter:
+    """
+    The streaming writer of newline-delimited JSON records. Each record is written as one line with its name under
+    key "name", so nothing but the current record is held in memory.
+    """
+
+    def __init__(self, file_path, compress=None):
+        """
+        Initialize a writer and truncate the file
+        :param file_path: the output file path
+        :param compress: if we expect gzip output, default to True when file path ends with ".gz"
+        """
+        if compress is None:
+            compress = file_path.endswith('.gz')
+        self.file_path = file_path
+        if compress:
+            self._file = gzip.open(file_path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(file_path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, name, record):
+        """
+        Writes a record
+        :param name: the name of record
+        :param record: the dict of record
+        """
+        line = dict(record)
+        line['name'] = name
+        self._file.write(json.dumps(line, ensure_ascii=False))
+        self._file.write('\n')
+        self.count += 1
+
+    def flush(self):
+        """
+        Flushes written records to file
+        """
+        self._file.flush()
+
+    def close(self):
+        """
+        Closes the file
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_records(file_path):
+    """
+    Iterates records of a NDJSON file, which may be gzip compressed, one line at a time
+    :param file_path: the input file path
+    :return: the generator of record name and record
+    """
+    with open(file_path, 'rb') as raw_file:
+        compressed = raw_file.read(2) == GZIP_MAGIC
+    opener = gzip.open if compressed else open
+    with opener(file_path, 'rt', encoding='utf-8') as input_file:
+        for line in input_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record['name'], record
+
+
+def load_records(file_path):
+    """
+    Loads records of a NDJSON file to a dict. A later record replaces an earlier record of the same name.
+    :param file_path: the input file path
+    :return: the dict of record names and records
+    """
+    return {name: record for name, record in iter_records(file_path)}
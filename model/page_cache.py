@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from model.fetcher import raise_for_status
+from model.utils import atomic_write
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class OfflineCacheMiss(LookupError):
+    """
+    Raised when a page is not cached and the network must not be used
+    """
+
+
+class PageCache:
+    """
+    The content-addressed on-disk page cache. Bodies are stored once per sha256 digest under "objects" and every url
+    has a small metadata file under "meta" with the digest, ETag and Last-Modified of the page. The least recently
+    used urls are evicted when the stored bodies exceed the size limit.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize a page cache
+        :param cache_dir: the directory of cache
+        :param max_bytes: the maximum number of bytes of stored bodies
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None
+        self._refs = {}
+        self._total_bytes = 0
+
+    def get(self, url):
+        """
+        Gets the cached entry of url and marks it as recently used
+        :param url: the page url
+        :return: dict with body, etag and last_modified or None if not cached
+        """
+        with self._lock:
+            self._load()
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            try:
+                with open(self._object_path(entry['digest']), 'rb') as object_file:
+                    body = self._read_checked(object_file, entry['digest'])
+            except (OSError, ValueError):
+                self._remove(url)
+                return None
+            self._touch(url, entry)
+        return {'body': body, 'etag': entry.get('etag'), 'last_modified': entry.get('last_modified')}
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """
+        Stores the body of url with its validators and evicts old entries if the cache is too large
+        :param url: the page url
+        :param body: the bytes of page
+        :param etag: the ETag header of response
+        :param last_modified: the Last-Modified header of response
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            self._load()
+            if url in self._entries:
+                self._remove(url)
+            object_path = self._object_path(digest)
+            if digest not in self._refs:
+                atomic_write(object_path, body)
+                self._refs[digest] = 0
+                self._total_bytes += len(body)
+            self._refs[digest] += 1
+            entry = {'url': url, 'digest': digest, 'size': len(body), 'etag': etag,
+                     'last_modified': last_modified, 'used': time.time()}
+            atomic_write(self._meta_path(url), json.dumps(entry).encode('utf-8'))
+            self._entries[url] = entry
+            self._evict()
+
+    def touch(self, url):
+        """
+        Marks url as recently used
+        :param url: the page url
+        """
+        with self._lock:
+            self._load()
+            if url in self._entries:
+                self._touch(url, self._entries[url])
+
+    def get_size(self):
+        """
+        Gets the number of bytes of stored bodies
+        :return: the number of bytes
+        """
+        with self._lock:
+            self._load()
+            return self._total_bytes
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+    def __contains__(self, url):
+        with self._lock:
+            self._load()
+            return url in self._entries
+
+    def _load(self):
+        """
+        Loads metadata of all cached urls on first use
+        """
+        if self._entries is not None:
+            return
+        self._entries = {}
+        meta_dir = os.path.join(self.cache_dir, 'meta')
+        if not os.path.isdir(meta_dir):
+            return
+        for root, _, files in os.walk(meta_dir):
+            for file_name in files:
+                if not file_name.endswith('.json'):
+                    continue
+                meta_path = os.path.join(root, file_name)
+                try:
+                    with open(meta_path, 'rb') as meta_file:
+                        entry = json.loads(meta_file.read().decode('utf-8'))
+                    # The last used time is kept as modification time of metadata file
+                    entry['used'] = os.path.getmtime(meta_path)
+                except (OSError, ValueError):
+                    continue
+                if not os.path.exists(self._object_path(entry['digest'])):
+                    continue
+                self._entries[entry['url']] = entry
+                if entry['digest'] not in self._refs:
+                    self._refs[entry['digest']] = 0
+                    self._total_bytes += entry['size']
+                self._refs[entry['digest']] += 1
+
+    def _touch(self, url, entry):
+        """
+        Updates the last used time of entry in memory and on disk
+        :param url: the page url
+        :param entry: the metadata of url
+        """
+        entry['used'] = time.time()
+        try:
+            os.utime(self._meta_path(url))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        Removes least recently used urls until stored bodies fit the size limit
+        """
+        if self._total_bytes <= self.max_bytes:
+            return
+        for entry in sorted(self._entries.values(), key=lambda e: e['used']):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove(entry['url'])
+
+    def _remove(self, url):
+        """
+        Removes url from cache and deletes its body if no other url refers to it
+        :param url: the page url
+        """
+        entry = self._entries.pop(url)
+        _silent_remove(self._meta_path(url))
+        digest = entry['digest']
+        self._refs[digest] -= 1
+        if self._refs[digest] <= 0:
+            self._refs.pop(digest)
+            self._total_bytes -= entry['size']
+            _silent_remove(self._object_path(digest))
+
+    def _read_checked(self, object_file, digest):
+        """
+        Reads a stored body and verifies its digest
+        :param object_file: the opened object file
+        :param digest: the expected sha256 digest
+        :return: the bytes of body
+        """
+        body = object_file.read()
+        if hashlib.sha256(body).hexdigest() != digest:
+            raise ValueError('Corrupted cache object %s' % digest)
+        return body
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], digest)
+
+    def _meta_path(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'meta', key[:2], key + '.json')
+
+
+class CachedFetcher:
+    """
+    The fetcher which serves pages from a PageCache. Cached pages are revalidated with conditional requests and parsed
+    from cache on 304 Not Modified. In offline mode the network is never used.
+    """
+
+    def __init__(self, fetcher, cache, offline=False):
+        """
+        Initialize a cached fetcher
+        :param fetcher: the Fetcher used for network requests
+        :param cache: the PageCache
+        :param offline: if we expect to serve pages only from cache
+        """
+        self.fetcher = fetcher
+        self.cache = cache
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._stats = {'offline_hits': 0, 'not_modified': 0, 'misses': 0, 'updated': 0}
+
+    def fetch(self, url):
+        """
+        Fetches the body of url from cache or network
+        :param url: the page url
+        :return: the bytes of page
+        """
+        entry = self.cache.get(url)
+        if self.offline:
+            if entry is None:
+                raise OfflineCacheMiss(url)
+            self._count('offline_hits')
+            return entry['body']
+
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        response = self.fetcher.request(url, headers)
+        if response.status == 304 and entry is not None:
+            self._count('not_modified')
+            return entry['body']
+        raise_for_status(response)
+        self._count('misses' if entry is None else 'updated')
+        self.cache.put(url, response.body, response.headers.get('etag'), response.headers.get('last-modified'))
+        return response.body
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self):
+        """
+        Gets the statistics of fetches together with the statistics of network fetcher
+        :return: the dict of statistics
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['cache_bytes'] = self.cache.get_size()
+        stats.update(self.fetcher.get_stats())
+        return stats
+
+    def close(self):
+        """
+        Closes network connections
+        """
+        self.fetcher.close()
+
+
+def _silent_remove(file_path):
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
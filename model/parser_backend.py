@@ -0,0 +1,162 @@
+import bs4
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional, html.parser is always available
+    etree = None
+
+# Parsers build a document with make_document and then only use this subset of the BeautifulSoup API:
+# find, find_all, find_parent, find_next_sibling, get and get_text. Every backend returns nodes supporting it.
+# The whole page is parsed rather than only the heading, infobox and filmography, because the parsers' fallbacks
+# search the whole document, such as the first filmography list anywhere in the page (see benchmark/page_parse.py).
+HTML_PARSER = 'html.parser'
+LXML = 'lxml'
+
+
+def make_document(page, backend=None):
+    """
+    Parses a page to a document node of backend
+    :param page: the bytes of page
+    :param backend: the backend name, default to the fastest available backend
+    :return: the document node
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError('Unknown parser backend %s' % backend)
+    return BACKENDS[backend](page)
+
+
+def _make_bs4_document(page):
+    """
+    Parses a page with BeautifulSoup and html.parser
+    :param page: the bytes of page
+    :return: the BeautifulSoup document
+    """
+    return bs4.BeautifulSoup(page, "html.parser")
+
+
+def _make_lxml_document(page):
+    """
+    Parses a page with lxml
+    :param page: the bytes of page
+    :return: the LxmlNode of document
+    """
+    try:
+        page.decode('utf-8')
+        parser = _UTF8_PARSER
+    except UnicodeDecodeError:
+        # Let lxml detect the encoding from meta tags
+        parser = _DETECT_PARSER
+    # Plain etree elements, without the Python class lookup of lxml.html for every element proxy
+    root = etree.fromstring(page, parser)
+    if root is None:
+        raise etree.ParserError('Document is empty')
+    return LxmlNode(root)
+
+
+class LxmlNode:
+    """
+    The wrapper of lxml element which follows the semantics of BeautifulSoup methods used by parsers. Searches are
+    compiled to XPath and run in C instead of walking Python objects.
+    """
+
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        """
+        Initialize a node
+        :param element: the lxml element
+        """
+        self.element = element
+
+    def find(self, name, attrs=None):
+        """
+        Finds the first descendant tag
+        :param name: the tag name
+        :param attrs: the dict of attribute values to match
+        :return: the node or None if not found
+        """
+        found = _search(self.element, name, attrs)
+        return LxmlNode(found[0]) if found else None
+
+    def find_all(self, name, attrs=None):
+        """
+        Finds all descendant tags in document order
+        :param name: the tag name
+        :param attrs: the dict of attribute values to match
+        :return: the list of nodes
+        """
+        return [LxmlNode(element) for element in _search(self.element, name, attrs)]
+
+    def find_parent(self):
+        """
+        Finds the parent tag
+        :return: the parent node or None for the root
+        """
+        parent = self.element.getparent()
+        return LxmlNode(parent) if parent is not None else None
+
+    def find_next_sibling(self):
+        """
+        Finds the next sibling tag, skipping comments
+        :return: the sibling node or None if not found
+        """
+        for sibling in self.element.itersiblings():
+            if isinstance(sibling.tag, str):
+                return LxmlNode(sibling)
+        return None
+
+    def get(self, key, default=None):
+        """
+        Gets an attribute value
+        :param key: the attribute name
+        :param default: the value if attribute is not found
+        :return: the attribute value
+        """
+        return self.element.get(key, default)
+
+    def get_text(self):
+        """
+        Gets all text of node and its descendants
+        :return: the string of text
+        """
+        return "".join(self.element.itertext())
+
+
+_SEARCH_CACHE = {}
+
+
+def _search(element, name, attrs):
+    """
+    Runs a BeautifulSoup style search as XPath. A class value matches one of the classes of a tag, or the whole
+    class attribute if the value contains spaces. Values are passed as XPath variables, so quotes in them are safe.
+    :param element: the lxml element searched below
+    :param name: the tag name
+    :param attrs: the dict of attribute values to match
+    :return: the list of matching elements in document order
+    """
+    items = sorted((attrs or {}).items())
+    key = (name, tuple((attr, attr == 'class' and ' ' in value) for attr, value in items))
+    if key not in _SEARCH_CACHE:
+        conditions = []
+        for i, (attr, whole_class) in enumerate(key[1]):
+            if attr == 'class' and not whole_class:
+                conditions.append("contains(concat(' ', normalize-space(@class), ' '), concat(' ', $v%d, ' '))" % i)
+            elif attr == 'class':
+                conditions.append("normalize-space(@class) = $v%d" % i)
+            else:
+                conditions.append("@%s = $v%d" % (attr, i))
+        path = './/' + name + ''.join('[%s]' % condition for condition in conditions)
+        _SEARCH_CACHE[key] = etree.XPath(path)
+    values = {'v%d' % i: ' '.join(value.split()) if attr == 'class' else value
+              for i, (attr, value) in enumerate(items)}
+    return _SEARCH_CACHE[key](element, **values)
+
+
+BACKENDS = {HTML_PARSER: _make_bs4_document}
+if etree is not None:
+    _UTF8_PARSER = etree.HTMLParser(encoding='utf-8')
+    _DETECT_PARSER = etree.HTMLParser()
+    BACKENDS[LXML] = _make_lxml_document
+
+DEFAULT_BACKEND = LXML if LXML in BACKENDS else HTML_PARSER
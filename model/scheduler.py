@@ -0,0 +1,165 @@
+import asyncio
+import http.client
+import random
+import socket
+import time
+from email.utils import parsedate_to_datetime
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+
+TRANSIENT_STATUS = (408, 429, 500, 502, 503, 504)
+THROTTLE_STATUS = (429, 503)
+
+
+class TokenBucket:
+    """
+    The token bucket which allows "burst" requests at once and "rate" requests per second on average
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        """
+        Initialize a full token bucket
+        :param rate: the number of tokens added per second
+        :param burst: the maximum number of tokens
+        :param clock: the function returning current seconds
+        """
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def take(self):
+        """
+        Takes a token if available
+        :return: 0 if a token is taken, otherwise the seconds until a token is available
+        """
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class HostScheduler:
+    """
+    The per-host politeness scheduler. Every host has a token bucket limiting its request rate, a host answering
+    with Retry-After is paused for that long, and transient failures get an exponential backoff delay with jitter
+    before the url is requeued.
+    """
+
+    def __init__(self, rate=5.0, burst=10, max_retries=4, base_backoff=1.0, max_backoff=120.0,
+                 clock=time.monotonic, jitter=random.random):
+        """
+        Initialize a scheduler
+        :param rate: the number of requests per second allowed for each host
+        :param burst: the number of requests a host may receive at once
+        :param max_retries: the number of retries of a url before giving up
+        :param base_backoff: the backoff seconds of the first retry, doubled for every further retry
+        :param max_backoff: the maximum backoff seconds
+        :param clock: the function returning current seconds
+        :param jitter: the function returning a random float in [0, 1)
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError('Rate should be positive and burst should be at least 1')
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.jitter = jitter
+        self._buckets = {}
+        self._paused_until = {}
+        self._stats = {'requests': 0, 'throttled': 0, 'retries': 0, 'gave_up': 0, 'wait_seconds': 0.0}
+
+    def delay(self, url):
+        """
+        Takes a request slot of the host of url if possible
+        :param url: the page url
+        :return: 0 if the request may be sent now, otherwise the seconds to wait before asking again
+        """
+        host = urlsplit(url).netloc
+        paused = self._paused_until.get(host, 0) - self.clock()
+        if paused > 0:
+            return paused
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst, self.clock)
+        return self._buckets[host].take()
+
+    async def acquire(self, url):
+        """
+        Waits until a request to the host of url is allowed
+        :param url: the page url
+        """
+        wait = self.delay(url)
+        while wait > 0:
+            self._stats['wait_seconds'] += wait
+            await asyncio.sleep(wait)
+            wait = self.delay(url)
+        self._stats['requests'] += 1
+
+    def retry_delay(self, url, error, attempt):
+        """
+        Decides if a failed url should be retried
+        :param url: the page url
+        :param error: the exception raised by fetching
+        :param attempt: the number of retries already made for url
+        :return: the seconds to wait before retrying, or None if url should not be retried
+        """
+        if not is_transient(error):
+            return None
+        retry_after = None
+        if isinstance(error, HTTPError) and error.code in THROTTLE_STATUS:
+            self._stats['throttled'] += 1
+            retry_after = get_retry_after(error.headers)
+            if retry_after is not None:
+                # The whole host is paused, not only this url
+                host = urlsplit(url).netloc
+                self._paused_until[host] = max(self._paused_until.get(host, 0), self.clock() + retry_after)
+        if attempt >= self.max_retries:
+            self._stats['gave_up'] += 1
+            return None
+        self._stats['retries'] += 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        # Equal jitter keeps at least half of the backoff and spreads the rest
+        backoff = backoff / 2 + self.jitter() * backoff / 2
+        return max(backoff, retry_after or 0.0)
+
+    def get_stats(self):
+        """
+        Gets the statistics of scheduling
+        :return: the dict of requests, throttled responses, retries, urls given up and seconds waited
+        """
+        return dict(self._stats)
+
+
+def is_transient(error):
+    """
+    Checks if a fetch error may succeed when retried
+    :param error: the exception raised by fetching
+    :return: True if the error is transient
+    """
+    if isinstance(error, HTTPError):
+        return error.code in TRANSIENT_STATUS
+    return isinstance(error, (URLError, ConnectionError, socket.timeout, http.client.HTTPException))
+
+
+def get_retry_after(headers):
+    """
+    Parses the Retry-After header, either in seconds or as HTTP date
+    :param headers: the response headers
+    :return: the seconds to wait or None if not found
+    """
+    value = headers.get('Retry-After') if headers is not None else None
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,114 @@
+import hashlib
+import math
+from urllib.parse import urlsplit, urlunsplit, quote, unquote
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Characters kept as they are when percent-encoding is normalized
+PATH_SAFE = "/:@!$&'()*+,;=-._~"
+# Separators of query parameters stay encoded inside keys and values, so "a=%26" and "a=&" differ
+QUERY_VALUE_SAFE = "/:@!$'()*,;-._~?"
+
+
+def normalize_url(url):
+    """
+    Normalizes a url so different spellings of a page compare equal: scheme and host are lower-cased, the default
+    port and the fragment are dropped, percent-encoding is made canonical and spaces in path become underscores as
+    in Wikipedia titles
+    :param url: the url
+    :return: the normalized url
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        host += ':%d' % parts.port
+    path = quote(unquote(parts.path).replace(' ', '_'), safe=PATH_SAFE) or '/'
+    query = '&'.join(_normalize_parameter(parameter) for parameter in parts.query.split('&'))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def _normalize_parameter(parameter):
+    """
+    Normalizes percent-encoding of one query parameter, its key and value separately
+    :param parameter: the "key=value" or "key" string
+    :return: the normalized parameter
+    """
+    return '='.join(_normalize_query_part(part) for part in parameter.split('=', 1))
+
+
+def _normalize_query_part(part):
+    """
+    Normalizes percent-encoding of a query key or value, keeping "+" which stands for a space
+    :param part: the key or value
+    :return: the normalized key or value
+    """
+    return '+'.join(quote(unquote(piece), safe=QUERY_VALUE_SAFE) for piece in part.split('+'))
+
+
+class BloomFilter:
+    """
+    The compact seen-set of strings. It never forgets an added string but may report a string which is never added
+    as seen with probability "error_rate" once "capacity" strings are added, using about 1.2 bytes per string at 1%
+    instead of a full string in a set.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Initialize an empty filter
+        :param capacity: the expected number of strings
+        :param error_rate: the false positive rate at capacity
+        """
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError('Capacity should be positive and error rate should be between 0 and 1')
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_number = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_number = max(1, int(round(self.bit_number / capacity * math.log(2))))
+        self._bits = bytearray((self.bit_number + 7) // 8)
+        self._count = 0
+
+    def add(self, key):
+        """
+        Adds a string
+        :param key: the string
+        :return: True if the string was not seen before
+        """
+        new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                new = True
+        self._count += int(new)
+        return new
+
+    def get_size(self):
+        """
+        Gets the memory of bits
+        :return: the number of bytes
+        """
+        return len(self._bits)
+
+    def get_error_rate(self):
+        """
+        Gets the expected false positive rate with the strings added so far
+        :return: the rate between 0 and 1
+        """
+        return (1 - math.exp(-self.hash_number * self._count / self.bit_number)) ** self.hash_number
+
+    def _positions(self, key):
+        """
+        Gets the bit positions of a string by double hashing one 128-bit digest
+        :param key: the string
+        :return: the generator of bit positions
+        """
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.bit_number for i in range(self.hash_number))
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self):
+        return self._count
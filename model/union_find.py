@@ -0,0 +1,85 @@
+class UnionFind:
+    """
+    Disjoint sets of hashable items with union by size and path halving, so any sequence of operations runs in
+    near-linear time. Items are compared by equality, vertices by identity.
+    """
+
+    def __init__(self, items=()):
+        """
+        Initialize the sets with every item on its own
+        :param items: the initial items
+        """
+        self.parents = dict()
+        self.sizes = dict()
+        self.count = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """
+        Adds an item as a new set if not added yet
+        :param item: the item
+        """
+        if item not in self.parents:
+            self.parents[item] = item
+            self.sizes[item] = 1
+            self.count += 1
+
+    def find(self, item):
+        """
+        Gets the representative item of the set of an item
+        :param item: the item
+        :return: the representative item
+        """
+        parents = self.parents
+        parent = parents[item]
+        while parent != item:
+            # Path halving points every other item on the way to its grandparent
+            grandparent = parents[parent]
+            parents[item] = grandparent
+            item, parent = grandparent, parents[grandparent]
+        return item
+
+    def union(self, first, second):
+        """
+        Merges the sets of two items, the smaller set under the larger
+        :param first: the first item
+        :param second: the second item
+        :return: if the items were in different sets
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.sizes[first] < self.sizes[second]:
+            first, second = second, first
+        self.parents[second] = first
+        self.sizes[first] += self.sizes.pop(second)
+        self.count -= 1
+        return True
+
+    def connected(self, first, second):
+        """
+        Gets if two items are in the same set
+        :param first: the first item
+        :param second: the second item
+        :return: if the items are in the same set
+        """
+        return self.find(first) == self.find(second)
+
+    def get_size(self, item):
+        """
+        Gets the size of the set of an item
+        :param item: the item
+        :return: the number of items in the set
+        """
+        return self.sizes[self.find(item)]
+
+    def __contains__(self, item):
+        return item in self.parents
+
+    def __len__(self):
+        """
+        Gets the number of sets
+        :return: the number of sets
+        """
+        return self.count
@@ -1,4 +1,7 @@
+import heapq
+import os
 import re
+import tempfile
 
 
 def parse_box_office(value_string):
@@ -83,3 +86,33 @@ def select_bottom_k(input_list, k):
         return input_list
     else:
         return input_list[-(k + 1): -1]
+
+
+def select_largest_k(pairs, k):
+    """
+    Selects the k pairs of largest values with a heap of k pairs, in O(n log k) instead of sorting all pairs. Ties
+    come in reverse input order, as when sorting ascending and reading backwards.
+    :param pairs: the iterable of names and values
+    :param k: the number of pairs
+    :return: the list of names and values, largest first
+    """
+    largest = heapq.nlargest(k, enumerate(pairs), key=lambda entry: (entry[1][1], entry[0]))
+    return [pair for _, pair in largest]
+
+
+def atomic_write(file_path, data):
+    """
+    Writes bytes to a file atomically by renaming a temporary file in the same directory
+    :param file_path: the file path
+    :param data: the bytes to write
+    """
+    directory = os.path.dirname(file_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -77,5 +77,8 @@ class TestAnalysisUtils(unittest.TestCase):
     def test_movie_year_percentage(self):
         movie_year_percentage(self.graph, save_fig=False)
 
+    def test_community_sizes(self):
+        self.assertEqual(community_sizes(self.graph, save_fig=False), [("John Slattery", 2)])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -4,6 +4,7 @@ from flask_testing import TestCase
 import unittest
 from flask import Flask
 import json
+from unittest.mock import patch
 
 
 class TestAPI(TestCase):
@@ -30,6 +31,94 @@ class TestAPI(TestCase):
         response = self.client.get('/api/movies?name="The Kid"|years=2011')
         self.assertEqual(response.status_code, 400)
 
+    def test_get_movie_query_range(self):
+        response = self.client.get('/api/movies?year>=2010&year<2012&name=Die')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(2010 <= movie['year'] < 2012 and "Die" in movie['name'] for movie in response.json))
+        self.assertEqual(self.client.get('/api/movies?year>=twenty').status_code, 400)
+
+    def test_query_follows_writes(self):
+        response = self.client.post('/api/actors', data=json.dumps(
+            {"name": "Query Actor", "age": 130, "movies": [], "total_gross": 0}), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.client.get('/api/actors?name=Query Act').json), 1)
+        self.client.put('/api/actors/Query_Actor', data=json.dumps({"name": "Query Person"}),
+                        content_type='application/json')
+        self.assertEqual(self.client.get('/api/actors?name=Query Act').json, [])
+        self.assertEqual(len(self.client.get('/api/actors?name=Query Pers').json), 1)
+        self.client.delete('/api/actors/Query_Actor')
+        self.assertEqual(self.client.get('/api/actors?name=Query Pers').json, [])
+
+    def test_put_updates_indexes(self):
+        with open(json_url, encoding='utf-8') as data_file:
+            data = json.load(data_file)[0]
+        # The graph is built first, so it shares records with data
+        with patch.multiple('controller.api', actor_data=data, actor_index=DataIndex(data), _graph=None):
+            self.assertEqual(self.client.get('/api/path?from=Bruce Willis&to=Dustin Hoffman').status_code, 200)
+            old_age = data['Bruce Willis']['age']
+            total = len(self.client.get('/api/actors?age>=0').json)
+            self.assertIn({'name': "Bruce Willis"}, self.client.get('/api/actors?age=%d&fields=name' % old_age).json)
+            for age in (999, 1):
+                response = self.client.put('/api/actors/Bruce_Willis', data=json.dumps({"age": age}),
+                                           content_type='application/json')
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn({'name': "Bruce Willis"},
+                                 self.client.get('/api/actors?age=%d&fields=name' % old_age).json)
+                self.assertIn({'name': "Bruce Willis"}, self.client.get('/api/actors?age=%d&fields=name' % age).json)
+                self.assertEqual(len(self.client.get('/api/actors?age>=0').json), total)
+                self.assertEqual(len(self.client.get('/api/actors?age>=%d' % age).json),
+                                 sum(1 for actor in data.values() if actor['age'] >= age))
+                old_age = age
+
+    def test_query_cache(self):
+        before = self.client.get('/api/cache').json
+        first = self.client.get('/api/movies?name=The&name=Kid').json
+        self.assertEqual(self.client.get('/api/movies?name=Kid&name=The').json, first)
+        self.assertEqual(self.client.get('/api/movies?name=The&name=Kid').json, first)
+        after = self.client.get('/api/cache').json
+        self.assertEqual(after['plans']['hits'] - before['plans']['hits'], 1)
+        self.assertEqual(after['plans']['misses'] - before['plans']['misses'], 2)
+        self.assertEqual(after['results']['hits'] - before['results']['hits'], 2)
+        self.assertEqual(after['results']['misses'] - before['results']['misses'], 1)
+
+        # Writes change the data version, so cached results are not served
+        self.client.post('/api/movies', data=json.dumps({"name": "The Cached Kid"}),
+                         content_type='application/json')
+        response = self.client.get('/api/movies?name=Kid&name=The')
+        self.assertIn("The Cached Kid", [movie['name'] for movie in response.json])
+        self.client.delete('/api/movies/The_Cached_Kid')
+        self.assertCountEqual(self.client.get('/api/movies?name=Kid&name=The').json, first)
+
+    def test_get_movie_query_pages(self):
+        response = self.client.get('/api/movies?name=The|name=A')
+        movies = response.json
+        self.assertEqual(response.headers['X-Total-Count'], str(len(movies)))
+        self.assertEqual([movie['name'] for movie in movies], sorted(movie['name'] for movie in movies))
+        response = self.client.get('/api/movies?name=The|name=A&limit=5&offset=3&fields="name,year"')
+        self.assertEqual(response.json, [{'name': movie['name'], 'year': movie['year']} for movie in movies[3:8]])
+        self.assertEqual(response.headers['X-Total-Count'], str(len(movies)))
+        self.assertEqual(self.client.get('/api/movies?name=The&offset=%d' % len(movies)).json, [])
+        for query in ('limit=-1', 'offset=a', 'fields=', 'format=xml'):
+            self.assertEqual(self.client.get('/api/movies?name=The&' + query).status_code, 400)
+
+    def test_get_movie_query_ndjson(self):
+        movies = self.client.get('/api/movies?name=The&fields=name,actors').json
+        response = self.client.get('/api/movies?name=The&fields=name,actors&format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertTrue(response.is_streamed)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], movies)
+
+        # Records are read as they are written, so one deleted after the response starts is skipped
+        self.client.post('/api/movies', data=json.dumps({"name": "The Streamed Movie", "actors": []}),
+                         content_type='application/json')
+        response = self.client.get('/api/movies?name=The&fields=name&format=ndjson', buffered=False)
+        self.assertEqual(response.headers['X-Total-Count'], str(len(movies) + 1))
+        self.client.delete('/api/movies/The_Streamed_Movie')
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], [movie['name'] for movie in movies])
+
     def test_get_actor(self):
         response = self.client.get('/api/actors/Peter_Gallagher')
         self.assertEqual(response.status_code, 200)
@@ -46,6 +135,53 @@ class TestAPI(TestCase):
         response = self.client.get('/api/movies/The_Kids')
         self.assertEqual(response.status_code, 404)
 
+    def test_get_path(self):
+        response = self.client.get('/api/path?from=Bruce Willis&to=Dustin Hoffman')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['path'][0], "Bruce Willis")
+        self.assertEqual(response.json['path'][-1], "Dustin Hoffman")
+        self.assertEqual(response.json['degrees'], len(response.json['path']) // 2)
+
+    def test_get_path_max_depth(self):
+        response = self.client.get('/api/path?from=Bruce Willis&to=Dustin Hoffman&max_depth=0')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json['path'])
+
+    def test_get_path_illegal(self):
+        self.assertEqual(self.client.get('/api/path?from=Bruce Willis').status_code, 400)
+        self.assertEqual(self.client.get('/api/path?from=Bruce Willis&to=Dustin Hoffman&max_depth=a').status_code,
+                         400)
+        self.assertEqual(self.client.get('/api/path?from=Bruce Willis&to=Nobody').status_code, 404)
+
+    def test_post_paths(self):
+        response = self.client.post('/api/paths', data=json.dumps(
+            {'pairs': [["Bruce Willis", "Dustin Hoffman"], ["Bruce Willis", "Bruce Willis"]], 'max_depth': 6}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 2)
+        self.assertEqual(response.json[1]['path'], ["Bruce Willis"])
+        self.assertEqual(response.json[1]['degrees'], 0)
+
+    def test_post_paths_illegal(self):
+        response = self.client.post('/api/paths', data=json.dumps({'pairs': [["Bruce Willis"]]}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_path_follows_writes(self):
+        self.assertEqual(self.client.get('/api/path?from=Bruce Willis&to=Dustin Hoffman').status_code, 200)
+        response = self.client.post('/api/actors', data=json.dumps(
+            {"name": "Path Actor", "age": 40, "movies": ["The Verdict"]}), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get('/api/path?from=Bruce Willis&to=Path Actor')
+        self.assertEqual(response.json['path'], ["Bruce Willis", "The Verdict", "Path Actor"])
+
+        response = self.client.put('/api/actors/Path_Actor', data=json.dumps({"movies": []}),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self.client.get('/api/path?from=Bruce Willis&to=Path Actor').json['path'])
+        self.assertEqual(self.client.delete('/api/actors/Path_Actor').status_code, 200)
+        self.assertEqual(self.client.get('/api/path?from=Bruce Willis&to=Path Actor').status_code, 404)
+
     def test_post_actors_invalid(self):
         response = self.client.post('/api/actors',
                                     data="invalid string!")
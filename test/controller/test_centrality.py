@@ -0,0 +1,136 @@
+import json
+import os
+import random
+import unittest
+from itertools import combinations
+import numpy as np
+import controller.graph_lib as graphlib
+from controller.analysis_utils import hub_actors
+from controller.centrality import pagerank, weighted_degree, betweenness, write_scores, PAGERANK
+from controller.graph_matrix import IncidenceMatrix
+from model.graph import Graph
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'data.json')
+
+
+def load_graph():
+    with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+        return graphlib.construct_graph_single(json.load(data_file))
+
+
+def dense_pagerank(matrix, damping=0.85, iterations=500):
+    """
+    Computes PageRank with a dense transition matrix
+    """
+    weights = matrix.get_co_star_matrix().toarray()
+    actor_number = len(weights)
+    out_weights = weights.sum(axis=1)
+    transition = np.where(out_weights[:, None] > 0, weights / np.maximum(out_weights, 1)[:, None], 1.0 / actor_number)
+    scores = np.full(actor_number, 1.0 / actor_number)
+    for _ in range(iterations):
+        scores = damping * transition.T @ scores + (1 - damping) / actor_number
+    return scores
+
+
+def exact_betweenness(graph, actors):
+    """
+    Computes betweenness of actors on the co-star graph by counting all shortest paths
+    """
+    siblings = {actor: graph.get_actor_vertices()[actor].get_siblings() for actor in actors}
+    distances, paths = {}, {}
+    for source in actors:
+        distance, count, frontier = {source: 0}, {source: 1}, [source]
+        while frontier:
+            next_frontier = []
+            for actor in frontier:
+                for sibling in siblings[actor]:
+                    if sibling not in distance:
+                        distance[sibling] = distance[actor] + 1
+                        count[sibling] = 0
+                        next_frontier.append(sibling)
+                    if distance[sibling] == distance[actor] + 1:
+                        count[sibling] += count[actor]
+            frontier = next_frontier
+        distances[source], paths[source] = distance, count
+    scores = dict.fromkeys(actors, 0.0)
+    for source, target in combinations(actors, 2):
+        if target not in distances[source]:
+            continue
+        for middle in actors:
+            if middle in (source, target) or middle not in distances[source] or target not in distances[middle]:
+                continue
+            if distances[source][middle] + distances[middle][target] == distances[source][target]:
+                scores[middle] += paths[source][middle] * paths[middle][target] / paths[source][target]
+    return scores
+
+
+class TestCentrality(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = load_graph()
+        cls.matrix = IncidenceMatrix(cls.graph)
+
+    def test_pagerank(self):
+        scores, iterations = pagerank(self.matrix, tolerance=1e-12, max_iterations=1000)
+        self.assertAlmostEqual(scores.sum(), 1.0)
+        self.assertLess(iterations, 1000)
+        np.testing.assert_allclose(scores, dense_pagerank(self.matrix), atol=1e-9)
+
+    def test_pagerank_iteration_cap(self):
+        _, iterations = pagerank(self.matrix, tolerance=0.0, max_iterations=5)
+        self.assertEqual(iterations, 5)
+
+    def test_pagerank_warm_start(self):
+        graph = load_graph()
+        scores, _ = pagerank(IncidenceMatrix(graph), tolerance=1e-10)
+        previous = dict(zip(IncidenceMatrix(graph).actor_names, scores.tolist()))
+        actors, movies = list(graph.get_actor_vertices()), list(graph.get_movie_vertices())
+        graph.add_actor_vertex("New Actor", {'age': 30})
+        graph.add_edge("New Actor", movies[0], 30)
+        graph.add_edge(actors[1], movies[2], 40)
+
+        matrix = IncidenceMatrix(graph)
+        cold_scores, cold_iterations = pagerank(matrix, tolerance=1e-10)
+        warm_scores, warm_iterations = pagerank(matrix, tolerance=1e-10, start=previous)
+        self.assertLess(warm_iterations, cold_iterations)
+        np.testing.assert_allclose(warm_scores, cold_scores, atol=1e-8)
+
+    def test_weighted_degree(self):
+        degrees = weighted_degree(self.matrix)
+        actor_vertices = self.graph.get_actor_vertices()
+        for name in self.matrix.actor_names:
+            self.assertEqual(degrees[self.matrix.actor_ids[name]], sum(actor_vertices[name].get_neighbors().values()))
+
+    def test_betweenness(self):
+        graph = Graph()
+        rand = random.Random(3)
+        for i in range(30):
+            graph.add_actor_vertex("actor%d" % i, {})
+        for i in range(25):
+            graph.add_movie_vertex("movie%d" % i, {})
+        for _ in range(60):
+            graph.add_edge("actor%d" % rand.randrange(30), "movie%d" % rand.randrange(25), 1)
+        graph.add_actor_siblings()
+        matrix = IncidenceMatrix(graph)
+
+        expected = exact_betweenness(graph, matrix.actor_names)
+        scores = betweenness(matrix, samples=len(matrix.actor_names))
+        for name in matrix.actor_names:
+            self.assertAlmostEqual(scores[matrix.actor_ids[name]], expected[name])
+        sampled = betweenness(matrix, samples=10, seed=1)
+        self.assertEqual(len(sampled), len(matrix.actor_names))
+        self.assertTrue((sampled >= 0).all())
+
+    def test_hub_actors_rank_by(self):
+        graph = load_graph()
+        matrix = IncidenceMatrix(graph)
+        scores, _ = pagerank(matrix)
+        written = write_scores(graph, matrix, scores, PAGERANK)
+        self.assertEqual(graph.get_actor_vertices()[matrix.actor_names[0]].get_content()[PAGERANK], scores[0])
+        hubs = hub_actors(graph, number=5, save_fig=False, rank_by=PAGERANK)
+        self.assertEqual(hubs, matrix.top_actors(scores, 5))
+        self.assertEqual(hubs[0][1], max(written.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import random
+import unittest
+import controller.graph_lib as graphlib
+from controller.communities import connected_components, label_propagation, get_communities
+from model.csr_graph import CSRGraph
+from model.graph import Graph
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'data.json')
+
+
+def search_components(graph):
+    """
+    Gets components as sets of actor and movie names by depth-first search
+    """
+    actor_vertices, movie_vertices = graph.get_actor_vertices(), graph.get_movie_vertices()
+    seen, components = set(), []
+    for kind, name in [('actor', name) for name in actor_vertices] + [('movie', name) for name in movie_vertices]:
+        if (kind, name) in seen:
+            continue
+        component, stack = (set(), set()), [(kind, name)]
+        seen.add((kind, name))
+        while stack:
+            kind, name = stack.pop()
+            component[kind == 'movie'].add(name)
+            vertices, other = (actor_vertices, 'movie') if kind == 'actor' else (movie_vertices, 'actor')
+            for neighbor in vertices[name].get_neighbors():
+                if (other, neighbor) not in seen:
+                    seen.add((other, neighbor))
+                    stack.append((other, neighbor))
+        components.append(component)
+    return components
+
+
+def as_sets(components):
+    return sorted((sorted(actors), sorted(movies)) for actors, movies in components)
+
+
+class TestCommunities(unittest.TestCase):
+    def test_connected_components(self):
+        with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+            graph = graphlib.construct_graph_single(json.load(data_file))
+        components = connected_components(graph)
+        self.assertEqual(as_sets(components), as_sets(search_components(graph)))
+        self.assertEqual(len(graph.get_components()), len(components))
+        self.assertGreaterEqual(len(components[0][0]), len(components[-1][0]))
+
+    def test_connected_components_csr(self):
+        with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+            graph = graphlib.construct_graph_single(json.load(data_file))
+        frozen = CSRGraph.from_graph(graph)
+        components = connected_components(frozen)
+        self.assertEqual(as_sets(components), as_sets(connected_components(graph)))
+        self.assertEqual(as_sets(components), as_sets(search_components(frozen)))
+        self.assertEqual(len(frozen.get_components()), len(components))
+
+    def test_components_after_changes(self):
+        graph = Graph()
+        rand = random.Random(1)
+        for i in range(40):
+            graph.add_actor_vertex("actor%d" % i)
+        for i in range(30):
+            graph.add_movie_vertex("movie%d" % i)
+        edges = [("actor%d" % rand.randrange(40), "movie%d" % rand.randrange(30), 1) for _ in range(40)]
+        for edge in edges[:20]:
+            graph.add_edge(*edge)
+        self.assertEqual(as_sets(connected_components(graph)), as_sets(search_components(graph)))
+        for actor, movie, _ in edges[:10]:
+            graph.remove_edge(actor, movie)
+        graph.remove_actor_vertex("actor0")
+        self.assertEqual(as_sets(connected_components(graph)), as_sets(search_components(graph)))
+        for edge in edges[20:]:
+            graph.add_edge(*edge)
+        self.assertEqual(as_sets(connected_components(graph)), as_sets(search_components(graph)))
+
+    def test_label_propagation(self):
+        graph = Graph()
+        # Two cliques of actors joined by a single shared movie
+        for i in range(8):
+            graph.add_actor_vertex("actor%d" % i)
+        for name in ("movie_a", "movie_b", "movie_bridge"):
+            graph.add_movie_vertex(name)
+        for i in range(4):
+            graph.add_edge("actor%d" % i, "movie_a", 1)
+            graph.add_edge("actor%d" % (i + 4), "movie_b", 1)
+        graph.add_actor_vertex("loner")
+        graph.add_actor_siblings()
+        labels = label_propagation(graph, seed=0)
+        self.assertEqual(len({labels["actor%d" % i] for i in range(4)}), 1)
+        self.assertEqual(len({labels["actor%d" % i] for i in range(4, 8)}), 1)
+        self.assertNotEqual(labels["actor0"], labels["actor4"])
+        self.assertEqual(labels["loner"], "loner")
+        self.assertEqual([len(actors) for _, actors in get_communities(labels)], [4, 4, 1])
+
+        # Incremental update after new edges, visiting only actors whose siblings changed
+        for i in range(4, 8):
+            graph.add_edge("actor%d" % i, "movie_a", 1)
+        changed = list(graph.get_movie_vertices()["movie_a"].get_neighbors())
+        labels = label_propagation(graph, labels=labels, actors=changed, seed=0)
+        self.assertEqual(len(set(labels[name] for name in changed)), 1)
+        self.assertEqual(labels, label_propagation(graph, labels=labels, seed=0))
+
+    def test_label_propagation_data(self):
+        with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+            graph = graphlib.construct_graph_single(json.load(data_file))
+        labels = label_propagation(graph, seed=0)
+        self.assertEqual(set(labels), set(graph.get_actor_vertices()))
+        # Actors of one community are always in one connected component
+        component_ids = {actor: i for i, (actors, _) in enumerate(connected_components(graph)) for actor in actors}
+        for label, actors in get_communities(labels):
+            self.assertEqual(len({component_ids[actor] for actor in actors}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import copy
+import random
+import unittest
+import controller.graph_lib as graphlib
+from model.graph import Graph
+
+
+def random_names(rand, prefix, number, count):
+    return sorted({"%s%d" % (prefix, rand.randrange(number)) for _ in range(count)})
+
+
+def three_phase_graph(actor_data, movie_data):
+    """
+    Builds a graph by adding every listed edge from both sides with add_edge, then siblings
+    """
+    graph = Graph()
+    for actor, content in actor_data.items():
+        graph.add_actor_vertex(actor, content)
+    for movie, content in movie_data.items():
+        graph.add_movie_vertex(movie, content)
+    for actor, content in actor_data.items():
+        for movie in content['movies']:
+            graph.add_edge(actor, movie, content['age'])
+    for movie, content in movie_data.items():
+        for actor in content['actors']:
+            if actor in actor_data:
+                graph.add_edge(actor, movie, actor_data[actor]['age'])
+    graph.add_actor_siblings()
+    return graph
+
+
+class TestGraphLib(unittest.TestCase):
+    def assert_same_graph(self, graph, actor_data, movie_data):
+        expected = graphlib.construct_graph(copy.deepcopy(actor_data), copy.deepcopy(movie_data))
+        self.assertEqual(set(graph.get_actor_vertices()), set(expected.get_actor_vertices()))
+        self.assertEqual(set(graph.get_movie_vertices()), set(expected.get_movie_vertices()))
+        for name, vertex in expected.get_all_vertices().items():
+            self.assertEqual(graph.get_all_vertices()[name].get_neighbors(), vertex.get_neighbors())
+        self.assertEqual(graph.get_edges(), expected.get_edges())
+
+    def test_incremental_updates(self):
+        rand = random.Random(5)
+        # Names beyond the initial data are referred to before they are added
+        actor_data = {"actor%d" % i: {"name": "actor%d" % i, "age": rand.randrange(20, 80),
+                                      "movies": random_names(rand, "movie", 40, 4)} for i in range(30)}
+        movie_data = {"movie%d" % i: {"name": "movie%d" % i, "actors": random_names(rand, "actor", 40, 3)}
+                      for i in range(30)}
+        graph = graphlib.construct_graph(actor_data, movie_data)
+        graph.add_actor_siblings()
+
+        for step in range(300):
+            operation = rand.randrange(6)
+            actor, movie = "actor%d" % rand.randrange(40), "movie%d" % rand.randrange(40)
+            if operation == 0 and actor not in actor_data:
+                actor_data[actor] = {"name": actor, "age": 30, "movies": random_names(rand, "movie", 40, 4)}
+                graphlib.add_actor(graph, actor, actor_data[actor])
+            elif operation == 1 and movie not in movie_data:
+                movie_data[movie] = {"name": movie, "actors": random_names(rand, "actor", 40, 3)}
+                graphlib.add_movie(graph, movie, movie_data[movie])
+            elif operation == 2 and actor in actor_data:
+                graphlib.update_actor(graph, actor, {"age": rand.randrange(20, 80),
+                                                     "movies": random_names(rand, "movie", 40, 4)})
+            elif operation == 3 and movie in movie_data:
+                graphlib.update_movie(graph, movie, {"actors": random_names(rand, "actor", 40, 3)})
+            elif operation == 4 and actor in actor_data:
+                actor_data.pop(actor)
+                graphlib.remove_actor(graph, actor)
+            elif operation == 5 and movie in movie_data:
+                movie_data.pop(movie)
+                graphlib.remove_movie(graph, movie)
+            if step % 50 == 0:
+                self.assert_same_graph(graph, actor_data, movie_data)
+        self.assert_same_graph(graph, actor_data, movie_data)
+
+        actor_vertices = graph.get_actor_vertices()
+        for name, vertex in actor_vertices.items():
+            expected = {other for other in actor_vertices
+                        if other != name and set(vertex.get_neighbors()) & set(actor_vertices[other].get_neighbors())}
+            self.assertEqual(vertex.get_siblings(), expected)
+
+    def test_build_graph(self):
+        rand = random.Random(6)
+        actor_data = {"actor%d" % i: {"age": rand.randrange(20, 80), "movies": random_names(rand, "movie", 60, 5)}
+                      for i in range(50)}
+        movie_data = {"movie%d" % i: {"gross": rand.randrange(1000), "actors": random_names(rand, "actor", 60, 4)}
+                      for i in range(50)}
+        graph = graphlib.build_graph(actor_data, movie_data)
+        expected = three_phase_graph(actor_data, movie_data)
+        for name, vertex in expected.get_all_vertices().items():
+            # Neighbors keep the order of the three-phase build
+            self.assertEqual(list(graph.get_all_vertices()[name].get_neighbors().items()),
+                             list(vertex.get_neighbors().items()))
+        for name, vertex in expected.get_actor_vertices().items():
+            self.assertEqual(graph.get_actor_vertices()[name].get_siblings(), vertex.get_siblings())
+            self.assertEqual(graph.get_actor_gross(name), expected.get_actor_gross(name))
+        self.assertEqual(graph.get_edges(), expected.get_edges())
+        self.assertEqual(len(graph.get_components()), len(expected.get_components()))
+
+        # References to missing vertices let incremental updates add the edges later
+        graphlib.add_movie(graph, "movie55", {"actors": []})
+        self.assertEqual(set(graph.get_movie_vertices()["movie55"].get_neighbors()),
+                         {actor for actor, content in actor_data.items() if "movie55" in content['movies']})
+
+    def test_remove_missing(self):
+        graph = graphlib.construct_graph({}, {})
+        self.assertIsNone(graphlib.remove_actor(graph, "actor"))
+        self.assertIsNone(graphlib.remove_movie(graph, "movie"))
+
+
+if __name__ == "__main__":
+    unittest.main()
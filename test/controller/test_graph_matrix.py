@@ -0,0 +1,105 @@
+import json
+import os
+import random
+import unittest
+import numpy as np
+from collections import defaultdict
+import controller.graph_lib as graphlib
+import controller.query_utils as query
+from controller.analysis_utils import hub_actors
+from controller.graph_matrix import IncidenceMatrix
+from model.csr_graph import CSRGraph
+from model.graph import Graph
+from model.utils import select_largest_k
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'data.json')
+
+
+def load_data():
+    with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+        return json.load(data_file)
+
+
+class TestIncidenceMatrix(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.graph = graphlib.construct_graph_single(load_data())
+        cls.matrix = IncidenceMatrix(cls.graph)
+
+    def test_degrees(self):
+        actor_vertices, movie_vertices = self.graph.get_actor_vertices(), self.graph.get_movie_vertices()
+        self.assertEqual(self.matrix.get_actor_degrees().tolist(),
+                         [len(actor_vertices[name].get_neighbors()) for name in self.matrix.actor_names])
+        self.assertEqual(self.matrix.get_movie_degrees().tolist(),
+                         [len(movie_vertices[name].get_neighbors()) for name in self.matrix.movie_names])
+
+    def test_co_star_counts(self):
+        actor_vertices = self.graph.get_actor_vertices()
+        self.assertEqual(self.matrix.get_sibling_counts().tolist(),
+                         [len(actor_vertices[name].get_siblings()) for name in self.matrix.actor_names])
+        co_star = self.matrix.get_co_star_matrix()
+        for name in self.matrix.actor_names[:50]:
+            row = co_star.getrow(self.matrix.actor_ids[name])
+            for sibling_id, shared in zip(row.indices, row.data):
+                sibling = self.matrix.actor_names[sibling_id]
+                self.assertEqual(shared, len(set(actor_vertices[name].get_neighbors())
+                                             & set(actor_vertices[sibling].get_neighbors())))
+
+    def test_actor_gross(self):
+        actor_vertices, movie_vertices = self.graph.get_actor_vertices(), self.graph.get_movie_vertices()
+        gross = self.matrix.get_actor_gross()
+        for name in self.matrix.actor_names:
+            expected = sum(movie_vertices[movie].get_content()['gross']
+                           for movie in actor_vertices[name].get_neighbors())
+            self.assertAlmostEqual(gross[self.matrix.actor_ids[name]], expected, delta=1e-6 * max(1.0, expected))
+
+    def test_missing_content(self):
+        graph = Graph()
+        graph.add_actor_vertex("actor1", {'age': 30})
+        graph.add_movie_vertex("movie1", {'gross': 5, 'year': 2001})
+        graph.add_movie_vertex("movie2")
+        graph.add_movie_vertex("movie3", {'gross': None, 'year': None})
+        for movie in ("movie1", "movie2", "movie3"):
+            graph.add_edge("actor1", movie, 30)
+        matrix = IncidenceMatrix(graph)
+        self.assertEqual(matrix.get_actor_gross().tolist(), [5.0])
+        self.assertEqual(matrix.get_year_aggregates(), {2001: {'movies': 1, 'gross': 5.0, 'actors': 1}})
+
+    def test_year_aggregates(self):
+        movies, actors = defaultdict(int), defaultdict(set)
+        for name, vertex in self.graph.get_movie_vertices().items():
+            year = vertex.get_content()['year']
+            if year > 0:
+                movies[year] += 1
+                actors[year].update(vertex.get_neighbors())
+        aggregates = self.matrix.get_year_aggregates()
+        self.assertEqual({year: aggregate['movies'] for year, aggregate in aggregates.items()}, dict(movies))
+        self.assertEqual({year: aggregate['actors'] for year, aggregate in aggregates.items()},
+                         {year: len(names) for year, names in actors.items()})
+
+    def test_top_actors_ties(self):
+        rand = random.Random(0)
+        names = self.matrix.actor_names
+        for values in (np.array([rand.randint(0, 5) for _ in names]), self.matrix.get_sibling_counts(),
+                       np.array([rand.random() for _ in names])):
+            pairs = list(zip(names, values.tolist()))
+            for k in (0, 1, 5, 50, len(names) - 1, len(names), len(names) + 3):
+                self.assertEqual(self.matrix.top_actors(values, k), select_largest_k(pairs, k))
+
+    def test_analysis_functions(self):
+        self.assertEqual(hub_actors(self.graph, number=10, save_fig=False, matrix=self.matrix),
+                         hub_actors(self.graph, number=10, save_fig=False))
+        expected = query.get_actors_top_k_grossing(self.graph, 10)
+        actual = query.get_actors_top_k_grossing(self.graph, 10, matrix=self.matrix)
+        self.assertEqual([name for name, _ in actual], [name for name, _ in expected])
+        for (_, value), (_, expected_value) in zip(actual, expected):
+            self.assertAlmostEqual(value, expected_value, delta=1.0)
+
+    def test_csr_graph(self):
+        matrix = IncidenceMatrix(CSRGraph.from_graph(self.graph))
+        self.assertEqual(matrix.get_sibling_counts().tolist(), self.matrix.get_sibling_counts().tolist())
+        self.assertEqual(matrix.get_actor_gross().tolist(), self.matrix.get_actor_gross().tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
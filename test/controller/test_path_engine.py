@@ -0,0 +1,103 @@
+import json
+import os
+import random
+import unittest
+from unittest.mock import patch
+import controller.graph_lib as graphlib
+import controller.path_engine as path_engine
+import controller.query_utils as query
+from controller.path_engine import find_path, find_paths
+from model.graph import Graph
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'data.json')
+
+
+def bfs_degrees(graph, source):
+    """
+    Gets degrees of separation of all actors reachable from source by plain BFS
+    """
+    actor_vertices, movie_vertices = graph.get_actor_vertices(), graph.get_movie_vertices()
+    degrees, frontier = {source: 0}, [source]
+    while frontier:
+        next_frontier = []
+        for actor in frontier:
+            for movie in actor_vertices[actor].get_neighbors():
+                for co_star in movie_vertices[movie].get_neighbors():
+                    if co_star not in degrees:
+                        degrees[co_star] = degrees[actor] + 1
+                        next_frontier.append(co_star)
+        frontier = next_frontier
+    return degrees
+
+
+class TestPathEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+            cls.graph = graphlib.construct_graph_single(json.load(data_file))
+        cls.actors = list(cls.graph.get_actor_vertices())
+
+    def assert_chain(self, chain, source, target):
+        self.assertEqual(chain[0], source)
+        self.assertEqual(chain[-1], target)
+        actor_vertices = self.graph.get_actor_vertices()
+        for i in range(0, len(chain) - 1, 2):
+            self.assertIn(chain[i + 1], actor_vertices[chain[i]].get_neighbors())
+            self.assertIn(chain[i + 1], actor_vertices[chain[i + 2]].get_neighbors())
+
+    def test_shortest_paths(self):
+        rand = random.Random(0)
+        for source in rand.sample(self.actors, 10):
+            degrees = bfs_degrees(self.graph, source)
+            for target in rand.sample(self.actors, 20):
+                chain = find_path(self.graph, source, target)
+                if target not in degrees:
+                    self.assertIsNone(chain)
+                    continue
+                self.assert_chain(chain, source, target)
+                self.assertEqual(len(chain) // 2, degrees[target])
+
+    def test_max_depth(self):
+        source = self.actors[0]
+        degrees = bfs_degrees(self.graph, source)
+        target = max(degrees, key=degrees.get)
+        self.assertIsNone(find_path(self.graph, source, target, max_depth=degrees[target] - 1))
+        self.assertEqual(len(find_path(self.graph, source, target, max_depth=degrees[target])) // 2, degrees[target])
+        self.assertEqual(find_path(self.graph, source, source, max_depth=0), [source])
+
+    def test_not_connected(self):
+        graph = Graph()
+        graph.add_actor_vertex("actor1")
+        graph.add_actor_vertex("actor2")
+        graph.add_movie_vertex("movie1")
+        graph.add_edge("actor1", "movie1", 1)
+        self.assertIsNone(find_path(graph, "actor1", "actor2"))
+        self.assertRaises(KeyError, find_path, graph, "actor1", "actor3")
+
+    def test_find_paths(self):
+        rand = random.Random(1)
+        source = self.actors[3]
+        pairs = [(source, target) for target in rand.sample(self.actors, 10)]
+        pairs += [(rand.choice(self.actors), rand.choice(self.actors)) for _ in range(10)]
+        self.assertGreaterEqual(len({target for _, target in pairs[:10]}), path_engine.BATCH_BFS_THRESHOLD)
+        for max_depth in (None, 2):
+            chains = find_paths(self.graph, pairs, max_depth)
+            for (pair_source, target), chain in zip(pairs, chains):
+                expected = find_path(self.graph, pair_source, target, max_depth)
+                if expected is None:
+                    self.assertIsNone(chain)
+                else:
+                    self.assert_chain(chain, pair_source, target)
+                    self.assertEqual(len(chain), len(expected))
+
+    def test_query_actor_path(self):
+        names = iter([self.actors[0], self.actors[50]])
+        with patch('builtins.input', lambda x: next(names)):
+            chain = query.query_actor_path(self.graph)
+        self.assert_chain(chain, self.actors[0], self.actors[50])
+        with patch('builtins.input', lambda x: "illegal"):
+            self.assertIsNone(query.query_actor_path(self.graph))
+
+
+if __name__ == "__main__":
+    unittest.main()
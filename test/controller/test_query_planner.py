@@ -0,0 +1,111 @@
+import json
+import os
+import random
+import unittest
+from controller.query_planner import DataIndex, parse_query, normalize_query
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'data.json')
+
+
+def scan(data, clauses, conjunction):
+    """
+    Gets names matching clauses by scanning every record
+    """
+    operators = {'=': lambda a, b: a == b, '>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b,
+                 '>': lambda a, b: a > b, '<': lambda a, b: a < b}
+    results = []
+    for clause in clauses:
+        names = set()
+        for name, record in data.items():
+            value = record[clause.attr]
+            if clause.operator == '=':
+                if value == clause.value or clause.attr == 'name' and clause.text in value:
+                    names.add(name)
+            elif isinstance(value, (int, float)) and operators[clause.operator](value, clause.value):
+                names.add(name)
+        results.append(names)
+    return set.intersection(*results) if conjunction else set.union(*results)
+
+
+class TestQueryPlanner(unittest.TestCase):
+    def setUp(self):
+        with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+            self.movie_data = json.load(data_file)[1]
+        self.index = DataIndex(self.movie_data)
+
+    def assert_query(self, query, expected=None):
+        clauses, conjunction = parse_query(query)
+        names = self.index.evaluate(clauses, conjunction)
+        self.assertEqual(names, scan(self.movie_data, clauses, conjunction))
+        if expected is not None:
+            self.assertEqual(names, expected)
+
+    def test_parse_query(self):
+        clauses, conjunction = parse_query("name=Harry & Son&year>=1984")
+        self.assertTrue(conjunction)
+        self.assertEqual([(c.attr, c.operator, c.value) for c in clauses],
+                         [('name', '=', "Harry & Son"), ('year', '>=', 1984)])
+        clauses, conjunction = parse_query("year<2000.5|box_office>0|name=A>B")
+        self.assertFalse(conjunction)
+        self.assertEqual([(c.attr, c.operator, c.value) for c in clauses],
+                         [('year', '<', 2000.5), ('box_office', '>', 0), ('name', '=', "A>B")])
+        self.assertEqual(parse_query("year==2011")[0][0].value, 2011)
+        for query in ("year=", "name=Kid&year=1|year=2", "year>=", "year>x", "year=1=2"):
+            self.assertRaises(ValueError, parse_query, query)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query(*parse_query("name=Kid&year>=2000")),
+                         normalize_query(*parse_query("year>=2000&name=Kid&name=Kid")))
+        self.assertNotEqual(normalize_query(*parse_query("name=Kid&year>=2000")),
+                            normalize_query(*parse_query("name=Kid|year>=2000")))
+        self.assertNotEqual(normalize_query(*parse_query("name=Kid")), normalize_query(*parse_query("name=kid")))
+
+    def test_evaluate(self):
+        self.assert_query("name=The Kid|year=2011")
+        self.assert_query("year>=2000&year<2005&box_office>0")
+        self.assert_query("year>2010&name=Die")
+        self.assert_query("name=Ha&year<=1990")
+        self.assert_query("year=2011&name=nothing like this", set())
+        self.assert_query("name=Die Hard", {name for name in self.movie_data if "Die Hard" in name})
+        self.assertRaises(KeyError, self.index.evaluate, *parse_query("years=2011"))
+
+    def test_random_queries(self):
+        rand = random.Random(0)
+        names = list(self.movie_data)
+        for _ in range(50):
+            name = rand.choice(names)
+            start = rand.randrange(len(name))
+            year = rand.randint(1960, 2018)
+            operator = rand.choice(('>=', '<=', '>', '<', '='))
+            self.assert_query("name=%s&year%s%d" % (name[start:start + rand.randint(1, 6)], operator, year))
+            self.assert_query("year%s%d|box_office>%d" % (operator, year, rand.randint(0, 10 ** 8)))
+
+    def test_writes(self):
+        version = self.index.version
+        self.assert_query("year>=2000&name=Hard")
+        self.assert_query("box_office=4000")
+        self.index.remove("Die Hard")
+        self.movie_data.pop("Die Hard")
+        self.movie_data["Hard Times"] = {'name': "Hard Times", 'year': 2001, 'box_office': 4000, 'actors': []}
+        self.index.add("Hard Times")
+        self.index.remove("Passed Away")
+        self.movie_data["Passed Away"]['year'] = 2001
+        self.index.add("Passed Away")
+        self.assert_query("year>=2000&name=Hard")
+        self.assert_query("year=2001")
+        self.assert_query("box_office=4000|name=Die Hard")
+        self.assertGreater(self.index.version, version)
+        self.movie_data["No Year"] = {'name': "No Year"}
+        self.index.add("No Year")
+        self.assertRaises(KeyError, self.index.evaluate, *parse_query("year=2001"))
+
+    def test_remove_not_indexed(self):
+        self.assert_query("year>=0")
+        entries = list(self.index.sorted['year'])
+        self.movie_data["Not Indexed"] = {'name': "Not Indexed", 'year': 1850}
+        self.index.remove("Not Indexed")
+        self.assertEqual(self.index.sorted['year'], entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -67,6 +67,19 @@ class TestGraphLib(unittest.TestCase):
     def test_query_actor_oldest(self):
         self.assertEqual(query.query_actor_oldest(self.graph), [38, 26])
 
+    def test_rankings_keep_vertices(self):
+        self.graph.get_actor_vertices()["actor1"].set_compare_value("kept")
+        self.assertEqual(query.get_actors_top_k_grossing(self.graph, 2), [("actor3", 170000), ("actor2", 17000)])
+        self.assertEqual(query.get_actors_oldest_k(self.graph, 5), [("actor1", 38), ("actor2", 26), ("actor3", 10)])
+        self.assertEqual(self.graph.get_actor_vertices()["actor1"].get_compare_value(), "kept")
+        self.assertIsNone(self.graph.get_actor_vertices()["actor2"].get_compare_value())
+
+        # Cached total grossing follows edges and movie gross
+        self.graph.update_movie_content("movie1", {'gross': 1000000})
+        self.assertEqual(query.get_actors_top_k_grossing(self.graph, 1), [("actor2", 1000000)])
+        self.graph.remove_edge("actor2", "movie1")
+        self.assertEqual(query.get_actors_top_k_grossing(self.graph, 1), [("actor1", 1000000)])
+
     @patch('builtins.input', lambda x: 'illegal')
     def test_query_actor_oldest_illegal(self):
         self.assertEqual(query.query_actor_oldest(self.graph), None)
@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+import unittest
+import model.data_crawler as crawler
+from model.checkpoint import CrawlCheckpoint
+from model.crawl_engine import CrawlEngine
+from model.fetcher import Fetcher
+from test.model.wiki_stub import WikiStub, build_pages
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.checkpoint_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.checkpoint_dir)
+
+    def test_record_load(self):
+        checkpoint = CrawlCheckpoint(self.checkpoint_dir, interval=2)
+        self.assertIsNone(checkpoint.load())
+        checkpoint.open()
+        checkpoint.record('actor', "Actor 0", {'age': 30}, [{'title': "Movie 1"}, {'title': "Movie 2"}])
+        checkpoint.record('movie', "Movie 1", {'year': 1991}, [{'name': "Actor 0"}, {'name': "Actor 1"}], depth=1)
+        checkpoint.record_failure("Actor 1")
+        checkpoint.close()
+
+        state = CrawlCheckpoint(self.checkpoint_dir).load()
+        self.assertEqual(state['actor_data'], {"Actor 0": {'age': 30}})
+        self.assertEqual(state['movie_data'], {"Movie 1": {'year': 1991}})
+        self.assertEqual(state['expanded'], [
+            ('actor', {'age': 30}, [{'title': "Movie 1"}, {'title': "Movie 2"}], 0),
+            ('movie', {'year': 1991}, [{'name': "Actor 0"}, {'name': "Actor 1"}], 1)])
+        self.assertEqual(state['failure_names'], {"Actor 1"})
+
+    def test_uncommitted_records(self):
+        checkpoint = CrawlCheckpoint(self.checkpoint_dir, interval=2)
+        checkpoint.open()
+        checkpoint.record('actor', "Actor 0", {}, [])
+        checkpoint.record('actor', "Actor 1", {}, [])
+        # Simulates a crash after this record is written but before it is committed
+        checkpoint.record('actor', "Actor 2", {}, [])
+        checkpoint._journal.flush()
+
+        self.assertEqual(set(CrawlCheckpoint(self.checkpoint_dir).load()['actor_data']), {"Actor 0", "Actor 1"})
+        resumed = CrawlCheckpoint(self.checkpoint_dir, interval=2)
+        resumed.open(resume=True)
+        resumed.record('actor', "Actor 3", {}, [])
+        resumed.close()
+        self.assertEqual(set(CrawlCheckpoint(self.checkpoint_dir).load()['actor_data']),
+                         {"Actor 0", "Actor 1", "Actor 3"})
+
+    def test_open_clears_checkpoint(self):
+        checkpoint = CrawlCheckpoint(self.checkpoint_dir)
+        checkpoint.open()
+        checkpoint.record('actor', "Actor 0", {}, [])
+        checkpoint.close()
+        checkpoint.open()
+        checkpoint.close()
+
+        self.assertEqual(CrawlCheckpoint(self.checkpoint_dir).load()['actor_data'], {})
+
+    def test_resume_crawl(self):
+        fetcher = Fetcher()
+        with WikiStub(build_pages()) as stub:
+            first = CrawlEngine(fetcher.fetch, crawler.parse_actor_page, crawler.parse_movie_page,
+                                target_movie_number=3, target_actor_number=3, concurrency=2,
+                                checkpoint=CrawlCheckpoint(self.checkpoint_dir, interval=1))
+            first.run(stub.url("Actor 0"))
+            first_requests = list(stub.requests)
+            second = CrawlEngine(fetcher.fetch, crawler.parse_actor_page, crawler.parse_movie_page,
+                                 target_movie_number=6, target_actor_number=6, concurrency=2,
+                                 checkpoint=CrawlCheckpoint(self.checkpoint_dir, interval=1))
+            actor_data, movie_data = second.run(stub.url("Actor 0"), resume=True)
+            resumed_requests = stub.requests[len(first_requests):]
+        fetcher.close()
+
+        self.assertEqual(len(movie_data), 6)
+        self.assertEqual(len(actor_data), 6)
+        self.assertTrue(set(first.movie_data).issubset(movie_data))
+        self.assertFalse(set(first_requests) & set(resumed_requests))
+
+
+if __name__ == "__main__":
+    unittest.main()
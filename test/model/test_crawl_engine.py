@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+from functools import partial
+import model.data_crawler as crawler
+from model.crawl_engine import CrawlEngine
+from model.fetcher import Fetcher
+from model.ndjson_io import NDJSONWriter, load_records
+from test.model.wiki_stub import WikiStub, build_pages
+
+
+class TestCrawlEngine(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = Fetcher()
+
+    def tearDown(self):
+        self.fetcher.close()
+
+    def make_engine(self, target_movie_number, target_actor_number, concurrency=4, parse_workers=0,
+                    parse_actor=crawler.parse_actor_page, parse_movie=crawler.parse_movie_page):
+        return CrawlEngine(self.fetcher.fetch, parse_actor, parse_movie,
+                           target_movie_number=target_movie_number,
+                           target_actor_number=target_actor_number,
+                           concurrency=concurrency,
+                           parse_workers=parse_workers)
+
+    def test_parse_saved_pages(self):
+        with WikiStub(build_pages()) as stub:
+            actor_url, movie_url = stub.url("Actor 0"), stub.url("Movie 3")
+            actor_name, actor_info, movie_info = crawler.parse_actor_page(self.fetcher.fetch(actor_url), actor_url)
+            movie_name, movie_detail, actor_entries = crawler.parse_movie_page(self.fetcher.fetch(movie_url), movie_url)
+
+        self.assertEqual(actor_name, "Actor 0")
+        self.assertEqual(actor_info['age'], 30)
+        self.assertEqual(actor_info['movies'], ["Movie 1", "Movie 2", "Movie 3", "Movie 4", "Movie 5"])
+        self.assertEqual(movie_info[0]['url'], stub.url("Movie 1"))
+        self.assertEqual(movie_name, "Movie 3")
+        self.assertEqual(movie_detail['gross'], 13000000)
+        self.assertEqual(movie_detail['lang'], ["English"])
+        self.assertEqual(movie_detail['actors'], ["Actor 3", "Actor 4", "Actor 5", "Actor 6"])
+        self.assertEqual(actor_entries[1]['url'], stub.url("Actor 4"))
+
+    def test_crawl_reaches_targets(self):
+        with WikiStub(build_pages(), delay=0.02) as stub:
+            engine = self.make_engine(target_movie_number=6, target_actor_number=5, concurrency=4)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+
+        self.assertEqual(len(movie_data), 6)
+        self.assertGreaterEqual(len(actor_data), 5)
+        self.assertLessEqual(stub.max_in_flight, 4)
+        self.assertGreater(stub.max_in_flight, 1)
+        self.assertEqual(len(stub.requests), len(set(stub.requests)))
+        for movie in movie_data.values():
+            self.assertIn('year', movie)
+            self.assertIn('url', movie)
+            self.assertNotIn('title', movie)
+
+    def test_crawl_parse_workers(self):
+        with WikiStub(build_pages(), delay=0.01) as stub:
+            serial_data = self.make_engine(target_movie_number=5, target_actor_number=5, concurrency=1).run(
+                stub.url("Actor 0"))
+            engine = self.make_engine(target_movie_number=5, target_actor_number=5, concurrency=1, parse_workers=2)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+
+        self.assertEqual((actor_data, movie_data), serial_data)
+
+    def test_crawl_parse_workers_settings(self):
+        # Settings bound to parsers reach worker processes, which do not see module state of the test process
+        parsers = {'parse_actor': partial(crawler.parse_actor_page, backend=crawler.PARSER_BACKEND, select_number=2),
+                   'parse_movie': partial(crawler.parse_movie_page, backend=crawler.PARSER_BACKEND, select_number=3)}
+        with WikiStub(build_pages(), delay=0.01) as stub:
+            engine = self.make_engine(target_movie_number=5, target_actor_number=5, concurrency=1, parse_workers=2,
+                                      **parsers)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+
+        self.assertTrue(all(len(actor['movies']) <= 2 for actor in actor_data.values()))
+        self.assertTrue(all(len(movie['actors']) <= 3 for movie in movie_data.values()))
+        self.assertTrue(any(len(movie['actors']) == 3 for movie in movie_data.values()))
+
+    def test_crawl_serial(self):
+        with WikiStub(build_pages()) as stub:
+            engine = self.make_engine(target_movie_number=3, target_actor_number=3, concurrency=1)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+
+        self.assertEqual(stub.max_in_flight, 1)
+        self.assertEqual(len(movie_data), 3)
+        self.assertEqual(len(actor_data), 3)
+
+    def test_crawl_stops_without_urls(self):
+        pages = build_pages(actor_number=2, movie_number=2, movies_per_actor=3, actors_per_movie=2)
+        with WikiStub(pages) as stub:
+            engine = self.make_engine(target_movie_number=50, target_actor_number=50)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+
+        self.assertEqual(len(movie_data), 2)
+        self.assertEqual(len(actor_data), 2)
+
+    def test_crawl_failures(self):
+        pages = build_pages()
+        pages.pop("/wiki/Movie_2")
+        with WikiStub(pages) as stub:
+            engine = self.make_engine(target_movie_number=4, target_actor_number=2)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+
+        self.assertIn("Movie 2", engine.failure_names)
+        self.assertNotIn("Movie 2", movie_data)
+        self.assertEqual(len(movie_data), 4)
+
+    def test_crawl_stream_output(self):
+        data_dir = tempfile.mkdtemp()
+        actor_path = os.path.join(data_dir, "actors.ndjson.gz")
+        movie_path = os.path.join(data_dir, "movies.ndjson.gz")
+        with WikiStub(build_pages()) as stub, NDJSONWriter(actor_path) as actor_writer, \
+                NDJSONWriter(movie_path) as movie_writer:
+            engine = CrawlEngine(self.fetcher.fetch, crawler.parse_actor_page, crawler.parse_movie_page,
+                                 target_movie_number=4, target_actor_number=3,
+                                 actor_writer=actor_writer, movie_writer=movie_writer, keep_records=False)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+
+        self.assertEqual(actor_data, {})
+        self.assertEqual(movie_data, {})
+        self.assertEqual(set(load_records(actor_path)), engine.crawled['actor'])
+        self.assertEqual(len(load_records(movie_path)), 4)
+        shutil.rmtree(data_dir)
+
+    def test_invalid_concurrency(self):
+        self.assertRaises(ValueError, self.make_engine, 1, 1, 0)
+        self.assertRaises(ValueError, self.make_engine, 1, 1, 1, -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+import controller.graph_lib as graphlib
+import controller.query_utils as query
+from model.csr_graph import CSRGraph
+from model.graph import Graph
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'data.json')
+
+
+def load_data():
+    with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+        return json.load(data_file)
+
+
+class TestCSRGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.add_actor_vertex("actor1", {'age': 38})
+        self.graph.add_actor_vertex("actor2", {'age': 26})
+        self.graph.add_actor_vertex("actor3", {'age': 10})
+        self.graph.add_movie_vertex("movie1", {'year': 2017, 'gross': 17000, 'lang': ["English"]})
+        self.graph.add_movie_vertex("movie2", {'year': 2017, 'gross': 170000, 'country': ["China"]})
+        self.graph.add_edge("actor1", "movie1", 3)
+        self.graph.add_edge("actor2", "movie1", 4)
+        self.graph.add_edge("actor3", "movie2", 5)
+        self.graph.add_actor_siblings()
+        self.csr = CSRGraph.from_graph(self.graph)
+
+    def test_from_graph(self):
+        self.assertEqual(len(self.csr.get_actor_vertices()), 3)
+        self.assertEqual(len(self.csr.get_movie_vertices()), 2)
+        self.assertEqual(len(self.csr.get_all_vertices()), 5)
+        self.assertEqual(self.csr.get_edges(), self.graph.get_edges())
+        self.assertEqual(self.csr.get_edge_number(), 3)
+        actor = self.csr.get_actor_vertices()["actor1"]
+        self.assertEqual(actor.get_name(), "actor1")
+        self.assertEqual(actor.get_content(), {'age': 38})
+        self.assertEqual(actor.get_neighbors(), {"movie1": 3})
+        self.assertEqual(actor.get_siblings(), {"actor2"})
+        self.assertEqual(self.csr.get_movie_vertices()["movie1"].get_neighbors(), {"actor1": 3, "actor2": 4})
+        self.assertNotIn("movie3", self.csr.get_movie_vertices())
+
+    def test_compare_value(self):
+        actors = self.csr.get_actor_vertices()
+        actors["actor1"].set_compare_value(3)
+        actors["actor3"].set_compare_value(1)
+        self.assertEqual(actors["actor1"].get_compare_value(), 3)
+        self.assertEqual(sorted([actors["actor1"], actors["actor3"]]), [actors["actor3"], actors["actor1"]])
+
+    def test_query_surface(self):
+        cases = [(query.query_movie_gross, 'movie1'), (query.query_actor_movies, 'actor1'),
+                 (query.query_movie_actors, 'movie1'), (query.query_actor_top_grossing, '2'),
+                 (query.query_actor_oldest, '2'), (query.query_movies_given_year, '2017'),
+                 (query.query_actors_given_year, '2017'), (query.query_language_movies, 'English'),
+                 (query.query_country_movies, 'China'), (query.query_movie_gross, 'illegal')]
+        for function, value in cases:
+            with self.subTest(function=function.__name__, value=value), patch('builtins.input', lambda x: value):
+                self.assertEqual(function(self.csr), function(self.graph))
+
+    def test_from_json(self):
+        graph = graphlib.construct_graph_single(load_data())
+        csr = CSRGraph.from_json(load_data())
+
+        self.assertEqual(list(csr.get_actor_vertices()), list(graph.get_actor_vertices()))
+        self.assertEqual(list(csr.get_movie_vertices()), list(graph.get_movie_vertices()))
+        self.assertEqual(csr.get_edges(), graph.get_edges())
+        for vertices, csr_vertices in ((graph.get_actor_vertices(), csr.get_actor_vertices()),
+                                       (graph.get_movie_vertices(), csr.get_movie_vertices())):
+            for name, vertex in vertices.items():
+                self.assertEqual(csr_vertices[name].get_content(), vertex.get_content())
+                self.assertEqual(list(csr_vertices[name].get_neighbors().items()),
+                                 list(vertex.get_neighbors().items()))
+        for name, vertex in graph.get_actor_vertices().items():
+            self.assertEqual(csr.get_actor_vertices()[name].get_siblings(), vertex.get_siblings())
+        self.assertEqual(query.get_actors_top_k_grossing(csr, 10)[0][0],
+                         query.get_actors_top_k_grossing(graph, 10)[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import gzip
+import unittest
+import zlib
+from unittest.mock import Mock, patch
+from urllib.error import HTTPError
+from model.fetcher import Fetcher, decode_body
+from test.model.wiki_stub import WikiStub, build_pages
+
+
+class TestFetcher(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = Fetcher(pool_size=2)
+
+    def tearDown(self):
+        self.fetcher.close()
+
+    def test_reuse_connection(self):
+        with WikiStub(build_pages()) as stub:
+            for i in range(5):
+                self.assertIn(b"Actor %d" % i, self.fetcher.fetch(stub.url("Actor %d" % i)))
+            stats = self.fetcher.get_stats()
+
+        self.assertEqual(len(stub.connections), 1)
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['reuse_rate'], 0.8)
+        self.assertGreater(stats['latency_max'], 0)
+        self.assertGreaterEqual(stats['latency_p95'], stats['latency_p50'])
+
+    def test_compressed_body(self):
+        pages = build_pages()
+        with WikiStub(pages, compress=True) as stub:
+            body = self.fetcher.fetch(stub.url("Movie 1"))
+            stats = self.fetcher.get_stats()
+
+        self.assertEqual(body, pages["/wiki/Movie_1"].encode("utf-8"))
+        self.assertEqual(stats['body_bytes'], len(body))
+        self.assertLess(stats['wire_bytes'], stats['body_bytes'])
+        self.assertLess(stats['compression_ratio'], 1.0)
+
+    def test_redirect(self):
+        with WikiStub(build_pages(), redirects={"/wiki/Alias": "/wiki/Movie_2"}) as stub:
+            response = self.fetcher.request(stub.root + "/wiki/Alias")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.url, stub.url("Movie 2"))
+
+    def test_not_found(self):
+        with WikiStub(build_pages()) as stub:
+            self.assertRaises(HTTPError, self.fetcher.fetch, stub.url("Nobody"))
+            # The connection is still usable after an error status
+            self.fetcher.fetch(stub.url("Actor 1"))
+
+        self.assertEqual(self.fetcher.get_stats()['connections'], 1)
+
+    def test_stale_connection(self):
+        with WikiStub(build_pages(), drop_connections=True) as stub:
+            for i in range(3):
+                self.assertIn(b"Actor %d" % i, self.fetcher.fetch(stub.url("Actor %d" % i)))
+
+        self.assertEqual(self.fetcher.get_stats()['requests'], 3)
+        self.assertEqual(len(stub.connections), 3)
+        self.fetcher.reset_stats()
+        self.assertEqual(self.fetcher.get_stats()['requests'], 0)
+
+    def test_failed_retry_closes_connection(self):
+        stale, fresh = Mock(), Mock()
+        stale.request.side_effect = ConnectionResetError
+        fresh.request.side_effect = ConnectionRefusedError
+        with patch.object(self.fetcher, '_checkout', return_value=(stale, True)), \
+                patch.object(self.fetcher, '_new_connection', return_value=fresh):
+            self.assertRaises(ConnectionRefusedError, self.fetcher._request_once, "http://127.0.0.1:1/wiki/A", {})
+        stale.close.assert_called_once_with()
+        fresh.close.assert_called_once_with()
+
+    def test_decode_body(self):
+        self.assertEqual(decode_body(gzip.compress(b"page"), "gzip"), b"page")
+        self.assertEqual(decode_body(zlib.compress(b"page"), "deflate"), b"page")
+        self.assertEqual(decode_body(b"page", ""), b"page")
+        self.assertRaises(ValueError, decode_body, b"page", "compress")
+
+
+if __name__ == "__main__":
+    unittest.main()
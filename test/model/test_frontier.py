@@ -0,0 +1,94 @@
+import unittest
+import model.data_crawler as crawler
+from model.crawl_engine import CrawlEngine, ACTOR, MOVIE
+from model.fetcher import Fetcher
+from model.frontier import Frontier, lifo_priority, bfs_priority, reference_priority, gross_priority
+from test.model.wiki_stub import WikiStub, build_pages
+
+
+def pop_names(frontier):
+    names = []
+    popped = frontier.pop()
+    while popped is not None:
+        names.append(popped[0][frontier.key])
+        popped = frontier.pop()
+    return names
+
+
+class TestFrontier(unittest.TestCase):
+    def test_dedup_on_insert(self):
+        frontier = Frontier('name')
+        self.assertTrue(frontier.push({'name': "A"}))
+        self.assertFalse(frontier.push({'name': "A"}))
+        self.assertEqual(len(frontier), 1)
+        self.assertEqual(frontier.get_references("A"), 2)
+        frontier.pop()
+        # A popped name is still seen
+        self.assertFalse(frontier.push({'name': "A"}))
+        self.assertIsNone(frontier.pop())
+
+    def test_discard(self):
+        frontier = Frontier('name')
+        frontier.push({'name': "A"})
+        frontier.push({'name': "B"})
+        frontier.discard("B")
+        frontier.discard("C")
+        self.assertFalse(frontier.push({'name': "C"}))
+        self.assertNotIn("B", frontier)
+        self.assertEqual(pop_names(frontier), ["A"])
+
+    def test_lifo_priority(self):
+        frontier = Frontier('title', lifo_priority)
+        for title in ("A", "B", "C", "A"):
+            frontier.push({'title': title})
+        self.assertEqual(pop_names(frontier), ["C", "B", "A"])
+
+    def test_bfs_priority(self):
+        frontier = Frontier('name', bfs_priority)
+        frontier.push({'name': "A"}, depth=2)
+        frontier.push({'name': "B"}, depth=1)
+        frontier.push({'name': "C"}, depth=2)
+        frontier.push({'name': "D"}, depth=1)
+        # A shorter path found later moves an entry forward
+        frontier.push({'name': "C"}, depth=0)
+        popped = []
+        while len(frontier) > 0:
+            entry, depth = frontier.pop()
+            popped.append((entry['name'], depth))
+        self.assertEqual(popped, [("C", 0), ("B", 1), ("D", 1), ("A", 2)])
+
+    def test_reference_priority(self):
+        frontier = Frontier('name', reference_priority)
+        for name in ("A", "B", "C", "B", "C", "C"):
+            frontier.push({'name': name})
+        self.assertEqual(pop_names(frontier), ["C", "B", "A"])
+
+    def test_gross_priority(self):
+        frontier = Frontier('name', gross_priority)
+        frontier.push({'name': "A"}, weight=100)
+        frontier.push({'name': "B"}, weight=80)
+        frontier.push({'name': "B"}, weight=80)
+        frontier.push({'name': "C"}, weight=10)
+        self.assertEqual(pop_names(frontier), ["B", "A", "C"])
+
+    def test_crawl_priorities(self):
+        fetcher = Fetcher()
+        with WikiStub(build_pages()) as stub:
+            for priority in (lifo_priority, bfs_priority, reference_priority, gross_priority):
+                engine = CrawlEngine(fetcher.fetch, crawler.parse_actor_page, crawler.parse_movie_page,
+                                     target_movie_number=5, target_actor_number=5, concurrency=2,
+                                     priority=priority)
+                start = len(stub.requests)
+                actor_data, movie_data = engine.run(stub.url("Actor 0"))
+                requests = stub.requests[start:]
+                self.assertEqual(len(movie_data), 5)
+                self.assertGreaterEqual(len(actor_data), 5)
+                self.assertEqual(len(requests), len(set(requests)))
+                for kind in (ACTOR, MOVIE):
+                    for name in engine.crawled[kind]:
+                        self.assertNotIn(name, engine.frontiers[kind])
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,30 @@
+import random
 import unittest
 from model.graph import Graph, Vertex
 
 
+def pairwise_siblings(graph):
+    """
+    Gets actor siblings by comparing neighbors of every actor pair
+    """
+    actors = graph.get_actor_vertices()
+    return {name: {other for other in actors
+                   if other != name and set(actors[name].get_neighbors()) & set(actors[other].get_neighbors())}
+            for name in actors}
+
+
+def build_random_graph(actor_number, movie_number, edge_number, seed):
+    graph = Graph()
+    rand = random.Random(seed)
+    for i in range(actor_number):
+        graph.add_actor_vertex("actor%d" % i)
+    for i in range(movie_number):
+        graph.add_movie_vertex("movie%d" % i)
+    edges = [("actor%d" % rand.randrange(actor_number), "movie%d" % rand.randrange(movie_number), 1)
+             for _ in range(edge_number)]
+    return graph, edges
+
+
 class TestGraph(unittest.TestCase):
     def setUp(self):
         self.graph = Graph()
@@ -33,6 +56,117 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(vertices[0], v5)
         self.assertEqual(v1.get_compare_value(), 3)
 
+    def test_add_actor_siblings(self):
+        graph, edges = build_random_graph(60, 40, 150, seed=1)
+        for edge in edges:
+            graph.add_edge(*edge)
+        graph.add_actor_siblings()
+
+        expected = pairwise_siblings(graph)
+        for name, vertex in graph.get_actor_vertices().items():
+            self.assertEqual(vertex.get_siblings(), expected[name])
+
+    def test_add_edge_updates_siblings(self):
+        graph, edges = build_random_graph(60, 40, 150, seed=2)
+        for edge in edges[:50]:
+            graph.add_edge(*edge)
+        graph.add_actor_siblings()
+        for edge in edges[50:]:
+            graph.add_edge(*edge)
+
+        expected = pairwise_siblings(graph)
+        for name, vertex in graph.get_actor_vertices().items():
+            self.assertEqual(vertex.get_siblings(), expected[name])
+
+    def test_add_edges_from(self):
+        graph, edges = build_random_graph(60, 40, 150, seed=5)
+        expected, _ = build_random_graph(60, 40, 150, seed=5)
+        graph.add_edges_from(edges[:100] + edges[:100])
+        graph.add_edges_from([("actor0", "movie_illegal", 1)])
+        graph.add_actor_siblings()
+        graph.add_edges_from([(actor, movie, weight + 1) for actor, movie, weight in edges[50:]])
+        for actor, movie, weight in edges[:100]:
+            expected.add_edge(actor, movie, weight)
+        expected.add_actor_siblings()
+        for actor, movie, weight in edges[50:]:
+            expected.add_edge(actor, movie, weight + 1)
+
+        self.assertEqual(graph.get_edges(), expected.get_edges())
+        for name, vertex in expected.get_all_vertices().items():
+            self.assertEqual(graph.get_all_vertices()[name].get_neighbors(), vertex.get_neighbors())
+            self.assertEqual(graph.get_all_vertices()[name].get_siblings(), vertex.get_siblings())
+
+    def test_remove_edge_updates_siblings(self):
+        graph, edges = build_random_graph(60, 40, 200, seed=3)
+        for edge in edges:
+            graph.add_edge(*edge)
+        graph.add_actor_siblings()
+        for actor, movie, _ in edges[::3]:
+            graph.remove_edge(actor, movie)
+        self.assertFalse(graph.remove_edge("actor0", "movie_illegal"))
+
+        expected = pairwise_siblings(graph)
+        for name, vertex in graph.get_actor_vertices().items():
+            self.assertEqual(vertex.get_siblings(), expected[name])
+        self.assertEqual(graph.get_edges(), {(actor, movie, weight)
+                                             for actor, vertex in graph.get_actor_vertices().items()
+                                             for movie, weight in vertex.get_neighbors().items()})
+
+    def test_remove_vertices(self):
+        graph, edges = build_random_graph(30, 20, 100, seed=4)
+        for edge in edges:
+            graph.add_edge(*edge)
+        graph.add_actor_siblings()
+        graph.add_edge("actor1", "movie1", 7)
+        self.assertEqual(len([edge for edge in graph.get_edges() if edge[:2] == ("actor1", "movie1")]), 1)
+
+        self.assertIsNotNone(graph.remove_actor_vertex("actor1"))
+        self.assertIsNotNone(graph.remove_movie_vertex("movie2"))
+        self.assertIsNone(graph.remove_actor_vertex("actor1"))
+        self.assertNotIn("actor1", graph.names)
+        for name, vertex in graph.get_all_vertices().items():
+            self.assertNotIn("actor1", vertex.get_neighbors())
+            self.assertNotIn("movie2", vertex.get_neighbors())
+            self.assertNotIn("actor1", vertex.get_siblings())
+        self.assertFalse([edge for edge in graph.get_edges() if "actor1" in edge or "movie2" in edge])
+        expected = pairwise_siblings(graph)
+        for name, vertex in graph.get_actor_vertices().items():
+            self.assertEqual(vertex.get_siblings(), expected[name])
+
+    def test_actor_gross(self):
+        self.graph.add_actor_vertex("actor1")
+        self.graph.add_movie_vertex("movie1", {"gross": 10})
+        self.graph.add_movie_vertex("movie2", {"gross": 5})
+        self.graph.add_movie_vertex("movie3")
+        self.graph.add_edge("actor1", "movie1", 1)
+        self.graph.add_edge("actor1", "movie3", 1)
+        self.assertEqual(self.graph.get_actor_gross("actor1"), 10)
+
+        self.graph.add_edge("actor1", "movie2", 1)
+        self.assertEqual(self.graph.get_actor_gross("actor1"), 15)
+        self.graph.update_movie_content("movie1", {"gross": 20})
+        self.graph.update_movie_content("movie3", {"gross": 1})
+        self.assertEqual(self.graph.get_actor_gross("actor1"), 26)
+        self.graph.remove_edge("actor1", "movie2")
+        self.assertEqual(self.graph.get_actor_gross("actor1"), 21)
+        self.graph.remove_movie_vertex("movie1")
+        self.assertEqual(self.graph.get_actor_gross("actor1"), 1)
+
+    def test_interned_names(self):
+        self.graph.add_actor_vertex("".join(["actor", "1"]))
+        self.graph.add_movie_vertex("".join(["movie", "1"]))
+        self.graph.add_edge("".join(["actor", "1"]), "".join(["movie", "1"]), 3)
+        self.graph.add_actor_siblings()
+
+        actor_name = next(iter(self.graph.get_actor_vertices()))
+        movie_name = next(iter(self.graph.get_movie_vertices()))
+        edge = next(iter(self.graph.get_edges()))
+        self.assertIs(edge[0], actor_name)
+        self.assertIs(edge[1], movie_name)
+        self.assertIs(next(iter(self.graph.get_movie_vertices()[movie_name].get_neighbors())), actor_name)
+        self.assertIs(next(iter(self.graph.get_actor_vertices()[actor_name].get_neighbors())), movie_name)
+        self.assertFalse(hasattr(self.vertex, '__dict__'))
+
     def test_vertex(self):
         self.vertex.add_neighbor("vertex", 3)
         self.vertex.add_sibling("vertex")
@@ -44,6 +178,7 @@ class TestGraph(unittest.TestCase):
 
         self.vertex.remove_neighbor("vertex")
         self.vertex.remove_sibling("vertex")
+        self.vertex.remove_sibling("vertex")
         self.assertEqual(len(self.vertex.get_neighbors()), 0)
         self.assertEqual(len(self.vertex.get_siblings()), 0)
 
@@ -0,0 +1,104 @@
+import random
+import unittest
+from model.csr_graph import CSRGraph
+from model.graph import Graph
+from model.graph_index import YEAR, LANGUAGE, COUNTRY, AGE
+
+LANGUAGES = ["English", "French", "Chinese"]
+COUNTRIES = ["United States", "France", "China"]
+
+
+def random_movie(rand):
+    content = {'year': rand.randrange(2000, 2005)}
+    if rand.random() < 0.8:
+        content['lang'] = rand.sample(LANGUAGES, rand.randrange(1, 3))
+    if rand.random() < 0.8:
+        content['country'] = rand.sample(COUNTRIES, rand.randrange(1, 3))
+    return content
+
+
+def scan_movies(graph, key, value):
+    movies = set()
+    for name, vertex in graph.get_movie_vertices().items():
+        content_value = vertex.get_content().get(key)
+        if value == content_value or isinstance(content_value, list) and value in content_value:
+            movies.add(name)
+    return movies
+
+
+def scan_year_actors(graph, year):
+    movie_vertices = graph.get_movie_vertices()
+    return {name for name, vertex in graph.get_actor_vertices().items()
+            if any(movie_vertices[movie].get_content()['year'] == year for movie in vertex.get_neighbors())}
+
+
+class TestGraphIndex(unittest.TestCase):
+    def assert_indexes(self, graph):
+        index = graph.get_index()
+        for year in range(2000, 2006):
+            self.assertEqual(set(index.get_movies(YEAR, year)), scan_movies(graph, 'year', year))
+            self.assertEqual(set(index.get_actors_by_year(year)), scan_year_actors(graph, year))
+        for language in LANGUAGES:
+            self.assertEqual(set(index.get_movies(LANGUAGE, language)), scan_movies(graph, 'lang', language))
+        for country in COUNTRIES:
+            self.assertEqual(set(index.get_movies(COUNTRY, country)), scan_movies(graph, 'country', country))
+        for age in range(20, 25):
+            self.assertEqual(set(index.get_actors(AGE, age)),
+                             {name for name, vertex in graph.get_actor_vertices().items()
+                              if vertex.get_content()['age'] == age})
+
+    def test_indexes_follow_mutations(self):
+        rand = random.Random(0)
+        graph = Graph()
+        for i in range(30):
+            graph.add_actor_vertex("actor%d" % i, {'age': rand.randrange(20, 25)})
+        for i in range(30):
+            graph.add_movie_vertex("movie%d" % i, random_movie(rand))
+        for _ in range(60):
+            graph.add_edge("actor%d" % rand.randrange(30), "movie%d" % rand.randrange(30), 1)
+        self.assert_indexes(graph)
+
+        for step in range(200):
+            actor, movie = "actor%d" % rand.randrange(35), "movie%d" % rand.randrange(35)
+            operation = rand.randrange(7)
+            if operation == 0:
+                graph.add_edge(actor, movie, rand.randrange(3))
+            elif operation == 1:
+                graph.remove_edge(actor, movie)
+            elif operation == 2 and movie in graph.get_movie_vertices():
+                graph.update_movie_content(movie, random_movie(rand))
+            elif operation == 3 and actor in graph.get_actor_vertices():
+                graph.update_actor_content(actor, {'age': rand.randrange(20, 25)})
+            elif operation == 4:
+                graph.remove_movie_vertex(movie)
+            elif operation == 5 and movie not in graph.get_movie_vertices():
+                graph.add_movie_vertex(movie, random_movie(rand))
+            elif operation == 6 and actor not in graph.get_actor_vertices():
+                graph.add_actor_vertex(actor, {'age': rand.randrange(20, 25)})
+            if step % 20 == 0:
+                graph.add_edges_from([("actor%d" % rand.randrange(35), "movie%d" % rand.randrange(35), 1)])
+                self.assert_indexes(graph)
+        self.assert_indexes(graph)
+
+    def test_vertex_order(self):
+        graph = Graph()
+        for i in range(5):
+            graph.add_movie_vertex("movie%d" % i, {'year': 2000, 'lang': ["English"]})
+        graph.add_movie_vertex("movie5")
+        self.assertEqual(graph.get_index().get_movies(YEAR, 2000), ["movie%d" % i for i in range(5)])
+        self.assertEqual(graph.get_index().get_movies(LANGUAGE, "French"), [])
+        self.assertEqual(graph.get_index().get_actors_by_year(2000), [])
+
+    def test_csr_graph(self):
+        rand = random.Random(1)
+        graph = Graph()
+        for i in range(20):
+            graph.add_actor_vertex("actor%d" % i, {'age': rand.randrange(20, 25)})
+            graph.add_movie_vertex("movie%d" % i, random_movie(rand))
+        for _ in range(40):
+            graph.add_edge("actor%d" % rand.randrange(20), "movie%d" % rand.randrange(20), 1)
+        self.assert_indexes(CSRGraph.from_graph(graph))
+
+
+if __name__ == "__main__":
+    unittest.main()
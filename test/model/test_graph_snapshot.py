@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import controller.graph_lib as graphlib
+import controller.query_utils as query
+from model.csr_graph import CSRGraph
+from model.graph import Graph
+from model.graph_snapshot import save_snapshot, load_snapshot, get_snapshot_path, META_FILE
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'data.json')
+
+
+class TestGraphSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(DATA_FILE_PATH, encoding='utf-8') as data_file:
+            cls.graph = graphlib.construct_graph_single(json.load(data_file))
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_dir = os.path.join(self.temp_dir.name, 'snapshot')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        save_snapshot(self.graph, self.snapshot_dir)
+        snapshot = load_snapshot(self.snapshot_dir)
+        self.assertIsInstance(snapshot.indices[0], np.memmap)
+        self.assertEqual(list(snapshot.get_actor_vertices()), list(self.graph.get_actor_vertices()))
+        self.assertEqual(list(snapshot.get_movie_vertices()), list(self.graph.get_movie_vertices()))
+        self.assertEqual(snapshot.get_edges(), self.graph.get_edges())
+        for name, vertex in self.graph.get_all_vertices().items():
+            self.assertEqual(snapshot.get_all_vertices()[name].get_content(), vertex.get_content())
+        for name, vertex in self.graph.get_actor_vertices().items():
+            self.assertEqual(snapshot.get_actor_vertices()[name].get_siblings(), vertex.get_siblings())
+            self.assertAlmostEqual(snapshot.get_actor_gross(name), self.graph.get_actor_gross(name))
+
+        # Names used by both an actor and a movie are stored once
+        actor_names, movie_names = snapshot.names
+        shared = set(actor_names) & set(movie_names)
+        for name in shared:
+            self.assertIs(actor_names[snapshot.ids[0][name]], movie_names[snapshot.ids[1][name]])
+        self.assertEqual([name for name, _ in query.get_actors_top_k_grossing(snapshot, 5)],
+                         [name for name, _ in query.get_actors_top_k_grossing(self.graph, 5)])
+
+    def test_empty_graph(self):
+        save_snapshot(Graph(), self.snapshot_dir)
+        snapshot = load_snapshot(self.snapshot_dir)
+        self.assertEqual(len(snapshot.get_all_vertices()), 0)
+        self.assertEqual(snapshot.get_edge_number(), 0)
+
+    def test_invalid_snapshot(self):
+        self.assertRaises(FileNotFoundError, load_snapshot, self.snapshot_dir)
+        save_snapshot(CSRGraph.from_graph(self.graph), self.snapshot_dir)
+        with open(os.path.join(get_snapshot_path(self.snapshot_dir), META_FILE), 'w', encoding='utf-8') as meta_file:
+            json.dump({'version': 0}, meta_file)
+        self.assertRaises(ValueError, load_snapshot, self.snapshot_dir)
+
+    def test_save_keeps_loaded_snapshot(self):
+        first, second = Graph(), Graph()
+        for graph, weight, gross in ((first, 1.0, 5), (second, 9.0, 7)):
+            graph.add_actor_vertex("actor1")
+            graph.add_movie_vertex("movie1", {'gross': gross})
+            graph.add_edge("actor1", "movie1", weight)
+        save_snapshot(first, self.snapshot_dir)
+        loaded = load_snapshot(self.snapshot_dir)
+        save_snapshot(second, self.snapshot_dir)
+        self.assertEqual(loaded.get_actor_vertices()["actor1"].get_neighbors(), {"movie1": 1.0})
+        self.assertEqual(loaded.get_actor_gross("actor1"), 5)
+        self.assertEqual(load_snapshot(self.snapshot_dir).get_actor_vertices()["actor1"].get_neighbors(),
+                         {"movie1": 9.0})
+
+        # A failed save leaves the current snapshot and no partial generation
+        generations = sorted(os.listdir(self.snapshot_dir))
+        with patch('model.graph_snapshot.np.save', side_effect=OSError):
+            self.assertRaises(OSError, save_snapshot, first, self.snapshot_dir)
+        self.assertEqual(sorted(os.listdir(self.snapshot_dir)), generations)
+        self.assertEqual(load_snapshot(self.snapshot_dir).get_actor_gross("actor1"), 7)
+
+        # Only the current and previous generations are kept
+        save_snapshot(first, self.snapshot_dir)
+        self.assertEqual(len([name for name in os.listdir(self.snapshot_dir) if name != 'CURRENT']), 2)
+
+    def test_load_frozen_graph(self):
+        data_path = os.path.join(self.temp_dir.name, 'data.json')
+        with open(DATA_FILE_PATH, encoding='utf-8') as source, open(data_path, 'w', encoding='utf-8') as target:
+            target.write(source.read())
+        graph = graphlib.load_frozen_graph(data_path, self.snapshot_dir)
+        self.assertNotIsInstance(graph.indices[0], np.memmap)
+        snapshot = graphlib.load_frozen_graph(data_path, self.snapshot_dir)
+        self.assertIsInstance(snapshot.indices[0], np.memmap)
+        self.assertEqual(snapshot.get_edges(), graph.get_edges())
+
+        # Newer data replaces the snapshot
+        meta_time = os.path.getmtime(os.path.join(get_snapshot_path(self.snapshot_dir), META_FILE))
+        os.utime(data_path, (meta_time + 10, meta_time + 10))
+        self.assertNotIsInstance(graphlib.load_frozen_graph(data_path, self.snapshot_dir).indices[0], np.memmap)
+
+
+if __name__ == "__main__":
+    unittest.main()
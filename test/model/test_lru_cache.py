@@ -0,0 +1,32 @@
+import unittest
+from model.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        # "b" is the least recently used entry
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("b", 0), 0)
+        self.assertEqual(cache.get("c"), 3)
+        cache.put("a", 4)
+        self.assertEqual(cache.get("a"), 4)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_stats(), {'hits': 3, 'misses': 2, 'evictions': 1, 'size': 2, 'max_size': 2})
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from model.ndjson_io import NDJSONWriter, iter_records, load_records
+from controller.graph_lib import construct_graph_from_ndjson
+
+
+class TestNDJSONIO(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def write_data(self, suffix):
+        actor_path = os.path.join(self.data_dir, "actors.ndjson" + suffix)
+        movie_path = os.path.join(self.data_dir, "movies.ndjson" + suffix)
+        with NDJSONWriter(actor_path) as writer:
+            writer.write("Morgan Freeman", {'age': 80, 'movies': ["Ted 2", "Momentum"]})
+            writer.write("John Slattery", {'age': 55, 'movies': ["Ted 2"]})
+        with NDJSONWriter(movie_path) as writer:
+            writer.write("Ted 2", {'year': 2015, 'gross': 216700000.0, 'actors': ["Morgan Freeman", "John Slattery"]})
+        return actor_path, movie_path
+
+    def test_round_trip(self):
+        actor_path, _ = self.write_data("")
+        records = list(iter_records(actor_path))
+
+        self.assertEqual(records[0], ("Morgan Freeman",
+                                      {'name': "Morgan Freeman", 'age': 80, 'movies': ["Ted 2", "Momentum"]}))
+        self.assertEqual(len(records), 2)
+        with open(actor_path, encoding='utf-8') as actor_file:
+            self.assertEqual(len(actor_file.readlines()), 2)
+
+    def test_gzip(self):
+        actor_path, _ = self.write_data(".gz")
+        with gzip.open(actor_path, 'rt', encoding='utf-8') as actor_file:
+            self.assertEqual(len(actor_file.readlines()), 2)
+        self.assertEqual(load_records(actor_path)["John Slattery"]['age'], 55)
+
+    def test_later_record_replaces(self):
+        movie_path = os.path.join(self.data_dir, "movies.ndjson")
+        with NDJSONWriter(movie_path) as writer:
+            writer.write("Ted 2", {'year': 2014})
+            writer.write("Ted 2", {'year': 2015})
+            self.assertEqual(writer.count, 2)
+        self.assertEqual(load_records(movie_path), {"Ted 2": {'name': "Ted 2", 'year': 2015}})
+
+    def test_construct_graph(self):
+        graph = construct_graph_from_ndjson(*self.write_data(".gz"))
+
+        self.assertEqual(len(graph.get_actor_vertices()), 2)
+        self.assertEqual(len(graph.get_movie_vertices()), 1)
+        self.assertEqual(len(graph.get_edges()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
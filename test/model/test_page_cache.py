@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+from model.fetcher import Fetcher
+from model.page_cache import PageCache, CachedFetcher, OfflineCacheMiss
+from test.model.wiki_stub import WikiStub, build_pages
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.fetcher = Fetcher()
+
+    def tearDown(self):
+        self.fetcher.close()
+        shutil.rmtree(self.cache_dir)
+
+    def test_put_get(self):
+        cache = PageCache(self.cache_dir)
+        cache.put("http://wiki/a", b"same page", etag='"1"')
+        cache.put("http://wiki/b", b"same page")
+
+        self.assertEqual(cache.get("http://wiki/a"), {'body': b"same page", 'etag': '"1"', 'last_modified': None})
+        self.assertIsNone(cache.get("http://wiki/c"))
+        # Identical bodies are stored once
+        self.assertEqual(cache.get_size(), len(b"same page"))
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir, 'objects'))), 1)
+
+        reopened = PageCache(self.cache_dir)
+        self.assertEqual(len(reopened), 2)
+        self.assertIn("http://wiki/b", reopened)
+        self.assertEqual(reopened.get("http://wiki/b")['body'], b"same page")
+
+    def test_eviction(self):
+        cache = PageCache(self.cache_dir, max_bytes=25)
+        cache.put("http://wiki/a", b"a" * 10)
+        cache.put("http://wiki/b", b"b" * 10)
+        cache.get("http://wiki/a")
+        cache.put("http://wiki/c", b"c" * 10)
+
+        self.assertIn("http://wiki/a", cache)
+        self.assertNotIn("http://wiki/b", cache)
+        self.assertIn("http://wiki/c", cache)
+        self.assertEqual(cache.get_size(), 20)
+
+    def test_corrupted_object(self):
+        cache = PageCache(self.cache_dir)
+        cache.put("http://wiki/a", b"page")
+        for root, _, files in os.walk(os.path.join(self.cache_dir, 'objects')):
+            for file_name in files:
+                with open(os.path.join(root, file_name), 'wb') as object_file:
+                    object_file.write(b"broken")
+
+        self.assertIsNone(cache.get("http://wiki/a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_revalidation(self):
+        pages = build_pages()
+        with WikiStub(pages) as stub:
+            cached = CachedFetcher(self.fetcher, PageCache(self.cache_dir))
+            first = cached.fetch(stub.url("Actor 1"))
+            second = cached.fetch(stub.url("Actor 1"))
+            pages["/wiki/Actor_1"] += "<!-- edited -->"
+            third = cached.fetch(stub.url("Actor 1"))
+            stats = cached.get_stats()
+
+        self.assertEqual(first, second)
+        self.assertTrue(third.endswith(b"<!-- edited -->"))
+        self.assertEqual(stub.statuses, [200, 304, 200])
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['not_modified'], 1)
+        self.assertEqual(stats['updated'], 1)
+
+    def test_offline(self):
+        with WikiStub(build_pages()) as stub:
+            url = stub.url("Movie 1")
+            CachedFetcher(self.fetcher, PageCache(self.cache_dir)).fetch(url)
+            offline = CachedFetcher(self.fetcher, PageCache(self.cache_dir), offline=True)
+            body = offline.fetch(url)
+            self.assertRaises(OfflineCacheMiss, offline.fetch, stub.url("Movie 2"))
+
+        self.assertIn(b"Movie 1", body)
+        self.assertEqual(len(stub.requests), 1)
+        self.assertEqual(offline.get_stats()['offline_hits'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import model.data_crawler as crawler
+from model.parser_backend import make_document, BACKENDS, HTML_PARSER, LXML
+from test.model.wiki_stub import build_pages
+
+ROOT = "https://en.wikipedia.org"
+
+# Saved pages covering every branch of the actor and movie parsers
+CORPUS = {
+    "/wiki/Shirley_MacLaine": """<html><head><meta charset="UTF-8"></head><body>
+<h1 id="firstHeading" class="firstHeading" lang="en">Shirley MacLaine</h1>
+<p>Born 1934 <span class="noprint ForceAgeToShow">(age&#160;83)</span></p>
+<h2><span class="mw-headline" id="Filmography">Filmography</span></h2>
+<!-- the table follows -->
+<table class="wikitable">
+<tr><th>Year</th><th>Title</th></tr>
+<tr><td>1955</td><td><a href="/wiki/The_Trouble_with_Harry">The Trouble with Harry</a></td></tr>
+<tr><td>TBA</td><td><a href="/wiki/Unknown">Unknown</a></td></tr>
+<tr><td rowspan="2">1960</td><td><a href="/wiki/The_Apartment">The Apartment</a></td></tr>
+<tr><td><a href="/wiki/Ocean%27s_11">Ocean's 11</a></td></tr>
+<tr><td>1983</td><td><i><a href="/wiki/Terms_of_Endearment">Terms of <b>Endearment</b></a></i></td></tr>
+<tr><td>2016</td><td><a href="/wiki/Wild_Oats">Wild Oats</a></td></tr>
+<tr><td>2017</td><td><a href="/wiki/The_Last_Word">The Last Word</a></td></tr>
+</table></body></html>""",
+    "/wiki/Morgan_Freeman": """<html><body>
+<h1 id="firstHeading" class="firstHeading">Morgan Freeman</h1>
+<span class="noprint ForceAgeToShow">(age 80)</span>
+<div class="div-col columns column-width" style="column-width: 30em;"><ul>
+<li><i><a href="/wiki/Glory_(1989_film)">Glory</a></i> (1989)</li>
+<li><i><a href="/wiki/Se7en">Se7en</a></i> (1995)<!-- note --></li>
+<li><i><a href="/wiki/Pen%C3%A9lope">Penélope</a></i> (2006)</li>
+<li><i><a href="/wiki/Invictus_(film)">Invictus</a></i> (2009)</li>
+<li>Upcoming <a href="/wiki/Future">Future</a> (TBA)</li>
+<li><i><a href="/wiki/Lucy">Lucy</a></i> (2014)</li>
+</ul></div></body></html>""",
+    "/wiki/Matt_Damon": """<html><body>
+<h1 id="firstHeading" class="firstHeading">Matt Damon</h1>
+<span class="noprint ForceAgeToShow">(age&#160;47)</span>
+<div class="div-col columns column-count column-count-2"><ul>
+<li><a href="/wiki/Mystic_Pizza">Mystic Pizza</a> (1988)</li>
+<li><a href="/wiki/Good_Will_Hunting">Good Will Hunting</a> (1997)</li>
+<li><a href="/wiki/Dogma_(film)">Dogma</a> (1999)</li>
+</ul></div></body></html>""",
+    "/wiki/No_Films": """<html><body>
+<h1 id="firstHeading" class="firstHeading">No Films</h1>
+<span class="noprint ForceAgeToShow">(age 30)</span>
+<h2><span id="Film">Film</span></h2><p>Nothing yet.</p></body></html>""",
+    "/wiki/Amélie": """<html><body>
+<h1 id="firstHeading" class="firstHeading">Amélie</h1>
+<table class="infobox  vevent"><tr><th colspan="2">Amélie</th></tr>
+<tr><th>Starring</th><td><a href="/wiki/Audrey_Tautou">Audrey Tautou</a><br><a href="/wiki/Mathieu_Kassovitz">Mathieu Kassovitz</a></td></tr>
+<tr><th>Country</th><td>France<sup>[1]</sup><br>
+Germany</td></tr>
+<tr><th>Language</th><td>French</td></tr>
+<tr><th>Box office</th><td>$174.2 million<sup>[2]</sup>
+(worldwide)</td></tr>
+<tr><td>no header</td></tr>
+</table></body></html>""",
+    "/wiki/No_Gross": """<html><body>
+<h1 id="firstHeading" class="firstHeading">No Gross</h1>
+<table class="infobox vevent"><tr><th>Starring</th><td><a href="/wiki/A">A</a></td></tr></table></body></html>""",
+    "/wiki/Yen_Gross": """<html><body>
+<h1 id="firstHeading" class="firstHeading">Yen Gross</h1>
+<table class="infobox vevent"><tr><th>Box office</th><td>¥3 billion</td></tr></table></body></html>""",
+}
+
+
+def parse(page_path, html, backend):
+    parser = crawler.parse_movie_page if "infobox" in html else crawler.parse_actor_page
+    try:
+        return parser(html.encode("utf-8"), ROOT + page_path, backend=backend)
+    except Exception as error:
+        return type(error)
+
+
+class TestParserBackend(unittest.TestCase):
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, make_document, b"<html></html>", "unknown")
+
+    def test_html_parser_corpus(self):
+        name, info, movies = parse("/wiki/Shirley_MacLaine", CORPUS["/wiki/Shirley_MacLaine"], HTML_PARSER)
+        # Rows without a year cell are skipped
+        self.assertEqual(info['movies'], ["The Trouble with Harry", "The Apartment", "Terms of Endearment",
+                                          "Wild Oats", "The Last Word"])
+        self.assertEqual(movies[1], {'title': "The Apartment", 'year': 1960, 'url': ROOT + "/wiki/The_Apartment"})
+        name, info, movies = parse("/wiki/Morgan_Freeman", CORPUS["/wiki/Morgan_Freeman"], HTML_PARSER)
+        # The list stops at the first entry without a year
+        self.assertEqual(info['movies'], ["Glory", "Se7en", "Penélope", "Invictus"])
+        name, info, actors = parse("/wiki/Amélie", CORPUS["/wiki/Amélie"], HTML_PARSER)
+        self.assertEqual(info['country'], ["France", "Germany"])
+        self.assertEqual(info['gross'], 174200000)
+        self.assertEqual(parse("/wiki/No_Films", CORPUS["/wiki/No_Films"], HTML_PARSER), ValueError)
+        self.assertEqual(parse("/wiki/No_Gross", CORPUS["/wiki/No_Gross"], HTML_PARSER), ValueError)
+
+    @unittest.skipUnless(LXML in BACKENDS, "lxml is not installed")
+    def test_lxml_identical(self):
+        corpus = dict(CORPUS)
+        corpus.update(build_pages())
+        for page_path, html in corpus.items():
+            with self.subTest(page=page_path):
+                self.assertEqual(parse(page_path, html, LXML), parse(page_path, html, HTML_PARSER))
+
+    @unittest.skipUnless(LXML in BACKENDS, "lxml is not installed")
+    def test_lxml_node(self):
+        document = make_document(b"<html><body><div class='a b'><p id='x'>one<!-- c --><b>two</b></p>"
+                                 b"<!-- c --><p>three</p></div></body></html>", LXML)
+        first = document.find("p", attrs={"id": "x"})
+        self.assertEqual(first.get_text(), "onetwo")
+        self.assertEqual(first.find_next_sibling().get_text(), "three")
+        self.assertIsNone(first.find_next_sibling().find_next_sibling())
+        self.assertEqual(first.find_parent().get("class"), "a b")
+        self.assertEqual(len(document.find_all("p")), 2)
+        self.assertIsNotNone(document.find("div", attrs={"class": "b"}))
+        self.assertIsNotNone(document.find("div", attrs={"class": "a b"}))
+        self.assertIsNone(document.find("div", attrs={"class": "a"}).find("table"))
+
+    def test_quoted_values(self):
+        html = b"""<html><body><span id="Ocean's">one</span><span class='say "hi"'>two</span>
+<span class="it's  here">three</span></body></html>"""
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                document = make_document(html, backend)
+                self.assertEqual(document.find("span", attrs={"id": "Ocean's"}).get_text(), "one")
+                self.assertEqual(document.find("span", attrs={"class": '"hi"'}).get_text(), "two")
+                self.assertEqual(document.find("span", attrs={"class": "it's here"}).get_text(), "three")
+                self.assertEqual(document.find_all("span", attrs={"id": "Ocean"}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
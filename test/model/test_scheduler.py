@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+from email.message import Message
+from urllib.error import HTTPError
+import model.data_crawler as crawler
+from model.crawl_engine import CrawlEngine
+from model.fetcher import Fetcher
+from model.scheduler import TokenBucket, HostScheduler, is_transient, get_retry_after
+from test.model.wiki_stub import WikiStub, build_pages
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def http_error(code, retry_after=None):
+    headers = Message()
+    if retry_after is not None:
+        headers['Retry-After'] = retry_after
+    return HTTPError("http://wiki/a", code, "error", headers, None)
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=2.0, burst=2, clock=self.clock)
+        self.assertEqual(bucket.take(), 0.0)
+        self.assertEqual(bucket.take(), 0.0)
+        self.assertAlmostEqual(bucket.take(), 0.5)
+        self.clock.now += 0.5
+        self.assertEqual(bucket.take(), 0.0)
+
+    def test_host_rate(self):
+        scheduler = HostScheduler(rate=1.0, burst=1, clock=self.clock)
+        self.assertEqual(scheduler.delay("http://a.org/wiki/1"), 0.0)
+        self.assertEqual(scheduler.delay("http://b.org/wiki/1"), 0.0)
+        self.assertAlmostEqual(scheduler.delay("http://a.org/wiki/2"), 1.0)
+
+    def test_retry_after(self):
+        scheduler = HostScheduler(base_backoff=1.0, clock=self.clock, jitter=lambda: 0.0)
+        delay = scheduler.retry_delay("http://a.org/wiki/1", http_error(429, "30"), 0)
+
+        self.assertEqual(delay, 30.0)
+        self.assertAlmostEqual(scheduler.delay("http://a.org/wiki/2"), 30.0)
+        self.assertEqual(scheduler.delay("http://b.org/wiki/2"), 0.0)
+        self.assertEqual(scheduler.get_stats()['throttled'], 1)
+
+    def test_backoff(self):
+        scheduler = HostScheduler(base_backoff=2.0, max_backoff=10.0, max_retries=3, jitter=lambda: 1.0)
+        delays = [scheduler.retry_delay("http://a.org/wiki/1", http_error(503), attempt) for attempt in range(4)]
+
+        self.assertEqual(delays, [2.0, 4.0, 8.0, None])
+        self.assertIsNone(scheduler.retry_delay("http://a.org/wiki/1", http_error(404), 0))
+        self.assertIsNone(scheduler.retry_delay("http://a.org/wiki/1", ValueError("parse"), 0))
+        self.assertEqual(scheduler.get_stats()['retries'], 3)
+        self.assertEqual(scheduler.get_stats()['gave_up'], 1)
+
+    def test_is_transient(self):
+        self.assertTrue(is_transient(http_error(500)))
+        self.assertTrue(is_transient(ConnectionResetError()))
+        self.assertFalse(is_transient(http_error(404)))
+        self.assertEqual(get_retry_after(http_error(429, "Wed, 21 Oct 2015 07:28:00 GMT").headers), 0.0)
+        self.assertIsNone(get_retry_after(http_error(429, "soon").headers))
+
+    def test_acquire(self):
+        scheduler = HostScheduler(rate=50.0, burst=1)
+        asyncio.run(self.acquire_many(scheduler, 3))
+        self.assertEqual(scheduler.get_stats()['requests'], 3)
+        self.assertGreater(scheduler.get_stats()['wait_seconds'], 0)
+
+    async def acquire_many(self, scheduler, number):
+        for _ in range(number):
+            await scheduler.acquire("http://a.org/wiki/1")
+
+    def test_crawl_requeue(self):
+        failures = {"/wiki/Movie_1": [(429, 0), (503, None)], "/wiki/Movie_2": [(500, None)] * 5}
+        fetcher = Fetcher()
+        scheduler = HostScheduler(rate=1000.0, burst=10, max_retries=2, base_backoff=0.01)
+        with WikiStub(build_pages(), failures=failures) as stub:
+            engine = CrawlEngine(fetcher.fetch, crawler.parse_actor_page, crawler.parse_movie_page,
+                                 target_movie_number=5, target_actor_number=1, concurrency=2, scheduler=scheduler)
+            actor_data, movie_data = engine.run(stub.url("Actor 0"))
+        fetcher.close()
+
+        self.assertIn("Movie 1", movie_data)
+        self.assertNotIn("Movie 2", movie_data)
+        self.assertIn("Movie 2", engine.failure_names)
+        self.assertEqual(len(movie_data), 5)
+        self.assertEqual(stub.requests.count("/wiki/Movie_1"), 3)
+        self.assertEqual(stub.requests.count("/wiki/Movie_2"), 3)
+        stats = scheduler.get_stats()
+        self.assertEqual(stats['retries'], 4)
+        self.assertEqual(stats['gave_up'], 1)
+        self.assertEqual(stats['throttled'], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import functools
+import unittest
+import model.data_crawler as crawler
+from model.crawl_engine import CrawlEngine
+from model.fetcher import Fetcher
+from model.seen_set import BloomFilter, normalize_url
+from test.model.wiki_stub import WikiStub, build_pages, STARRING_ROW
+
+
+class TestNormalizeUrl(unittest.TestCase):
+    def test_normalize_url(self):
+        url = "https://en.wikipedia.org/wiki/Morgan_Freeman"
+        self.assertEqual(normalize_url(url), url)
+        self.assertEqual(normalize_url("HTTPS://EN.Wikipedia.org:443/wiki/Morgan_Freeman#Career"), url)
+        self.assertEqual(normalize_url("https://en.wikipedia.org/wiki/Morgan%20Freeman"), url)
+        self.assertEqual(normalize_url("https://en.wikipedia.org/wiki/Morgan%5FFreeman"), url)
+        self.assertEqual(normalize_url("https://en.wikipedia.org/wiki/Am%C3%A9lie"),
+                         normalize_url("https://en.wikipedia.org/wiki/Amélie"))
+        self.assertEqual(normalize_url("https://en.wikipedia.org/wiki/Ocean%27s_Eleven"),
+                         "https://en.wikipedia.org/wiki/Ocean's_Eleven")
+        self.assertEqual(normalize_url("http://127.0.0.1:8080"), "http://127.0.0.1:8080/")
+        self.assertNotEqual(normalize_url("https://en.wikipedia.org/wiki/Up"),
+                            normalize_url("https://en.wikipedia.org/wiki/Up_(2009_film)"))
+
+    def test_normalize_query(self):
+        url = "https://en.wikipedia.org/w/index.php?title=Tom_%26_Jerry&action=edit"
+        self.assertEqual(normalize_url(url), url)
+        self.assertNotEqual(normalize_url(url),
+                            normalize_url("https://en.wikipedia.org/w/index.php?title=Tom_&_Jerry&action=edit"))
+        self.assertNotEqual(normalize_url("https://en.wikipedia.org/w/index.php?search=a%3Db"),
+                            normalize_url("https://en.wikipedia.org/w/index.php?search=a&b"))
+        self.assertNotEqual(normalize_url("https://en.wikipedia.org/w/index.php?search=a+b"),
+                            normalize_url("https://en.wikipedia.org/w/index.php?search=a%2Bb"))
+        self.assertEqual(normalize_url("https://en.wikipedia.org/w/index.php?title=%7e%41&action"),
+                         "https://en.wikipedia.org/w/index.php?title=~A&action")
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_add_contains(self):
+        seen = BloomFilter(1000, 0.01)
+        self.assertTrue(seen.add("a"))
+        self.assertFalse(seen.add("a"))
+        self.assertIn("a", seen)
+        self.assertNotIn("b", seen)
+        self.assertEqual(len(seen), 1)
+
+    def test_error_rate(self):
+        capacity = 10000
+        seen = BloomFilter(capacity, 0.01)
+        for i in range(capacity):
+            seen.add("https://en.wikipedia.org/wiki/Page_%d" % i)
+        # Never forgets an added url
+        self.assertTrue(all("https://en.wikipedia.org/wiki/Page_%d" % i in seen for i in range(capacity)))
+        false_positives = sum("https://en.wikipedia.org/wiki/Other_%d" % i in seen for i in range(capacity))
+        self.assertLess(false_positives / capacity, 0.02)
+        self.assertLess(seen.get_error_rate(), 0.02)
+        # About 1.2 bytes per url at 1%
+        self.assertLess(seen.get_size(), capacity * 1.3)
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, BloomFilter, 0)
+        self.assertRaises(ValueError, BloomFilter, 10, 1.5)
+
+
+class TestCrawlDedup(unittest.TestCase):
+    def test_redirect_and_alternate_urls(self):
+        pages = build_pages()
+        # A redirecting alias and a differently encoded link of the start actor under other names
+        aliases = STARRING_ROW.format(slug="Actor_Zero", name="Zero") + \
+            STARRING_ROW.format(slug="Actor%5F0#Career", name="Actor 0 (actor)")
+        pages["/wiki/Movie_1"] = pages["/wiki/Movie_1"].replace("<ul>\n", "<ul>\n" + aliases)
+        fetcher = Fetcher()
+        with WikiStub(pages, redirects={"/wiki/Actor_Zero": "/wiki/Actor_0"}) as stub:
+            for seen_set in (set, functools.partial(BloomFilter, 1000, 0.001)):
+                engine = CrawlEngine(fetcher.fetch, crawler.parse_actor_page, crawler.parse_movie_page,
+                                     target_movie_number=12, target_actor_number=12, concurrency=2,
+                                     seen_set=seen_set)
+                start = len(stub.requests)
+                actor_data, movie_data = engine.run(stub.url("Actor 0"))
+                requests = stub.requests[start:]
+
+                self.assertEqual(len(movie_data), 12)
+                self.assertEqual(len(actor_data), 12)
+                self.assertNotIn("Zero", actor_data)
+                self.assertEqual(engine.duplicates, 1)
+                self.assertEqual(requests.count("/wiki/Actor_Zero"), 1)
+                self.assertEqual(requests.count("/wiki/Actor_0"), 2)
+                self.assertNotIn("/wiki/Actor%5F0", requests)
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import random
+import unittest
+from model.union_find import UnionFind
+
+
+class TestUnionFind(unittest.TestCase):
+    def test_union_find(self):
+        sets = UnionFind(range(5))
+        self.assertEqual(len(sets), 5)
+        self.assertTrue(sets.union(0, 1))
+        self.assertTrue(sets.union(2, 1))
+        self.assertFalse(sets.union(0, 2))
+        sets.add(5)
+        sets.add(5)
+        self.assertEqual(len(sets), 4)
+        self.assertTrue(sets.connected(0, 2))
+        self.assertFalse(sets.connected(0, 3))
+        self.assertEqual(sets.get_size(2), 3)
+        self.assertIn(5, sets)
+        self.assertNotIn(6, sets)
+
+    def test_random_unions(self):
+        rand = random.Random(0)
+        sets = UnionFind(range(200))
+        groups = [{i} for i in range(200)]
+        for _ in range(150):
+            first, second = rand.randrange(200), rand.randrange(200)
+            sets.union(first, second)
+            group = next(group for group in groups if first in group)
+            other = next(group for group in groups if second in group)
+            if group is not other:
+                group |= other
+                groups.remove(other)
+        self.assertEqual(len(sets), len(groups))
+        for group in groups:
+            self.assertEqual(len({sets.find(item) for item in group}), 1)
+            self.assertEqual(sets.get_size(next(iter(group))), len(group))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -37,6 +37,12 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(res1, [1, 2, 3])
         self.assertEqual(res2, [1, 2])
 
+    def test_select_largest_k(self):
+        pairs = [("a", 3), ("b", 5), ("c", 3), ("d", 1), ("e", 5)]
+        expected = sorted(pairs, key=lambda pair: pair[1])[::-1]
+        for k in range(7):
+            self.assertEqual(utils.select_largest_k(iter(pairs), k), expected[:k])
+
     def test_select_bottom_k(self):
         res1 = utils.select_bottom_k([1, 2, 3], 5)
         res2 = utils.select_bottom_k([1, 2, 3, 4, 5], 2)
@@ -0,0 +1,211 @@
+import gzip
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A local stand-in for en.wikipedia.org which serves saved actor and movie pages for crawler tests
+
+ACTOR_PAGE = """<!DOCTYPE html>
+<html><head><title>{name} - Wikipedia</title><link rel="canonical" href="/wiki/{slug}"></head>
+<body>
+<h1 id="firstHeading" class="firstHeading">{name}</h1>
+<div class="mw-parser-output">
+<table class="infobox biography vcard"><tr><th>Born</th>
+<td>{birth} <span class="noprint ForceAgeToShow">(age&#160;{age})</span></td></tr></table>
+<h2><span class="mw-headline" id="Film">Film</span></h2>
+<table class="wikitable sortable">
+<tr><th>Year</th><th>Title</th><th>Role</th></tr>
+{rows}
+</table>
+<h2><span class="mw-headline" id="References">References</span></h2>
+</div>
+</body></html>
+"""
+
+FILM_ROW = """<tr><td>{year}</td><td><i><a href="/wiki/{slug}" title="{title}">{title}</a></i></td><td>Self</td></tr>"""
+
+MOVIE_PAGE = """<!DOCTYPE html>
+<html><head><title>{title} - Wikipedia</title><link rel="canonical" href="/wiki/{slug}"></head>
+<body>
+<h1 id="firstHeading" class="firstHeading">{title}</h1>
+<div class="mw-parser-output">
+<table class="infobox vevent">
+<tr><th colspan="2" class="summary">{title}</th></tr>
+<tr><th scope="row">Directed by</th><td>Some Director</td></tr>
+<tr><th scope="row">Starring</th><td><div class="plainlist"><ul>
+{actors}
+</ul></div></td></tr>
+<tr><th scope="row">Country</th><td>United States</td></tr>
+<tr><th scope="row">Language</th><td>English</td></tr>
+<tr><th scope="row">Box office</th><td>${gross} million<sup class="reference">[1]</sup></td></tr>
+</table>
+</div>
+</body></html>
+"""
+
+STARRING_ROW = """<li><a href="/wiki/{slug}" title="{name}">{name}</a></li>"""
+
+
+def slug(name):
+    """
+    Gets the wiki path of a page name
+    :param name: the page name
+    :return: the slug used in url
+    """
+    return name.replace(" ", "_")
+
+
+def build_pages(actor_number=12, movie_number=12, movies_per_actor=7, actors_per_movie=4):
+    """
+    Builds a small connected wiki of actor and movie pages
+    :param actor_number: the number of actor pages
+    :param movie_number: the number of movie pages
+    :param movies_per_actor: the filmography length of an actor
+    :param actors_per_movie: the starring length of a movie
+    :return: dict of url path and page html
+    """
+    pages = {}
+    for i in range(actor_number):
+        name = "Actor %d" % i
+        rows = []
+        for j in range(movies_per_actor):
+            title = "Movie %d" % ((i + j) % movie_number)
+            rows.append(FILM_ROW.format(year=1990 + (i + j) % movie_number, slug=slug(title), title=title))
+        pages["/wiki/" + slug(name)] = ACTOR_PAGE.format(name=name, slug=slug(name), birth=1950 + i, age=30 + i,
+                                                         rows="\n".join(rows))
+    for i in range(movie_number):
+        title = "Movie %d" % i
+        actors = [STARRING_ROW.format(slug=slug("Actor %d" % ((i + j) % actor_number)),
+                                      name="Actor %d" % ((i + j) % actor_number))
+                  for j in range(actors_per_movie)]
+        pages["/wiki/" + slug(title)] = MOVIE_PAGE.format(title=title, slug=slug(title), gross=10 + i,
+                                                          actors="\n".join(actors))
+    return pages
+
+
+class WikiStub:
+    """
+    The threaded HTTP server serving saved pages
+    """
+
+    def __init__(self, pages, delay=0.0, compress=False, redirects=None, drop_connections=False, failures=None):
+        """
+        Initialize the stub server
+        :param pages: dict of url path and page html
+        :param delay: the seconds to wait before responding, to make fetches overlap
+        :param compress: if we expect to gzip bodies for clients accepting gzip
+        :param redirects: dict of url path and the path it redirects to
+        :param drop_connections: if we expect to close connections silently after each response
+        :param failures: dict of url path and the list of (status, Retry-After) answered before the page
+        """
+        self.pages = pages
+        self.delay = delay
+        self.compress = compress
+        self.redirects = redirects or {}
+        self.drop_connections = drop_connections
+        self.failures = failures or {}
+        self.requests = []
+        self.statuses = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def root(self):
+        """
+        Gets the root url of the server
+        :return: the root url
+        """
+        return "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def url(self, name):
+        """
+        Gets the page url of a page name
+        :param name: the page name
+        :return: the page url
+        """
+        return self.root + "/wiki/" + slug(name)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append(self.path)
+                    stub.connections.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    stub.respond(self)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def respond(self, handler):
+        """
+        Writes the response of a request
+        :param handler: the request handler
+        """
+        page = self.pages.get(handler.path)
+        with self._lock:
+            failure = self.failures[handler.path].pop(0) if self.failures.get(handler.path) else None
+        if failure is not None:
+            status, retry_after = failure
+            body = b"Try again later"
+            self._send_status(handler, status)
+            if retry_after is not None:
+                handler.send_header("Retry-After", str(retry_after))
+        elif handler.path in self.redirects:
+            body = b""
+            self._send_status(handler, 301)
+            handler.send_header("Location", self.redirects[handler.path])
+        elif page is None:
+            body = b"Not Found"
+            self._send_status(handler, 404)
+        else:
+            body = page.encode("utf-8")
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if handler.headers.get("If-None-Match") == etag:
+                self._send_status(handler, 304)
+                handler.send_header("ETag", etag)
+                handler.end_headers()
+                return
+            self._send_status(handler, 200)
+            handler.send_header("Content-Type", "text/html; charset=UTF-8")
+            handler.send_header("ETag", etag)
+            handler.send_header("Last-Modified", "Sat, 01 Jan 2022 00:00:00 GMT")
+            if self.compress and "gzip" in handler.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                handler.send_header("Content-Encoding", "gzip")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+        if self.drop_connections:
+            handler.close_connection = True
+
+    def _send_status(self, handler, status):
+        with self._lock:
+            self.statuses.append(status)
+        handler.send_response(status)
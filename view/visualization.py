@@ -1,9 +1,10 @@
 import igraph as ig
 import json
 import urllib.request as urllib2
-import random
 import math
+from collections import Counter
 from controller.graph_lib import construct_graph
+from controller.communities import label_propagation
 from model.utils import get_readable_string_from_int
 import plotly.plotly as py
 import plotly
@@ -21,6 +22,7 @@ with open(MOVIE_FILE_PATH, encoding='utf-8') as data_file:
 
 # Step 1: Construct graph and collect useful information for plot
 graph = construct_graph(actor_data, movie_data)
+graph.add_actor_siblings()
 vertices = graph.get_all_vertices()
 vertices_list = list(vertices.keys())
 edges = graph.get_edges()
@@ -34,18 +36,24 @@ ig_edges = [(sources[i], targets[i]) for i in range(len(edges))]
 G = ig.Graph(ig_edges, directed=False)
 layt = G.layout('kk', dim=3)
 
+# Colors actors by community, and movies by the most common community of their actors
+communities = label_propagation(graph, seed=0)
+community_ids = {label: i for i, label in enumerate(sorted(set(communities.values())))}
+
 # Collects useful information for plot
 labels = [] # The text information about a vertex
-group = []  # The group number for future coloring
+group = []  # The community number for coloring
 sizes = []  # The size of the vertex for visualization
 for node in vertices_list:
     if "age" in vertices[node].get_content():
-        group.append(random.randint(0, 10))
+        group.append(community_ids[communities[node]])
         labels.append(node
                       + " -- " + "Age: " + str((vertices[node].get_content())['age']))
         sizes.append((vertices[node].get_content())['age']/2.5)
     else:
-        group.append(random.randint(20, 30))
+        movie_communities = Counter(communities[actor] for actor in vertices[node].get_neighbors())
+        group.append(community_ids[movie_communities.most_common(1)[0][0]] if movie_communities
+                     else len(community_ids))
         labels.append(node
                       + " -- " + "Grossing: " + get_readable_string_from_int((vertices[node].get_content())['gross']))
         sizes.append(math.log(vertices[node].get_content()['gross']/1000000, 1.1) * 0.6)